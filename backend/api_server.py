@@ -0,0 +1,354 @@
+import asyncio
+import argparse
+import json
+import os
+import time
+
+from aiohttp import web
+
+from utils.feed_snapshot import FeedSnapshot, FEED_FILE, GAMES_FILE
+from utils.odds_diff import DeltaLog, quote_index, diff_quotes
+from utils.odds_history import OddsHistoryStore, HistoryIndexCache
+from utils.poll_status import read_status, STATUS_FILE
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data", "current")
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+ODDS_HISTORY_DIR = os.path.join(BASE_DIR, "data", "store", "odds_history")
+STATUS_PATH = os.path.join(BASE_DIR, "data", STATUS_FILE)  # Written by run_pipeline --daemon
+DEFAULT_PORT = 5000            # Matches the frontend's VITE_API_BASE_URL default
+RELOAD_POLL_SECONDS = 1.0
+SSE_HEARTBEAT_SECONDS = 15
+SSE_QUEUE_SIZE = 64            # Slow clients past this are dropped and resume via Last-Event-ID
+
+def load_snapshot(data_dir):
+    snapshot = FeedSnapshot(data_dir)
+    return snapshot, quote_index(snapshot.players.values(), ladders=True)  # Alt-rung moves are pushed too
+
+def load_history(history_cache):
+    """Query index over the stored odds history (None if there is none yet)."""
+    if history_cache is None or not os.path.isdir(history_cache.store.root):
+        return None
+    return history_cache.refresh()
+
+class FeedState:
+    """Mutable holder so a reload swaps one reference without touching the frozen app."""
+    def __init__(self, data_dir, history_dir=None, status_path=None):
+        self.data_dir = data_dir
+        self.history_dir = history_dir
+        self.status_path = status_path
+        self.signature = feed_signature(data_dir)
+        self.snapshot, self.quotes = FeedSnapshot.empty(data_dir), {}
+        if self.signature is None:
+            print(f"   ⏳ No feed in {data_dir} yet, waiting for the first pipeline run")
+        else:
+            try:
+                self.snapshot, self.quotes = load_snapshot(data_dir)
+            except Exception as e:
+                # Most likely caught mid-write; the reload watcher retries
+                print(f"   ⚠️ Feed load failed, starting empty: {e}")
+                self.signature = None
+        # Reloads re-read only the history files added since (see HistoryIndexCache)
+        self.history_cache = HistoryIndexCache(OddsHistoryStore(history_dir)) if history_dir else None
+        self.history = load_history(self.history_cache)
+        self.loaded_at = time.time()
+
+        # Odds push: diffs between consecutive snapshots, resumable by sequence.
+        # The epoch tells clients when a restart has reset the sequence.
+        self.epoch = int(self.loaded_at)
+        self.deltas = DeltaLog()
+        self.subscribers = set()
+
+    def publish(self, snapshot, quotes):
+        diff = diff_quotes(self.quotes, quotes)
+        base_version = self.snapshot.version
+        self.snapshot, self.quotes = snapshot, quotes
+        self.loaded_at = time.time()
+        if not diff["changed"] and not diff["removed"]:
+            return None
+
+        entry = self.deltas.append(base_version, snapshot.version, diff)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                # Too far behind: close the stream; the client reconnects with
+                # Last-Event-ID and the backlog is replayed from the DeltaLog
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+        return entry
+
+STATE_KEY = web.AppKey("feed_state", FeedState)
+WATCHER_KEY = web.AppKey("feed_watcher", asyncio.Task)
+
+# ==========================================
+# 1. RESPONSES
+# ==========================================
+def send_resource(request, resource):
+    """Serves a precompressed Resource with strong ETag / 304 handling."""
+    if resource is None:
+        raise web.HTTPNotFound()
+
+    coding, body, etag = resource.select(request.headers.get("Accept-Encoding"))
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",  # Always revalidate; 304s are cheap
+    }
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return web.Response(status=304, headers=headers)
+
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return web.Response(body=body, content_type=resource.content_type, headers=headers)
+
+async def add_cors_headers(request, response):
+    # The Vite dev server runs on another port (replaces `npx serve --cors`)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Expose-Headers"] = "ETag, X-Feed-Version"
+
+# ==========================================
+# 2. HANDLERS
+# ==========================================
+async def get_data_file(request):
+    snapshot = request.app[STATE_KEY].snapshot
+    response = send_resource(request, snapshot.file(request.match_info["name"]))
+    # What /api/odds/stream?version= expects, so clients can resume from exactly this feed
+    response.headers["X-Feed-Version"] = snapshot.version
+    return response
+
+async def get_player(request):
+    try:
+        pid = int(request.match_info["player_id"])
+    except ValueError:
+        raise web.HTTPBadRequest(text="player_id must be an integer")
+    return send_resource(request, request.app[STATE_KEY].snapshot.player(pid))
+
+async def get_game(request):
+    return send_resource(request, request.app[STATE_KEY].snapshot.game(request.match_info["game_id"]))
+
+async def get_games(request):
+    return send_resource(request, request.app[STATE_KEY].snapshot.game_list())
+
+async def get_health(request):
+    state = request.app[STATE_KEY]
+    return web.json_response({
+        "version": state.snapshot.version,
+        "players": len(state.snapshot.players),
+        "games": len(state.snapshot.games),
+        "loaded_at": state.loaded_at
+    })
+
+async def get_status(request):
+    """
+    GET /api/status -> the polling daemon's tick latency and per-book staleness
+    (null when no daemon has run) plus the age of the feed being served.
+    """
+    state = request.app[STATE_KEY]
+    now = time.time()
+    return web.json_response({
+        "feed": {
+            "version": state.snapshot.version,
+            "loaded_at": state.loaded_at,
+            "age_seconds": round(now - state.loaded_at, 1)
+        },
+        "daemon": read_status(state.status_path, now) if state.status_path else None
+    })
+
+def frame_response(df):
+    """DataFrame -> JSON list of records (NaN -> null)."""
+    records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    return web.json_response(records)
+
+async def get_odds_history(request):
+    """GET /api/odds/history/{player_id}?prop=PTS[&book=dk] -> quotes since the market opened."""
+    history = request.app[STATE_KEY].history
+    try:
+        pid = int(request.match_info["player_id"])
+    except ValueError:
+        raise web.HTTPBadRequest(text="player_id must be an integer")
+    prop = request.query.get("prop")
+    if not prop:
+        raise web.HTTPBadRequest(text="prop is required")
+    if history is None:
+        return web.json_response([])
+    return frame_response(history.movement(pid, prop.upper(), request.query.get("book")))
+
+async def get_odds_moves(request):
+    """GET /api/odds/moves?minutes=15&limit=20 -> largest line moves in the window."""
+    history = request.app[STATE_KEY].history
+    try:
+        minutes = float(request.query.get("minutes", 15))
+        limit = int(request.query.get("limit", 20))
+    except ValueError:
+        raise web.HTTPBadRequest(text="minutes and limit must be numbers")
+    if history is None:
+        return web.json_response([])
+    return frame_response(history.largest_moves(minutes=minutes, limit=limit))
+
+# ==========================================
+# 3. ODDS PUSH (Server-Sent Events)
+# ==========================================
+def sse_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+def parse_last_event_id(value, epoch):
+    """'<epoch>:<seq>' -> seq, or None if it belongs to another server run."""
+    try:
+        client_epoch, seq = value.split(":")
+        return int(seq) if int(client_epoch) == epoch else None
+    except (AttributeError, ValueError):
+        return None
+
+async def stream_odds(request):
+    """
+    GET /api/odds/stream
+    Pushes one `odds` event per changed snapshot: {seq, base, version, changed, removed}.
+    New clients pass ?version= (the X-Feed-Version of the master_feed.json they
+    loaded); if a delta was published since, they get a `reset` instead of `hello`.
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get the missed
+    diffs replayed; if those have aged out they get a `reset` event and should
+    refetch master_feed.json.
+    """
+    state = request.app[STATE_KEY]
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+
+    queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+    state.subscribers.add(queue)
+    try:
+        last_id = request.headers.get("Last-Event-ID") or request.query.get("last_event_id")
+        if last_id:
+            last_seq = parse_last_event_id(last_id, state.epoch)
+            backlog = state.deltas.since(last_seq) if last_seq is not None else None
+            if backlog is None:
+                await response.write(sse_event("reset", {"version": state.snapshot.version},
+                                               f"{state.epoch}:{state.deltas.seq}"))
+            else:
+                for entry in backlog:
+                    await response.write(sse_event("odds", entry, f"{state.epoch}:{entry['seq']}"))
+        else:
+            loaded = request.query.get("version")
+            event = "reset" if loaded is not None and loaded != state.snapshot.version else "hello"
+            await response.write(sse_event(event, {"version": state.snapshot.version},
+                                           f"{state.epoch}:{state.deltas.seq}"))
+
+        while True:
+            try:
+                entry = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                await response.write(b": keep-alive\n\n")
+                continue
+            if entry is None:  # Fell too far behind; client reconnects and resumes
+                break
+            await response.write(sse_event("odds", entry, f"{state.epoch}:{entry['seq']}"))
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        state.subscribers.discard(queue)
+    return response
+
+# ==========================================
+# 4. ATOMIC RELOAD
+# ==========================================
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+def feed_signature(data_dir):
+    """
+    Changes whenever a new generation is published (data/current repointed, e.g. a
+    schedule-only run that carries the feed over) or a served file is replaced in
+    place. None until a feed exists.
+    """
+    feed = _file_signature(os.path.join(data_dir, FEED_FILE))
+    if feed is None:
+        return None
+    return (os.path.realpath(data_dir), feed, _file_signature(os.path.join(data_dir, GAMES_FILE)))
+
+async def watch_feed(state):
+    """Polls for a new feed, builds the snapshot off-loop, then swaps one reference."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(RELOAD_POLL_SECONDS)
+        sig = feed_signature(state.data_dir)
+        if sig is None or sig == state.signature:
+            continue
+        try:
+            snapshot, quotes = await loop.run_in_executor(None, load_snapshot, state.data_dir)
+        except Exception as e:
+            # Most likely caught mid-write; keep serving the old snapshot and retry
+            print(f"   ⚠️ Feed reload failed, keeping {state.snapshot.version[:12]}: {e}")
+            continue
+        try:
+            # Each pipeline run appends to the history before publishing the feed
+            state.history = await loop.run_in_executor(None, load_history, state.history_cache)
+        except Exception as e:
+            print(f"   ⚠️ Odds history reload failed, keeping the previous index: {e}")
+        state.signature = sig
+        entry = state.publish(snapshot, quotes)
+        moved = f", pushed {len(entry['changed'])} changed / {len(entry['removed'])} removed props" if entry else ""
+        print(f"   🔄 Reloaded feed {snapshot.version[:12]} ({len(snapshot.players)} players{moved})")
+
+async def start_watcher(app):
+    app[WATCHER_KEY] = asyncio.create_task(watch_feed(app[STATE_KEY]))
+
+async def stop_watcher(app):
+    app[WATCHER_KEY].cancel()
+
+# ==========================================
+# 5. APP
+# ==========================================
+def create_app(data_dir=DATA_DIR, assets_dir=ASSETS_DIR, history_dir=ODDS_HISTORY_DIR, status_path=STATUS_PATH):
+    app = web.Application()
+    app[STATE_KEY] = FeedState(data_dir, history_dir, status_path)
+
+    app.router.add_get("/data/current/{name}", get_data_file)
+    app.router.add_get("/api/players/{player_id}", get_player)
+    app.router.add_get("/api/games", get_games)
+    app.router.add_get("/api/games/{game_id}", get_game)
+    app.router.add_get("/api/odds/stream", stream_odds)
+    app.router.add_get("/api/odds/history/{player_id}", get_odds_history)
+    app.router.add_get("/api/odds/moves", get_odds_moves)
+    app.router.add_get("/api/health", get_health)
+    app.router.add_get("/api/status", get_status)
+    if os.path.isdir(assets_dir):
+        app.router.add_static("/assets/", assets_dir)
+
+    app.on_response_prepare.append(add_cors_headers)
+    app.on_startup.append(start_watcher)
+    app.on_cleanup.append(stop_watcher)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve master_feed.json and per-player/per-game endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--history-dir", default=ODDS_HISTORY_DIR)
+    parser.add_argument("--status-file", default=STATUS_PATH)
+    args = parser.parse_args()
+
+    print(f"🚀 API server on http://{args.host}:{args.port} (data: {args.data_dir})")
+    app = create_app(args.data_dir, history_dir=args.history_dir, status_path=args.status_file)
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
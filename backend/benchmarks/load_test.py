@@ -0,0 +1,91 @@
+"""
+Load test for api_server.py.
+
+    python benchmarks/load_test.py --url http://localhost:5000 --concurrency 64 --duration 15
+
+Mixes full-feed, per-player and per-game requests, replays ETags the way a
+browser would (so a share of responses are 304s), and reports requests per
+second plus p50/p99 latency per endpoint. Connection errors and timeouts
+are counted per endpoint, not silently dropped with the worker.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import aiohttp
+import numpy as np
+
+REQUEST_TIMEOUT = 10  # Seconds; a slower response counts as an error
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+async def worker(session, base_url, paths, deadline, results, revalidate):
+    etags = {}
+    while time.perf_counter() < deadline:
+        kind, path = random.choice(paths)
+        headers = {"Accept-Encoding": "br, gzip"}
+        if revalidate and path in etags:
+            headers["If-None-Match"] = etags[path]
+
+        start = time.perf_counter()
+        try:
+            async with session.get(base_url + path, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as resp:
+                await resp.read()
+                if "ETag" in resp.headers:
+                    etags[path] = resp.headers["ETag"]
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = None  # Recorded as an error; the worker keeps going
+        results.setdefault(kind, []).append((time.perf_counter() - start, status))
+
+async def run(base_url, concurrency, duration, revalidate):
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    # auto_decompress=False: measure the server, not client-side brotli decoding
+    async with aiohttp.ClientSession(connector=connector, auto_decompress=False) as session:
+        plain = {"Accept-Encoding": "identity"}
+        async with session.get(f"{base_url}/api/games", headers=plain) as resp:
+            games = await resp.json(content_type=None) if resp.status == 200 else []
+        async with session.get(f"{base_url}/data/current/master_feed.json", headers=plain) as resp:
+            feed = await resp.json(content_type=None)
+        players = feed["players"] if isinstance(feed, dict) else feed
+
+        paths = [("feed", "/data/current/master_feed.json")]
+        paths += [("player", f"/api/players/{p['id']}") for p in players[:200]]
+        paths += [("game", f"/api/games/{g['game_id']}") for g in games]
+
+        results = {}
+        deadline = time.perf_counter() + duration
+        wall_start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(session, base_url, paths, deadline, results, revalidate)
+            for _ in range(concurrency)
+        ])
+        wall = time.perf_counter() - wall_start
+
+    total = sum(len(v) for v in results.values())
+    errors = sum(1 for v in results.values() for _, status in v if status is None)
+    print(f"\n📈 {total} requests in {wall:.1f}s -> {total / wall:,.0f} req/s (concurrency {concurrency})")
+    if errors:
+        print(f"   ❌ {errors} requests failed ({errors / total:.1%}), excluded from the latencies")
+    all_latencies = [lat for v in results.values() for lat, status in v if status is not None]
+    print(f"   overall  p50 {percentile(all_latencies, 50):7.2f} ms   p99 {percentile(all_latencies, 99):7.2f} ms")
+    for kind, samples in sorted(results.items()):
+        latencies = [lat for lat, status in samples if status is not None]
+        not_modified = sum(1 for _, status in samples if status == 304)
+        print(f"   {kind:<8} p50 {percentile(latencies, 50):7.2f} ms   p99 {percentile(latencies, 99):7.2f} ms"
+              f"   n={len(samples)} (304s: {not_modified}, errors: {len(samples) - len(latencies)})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--no-revalidate", action="store_true", help="Never send If-None-Match")
+    args = parser.parse_args()
+    asyncio.run(run(args.url.rstrip("/"), args.concurrency, args.duration, not args.no_revalidate))
+
+if __name__ == "__main__":
+    main()
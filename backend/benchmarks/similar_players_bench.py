@@ -0,0 +1,95 @@
+"""
+Benchmark for the similar-players index (utils/similar_players.py).
+
+    python benchmarks/similar_players_bench.py --seasons 1 5 10 --players 550
+
+Builds synthetic players (season stats + shooting / assist zones; one entry per
+player-season, so several seasons stand in for a multi-season pool), builds the
+kNN index with the blocked, vectorized distance computation and compares it
+against the per-player loop it replaces (one distance vector + full sort per
+player). Checks that both find the same neighbours and reports the build time
+and the per-player lookup cost.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.similar_players import (  # noqa: E402
+    SimilarityIndex, feature_matrix, FEATURE_STATS, SHOOTING_ZONES, ASSIST_ZONES, K_NEIGHBORS
+)
+
+# ---- Per-player reference (what a lookup without an index costs) ----
+def legacy_neighbors(players, k):
+    X = feature_matrix(players)
+    ids = [p['id'] for p in players]
+    out = {}
+    for i, pid in enumerate(ids):
+        d = np.sqrt(((X - X[i]) ** 2).sum(axis=1))
+        d[i] = np.inf
+        out[pid] = [ids[j] for j in np.argsort(d, kind='stable')[:k]]
+    return out
+
+# ---- Synthetic data ----
+def zones(rng, keys):
+    shares = rng.dirichlet(np.ones(len(keys)))
+    pcts = np.floor(shares * 100).astype(int)
+    pcts[0] += 100 - pcts.sum()
+    return {key: {"percentage": f"{pct}%", "makes": str(int(rng.integers(0, 200)))} for key, pct in zip(keys, pcts)}
+
+def make_players(rng, n):
+    players = []
+    for i in range(n):
+        minutes = rng.uniform(5, 38)
+        stats = {k: float(rng.gamma(2, minutes / 10)) for k in FEATURE_STATS}
+        stats['MIN'] = minutes
+        players.append({
+            'id': i, 'stats': stats,
+            'shooting_zones': zones(rng, SHOOTING_ZONES) if rng.random() > 0.05 else None,
+            'assist_zones': zones(rng, ASSIST_ZONES) if rng.random() > 0.05 else None,
+        })
+    return players
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--players", type=int, default=550, help="Players per season")
+    parser.add_argument("--k", type=int, default=K_NEIGHBORS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-legacy-above", type=int, default=6000, help="Pool size above which the per-player loop is skipped")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"📊 k={args.k}, {args.players} players per season (best of {args.repeat})")
+    for seasons in args.seasons:
+        players = make_players(rng, seasons * args.players)
+        index, t_index = timed(lambda: SimilarityIndex(players, args.k), args.repeat)
+
+        start = time.perf_counter()
+        for p in players:
+            index.neighbors(p['id'])
+        t_lookup = (time.perf_counter() - start) / len(players) * 1e6
+
+        line = f"   {seasons:>2} season(s) {len(players):>6} rows   index build {t_index:8.1f} ms   lookup {t_lookup:5.2f} µs"
+        if len(players) <= args.skip_legacy_above:
+            expected, t_legacy = timed(lambda: legacy_neighbors(players, args.k), 1)
+            actual = {pid: [nid for nid, _ in index.neighbors(pid)] for pid in expected}
+            mismatches = sum(actual[pid] != expected[pid] for pid in expected)
+            assert mismatches <= len(players) * 0.001, f"{mismatches} players got different neighbours"  # Float ties only
+            line += f"   per-player loop {t_legacy:8.1f} ms ({t_legacy / t_index:.1f}x)"
+        print(line)
+
+if __name__ == "__main__":
+    main()
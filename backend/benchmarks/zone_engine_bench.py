@@ -0,0 +1,112 @@
+"""
+Benchmark for the shared zone engine (scrapers/zone_engine.py).
+
+    python benchmarks/zone_engine_bench.py --seasons 5 --players 550
+
+Builds synthetic shot-location and assist-network tables for several seasons
+(one row per player-season), runs the old per-row loops from shooting_zones
+and assist_zones alongside the vectorized versions, checks that the outputs
+are identical and reports the time each takes.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scrapers"))
+from shooting_zones import get_all_player_zone_distributions, ZONE_ORDER  # noqa: E402
+from assist_zones import get_player_distributions  # noqa: E402
+
+# ---- Per-row reference implementations (the loops the engine replaced) ----
+def _round_row(distribution, makes):
+    raw_pcts = {zone: val * 100 for zone, val in distribution.items()}
+    int_pcts = {zone: int(val) for zone, val in raw_pcts.items()}
+    remainders = {zone: val - int(val) for zone, val in raw_pcts.items()}
+    shortfall = 100 - sum(int_pcts.values())
+    sorted_zones_by_remainder = sorted(remainders.keys(), key=lambda k: remainders[k], reverse=True)
+    for i in range(shortfall):
+        int_pcts[sorted_zones_by_remainder[i]] += 1
+    return {zone: {"percentage": f"{int_pcts[zone]}%", "makes": str(int(makes[zone]))} for zone in int_pcts}
+
+def legacy_shooting(df):
+    results = {}
+    for _, p in df.fillna(0).iterrows():
+        total_fga = sum(p[f"{prefix}_FGA"] for prefix in ZONE_ORDER)
+        if total_fga == 0:
+            continue
+        distribution = {zone: p[f"{prefix}_FGA"] / total_fga for prefix, zone in ZONE_ORDER.items()}
+        makes = {zone: p[f"{prefix}_FGM"] for prefix, zone in ZONE_ORDER.items()}
+        results[p["PLAYER_NAME"]] = _round_row(distribution, makes)
+    return results
+
+def legacy_assists(all_player_stats):
+    results = {}
+    for p_name, stats in all_player_stats.items():
+        total = stats['Total']
+        if total == 0:
+            continue
+        makes = {
+            'restricted_area': stats['Rim'],
+            'mid_range': stats['Mid'],
+            'left_corner': stats['Corner3'] / 2,
+            'right_corner': stats['Corner3'] / 2,
+            'top_key': stats['Arc3']
+        }
+        results[p_name] = _round_row({zone: val / total for zone, val in makes.items()}, makes)
+    return results
+
+# ---- Synthetic data ----
+def make_shooting(rng, n_rows):
+    df = pd.DataFrame({"PLAYER_ID": np.arange(n_rows), "PLAYER_NAME": [f"Player {i}" for i in range(n_rows)]})
+    for prefix in ZONE_ORDER:
+        fga = rng.poisson(rng.uniform(0, 250), n_rows)
+        df[f"{prefix}_FGA"] = fga
+        df[f"{prefix}_FGM"] = rng.binomial(fga, 0.45)
+    df.loc[rng.random(n_rows) < 0.02, [f"{p}_FGA" for p in ZONE_ORDER]] = 0  # DNP rows
+    return df
+
+def make_assists(rng, n_rows):
+    stats = {}
+    for i in range(n_rows):
+        rim, mid, corner3, arc3 = (int(v) for v in rng.poisson([60, 25, 15, 40]))
+        total = rim + mid + corner3 + arc3 if rng.random() > 0.02 else 0
+        stats[f"Player {i}"] = {'Rim': rim, 'Mid': mid, 'Corner3': corner3, 'Arc3': arc3, 'Total': total}
+    return stats
+
+def timed(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--players", type=int, default=550, help="Players per season")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n_rows = args.seasons * args.players
+    shooting_df = make_shooting(rng, n_rows)
+    assist_stats = make_assists(rng, n_rows)
+
+    print(f"📊 {args.seasons} seasons x {args.players} players = {n_rows} rows (best of {args.repeat})")
+    for label, legacy, vectorized, data in (
+        ("shooting", legacy_shooting, get_all_player_zone_distributions, shooting_df),
+        ("assists", legacy_assists, get_player_distributions, assist_stats),
+    ):
+        expected, t_legacy = timed(legacy, data, args.repeat)
+        actual, t_vector = timed(vectorized, data, args.repeat)
+        assert actual == expected, f"{label}: vectorized output differs from the per-row loop"
+        print(f"   {label:<9} per-row {t_legacy:8.1f} ms   vectorized {t_vector:7.1f} ms   "
+              f"({t_legacy / t_vector:.1f}x, {len(actual)} players)")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import time
+import random
+import argparse
 import pandas as pd
 import concurrent.futures
+import threading
 import os
 import sys
 
@@ -16,110 +19,373 @@ from scrapers import fetch_todays_games as schedule
 from scrapers import shooting_zones as shooting_zones
 from scrapers import assist_zones as assist_zones
 from utils import aggregator
+from utils import season_averages
+from utils.publisher import ArtifactPublisher
+from utils.poll_status import PollStatus, STATUS_FILE
 import json
 
 # CONFIGURATION
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "data", "current")
-os.makedirs(DATA_DIR, exist_ok=True)
-
-# Define Paths
-STATS_PATH = os.path.join(DATA_DIR, "season_stats.csv")
-DK_PATH = os.path.join(DATA_DIR, "draftkings.csv")
-FD_PATH = os.path.join(DATA_DIR, "fanduel.csv")
-LOGS_PATH = os.path.join(DATA_DIR, "gamelogs.csv")
-MASTER_PATH = os.path.join(DATA_DIR, "master_feed.json")
-GAMES_PATH = os.path.join(DATA_DIR, "nba_dashboard_games.json")
-SHOOTING_PATH = os.path.join(DATA_DIR, "shooting_zones.json")
-ASSISTS_PATH = os.path.join(DATA_DIR, "assist_zones.json")
-
-def run_dk():
+DATA_ROOT = os.path.join(BASE_DIR, "data")
+DATA_DIR = os.path.join(DATA_ROOT, "current")  # Live generation (symlink flipped by utils/publisher.py)
+STORE_DIR = os.path.join(DATA_ROOT, "store")   # Persistent stores (not published artifacts)
+KEEP_GENERATIONS = 5
+
+# Artifact names (each run writes them into its own staging directory)
+STATS_FILE = "season_stats.csv"
+DK_FILE = "draftkings.csv"
+FD_FILE = "fanduel.csv"
+MASTER_FILE = "master_feed.json"
+BINARY_FEED_FILE = "master_feed.bin"  # mmap-able, O(1) per-player lookups
+GAMES_FILE = "nba_dashboard_games.json"
+SHOOTING_FILE = "shooting_zones.json"
+ASSISTS_FILE = "assist_zones.json"
+# Served side by side, so a generation never mixes a new JSON feed with an old binary one
+FEED_GROUP = (MASTER_FILE, BINARY_FEED_FILE)
+
+LOGS_PATH = os.path.join(DATA_DIR, "gamelogs.csv")  # Legacy single-file logs (migrated once)
+LOGS_STORE_DIR = os.path.join(STORE_DIR, "gamelogs")
+ODDS_HISTORY_DIR = os.path.join(STORE_DIR, "odds_history")
+SHOOTING_STORE_DIR = os.path.join(STORE_DIR, "shooting_zones")
+SEASON_TOTALS_DIR = os.path.join(STORE_DIR, "season_totals")
+ASSIST_STORE_DIR = os.path.join(STORE_DIR, "assist_networks")
+DEFENSE_STORE_DIR = os.path.join(STORE_DIR, "defense")  # Per-game allowed totals (defense_cube.py)
+ROLLING_STORE_DIR = os.path.join(STORE_DIR, "rolling")  # Per-player rolling-feature state (rolling_state.py)
+STATS_REFERENCE_PATH = os.path.join(SEASON_TOTALS_DIR, "reference.parquet")  # Last remote snapshot
+
+# Season averages: "remote" always calls stats.nba.com. "local" derives them from the
+# game-log store and only calls it every RECONCILE_HOURS as a check, but falls back to
+# remote until the store is backfilled to the season opener and a reconciliation agrees
+STATS_SOURCE = "remote"
+RECONCILE_HOURS = 24
+
+# Feed layout: columnar game logs (compact) or the legacy list of row dicts
+COLUMNAR_GAME_LOGS = True
+# Precompressed companions written alongside master_feed.json (master_feed.json.gz / .br)
+FEED_COMPRESSION = ("gzip", "brotli")
+
+# Daemon mode (--daemon): sportsbooks every ODDS_INTERVAL_SECONDS (+/- ODDS_JITTER of it),
+# everything else (stats, logs, schedule, zones) in a full run every STATS_INTERVAL_SECONDS
+ODDS_INTERVAL_SECONDS = 60
+ODDS_JITTER = 0.2
+STATS_INTERVAL_SECONDS = 6 * 3600
+STATUS_PATH = os.path.join(DATA_ROOT, STATUS_FILE)  # Read by api_server's /api/status
+# The daemon runs the full run on a background thread while odds ticks continue; only
+# reading the live generation, aggregating and committing are serialized
+PUBLISH_LOCK = threading.Lock()
+
+def write_json(path, data, **kwargs):
+    """Writes JSON via a temp file so a carried-over hard link is never rewritten in place."""
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(path + ".tmp", path)
+
+def run_dk(out_dir, status=None):
     print("   🔵 Starting DraftKings...")
-    data = draftkings.fetch_dk_odds()
-    df = pd.DataFrame(data)
-    df.to_csv(DK_PATH, index=False)
+    df = run_book("dk", draftkings.fetch_dk_odds, status)
+    df.to_csv(os.path.join(out_dir, DK_FILE), index=False)
     return f"DraftKings: {len(df)} rows"
 
-def run_fd():
+def run_fd(out_dir, status=None):
     print("   🔵 Starting FanDuel...")
-    data = fanduel.fetch_odds()
-    df = pd.DataFrame(data)
-    df.to_csv(FD_PATH, index=False)
+    df = run_book("fd", fanduel.fetch_odds, status)
+    df.to_csv(os.path.join(out_dir, FD_FILE), index=False)
     return f"FanDuel: {len(df)} rows"
 
-def run_stats():
+def run_book(book, fetch, status=None):
+    """
+    Runs one sportsbook scraper, recording its latency and outcome on the daemon status.
+    Raises when the scraper failed (fully or for some markets) or returned no rows, so
+    no CSV is written and publisher.carry_over() keeps the book's last quotes instead
+    of publishing them all as removed.
+    """
+    start = time.time()
+    try:
+        df = pd.DataFrame(fetch())
+        if df.empty:
+            raise RuntimeError(f"{book}: no rows, keeping the previous quotes")
+    except Exception as e:
+        if status is not None:
+            status.record_book(book, 0, time.time() - start, error=str(e))
+        raise
+    if status is not None:
+        status.record_book(book, len(df), time.time() - start, error=None)
+    return df
+
+def use_local_stats():
+    """True when this run's season averages come from the game-log store (see STATS_SOURCE)."""
+    if STATS_SOURCE != "local":
+        return False
+    trusted, reason = season_averages.local_stats_trusted(LOGS_STORE_DIR, SEASON_TOTALS_DIR)
+    if not trusted:
+        print(f"   ⚠️ Local season stats not trusted ({reason}), using stats.nba.com")
+    return trusted
+
+def run_stats(out_dir, local=False):
+    if local:
+        return run_stats_reference()
     print("   🟠 Starting Season Stats...")
     engine = nba_stats.NBAStatsEngine()
     df = engine.get_player_data()
-    df.to_csv(STATS_PATH, index=False)
+    df.to_csv(os.path.join(out_dir, STATS_FILE), index=False)
+    if STATS_SOURCE == "local" and not df.empty:
+        save_reference(df)  # Reconciled against the local build after the logs stage
     return f"Season Stats: {len(df)} players"
 
-def run_logs():
+def save_reference(df):
+    os.makedirs(SEASON_TOTALS_DIR, exist_ok=True)
+    df.to_parquet(STATS_REFERENCE_PATH + ".tmp", index=False)
+    os.replace(STATS_REFERENCE_PATH + ".tmp", STATS_REFERENCE_PATH)
+
+def run_stats_reference():
+    """Refreshes the remote reconciliation snapshot when it is older than RECONCILE_HOURS."""
+    if os.path.exists(STATS_REFERENCE_PATH) and \
+            time.time() - os.path.getmtime(STATS_REFERENCE_PATH) < RECONCILE_HOURS * 3600:
+        return "Season Stats: reference fresh, deriving locally"
+    print("   🟠 Starting Season Stats (reconciliation reference)...")
+    df = nba_stats.NBAStatsEngine().get_player_data()
+    if df.empty:
+        return "Season Stats: reference fetch failed"
+    save_reference(df)
+    return f"Season Stats: reference refreshed ({len(df)} players)"
+
+def run_local_stats(out_dir, run_started, local):
+    """
+    Season averages from the game-log store (after the logs stage has updated it),
+    reconciled whenever this run fetched a fresh reference. When `local` (see
+    use_local_stats) they replace the remote numbers unless the reconciliation
+    disagrees; otherwise run_stats already wrote the remote ones and this only checks.
+    """
+    reference = pd.read_parquet(STATS_REFERENCE_PATH) if os.path.exists(STATS_REFERENCE_PATH) else None
+    df = season_averages.build_season_stats(LOGS_STORE_DIR, SEASON_TOTALS_DIR, reference)
+    agrees = True
+    if not df.empty and reference is not None and os.path.getmtime(STATS_REFERENCE_PATH) >= run_started:
+        issues = season_averages.reconcile(df, reference)
+        season_averages.save_verdict(SEASON_TOTALS_DIR, issues)
+        print(f"   🔍 Reconciliation: {len(issues)} differences vs stats.nba.com")
+        if not issues.empty:
+            print(issues.head(10).to_string(index=False))
+        agrees = issues.empty
+
+    if not local:
+        return "Season Stats (local): checked only, serving stats.nba.com"
+    if df.empty or not agrees:
+        if reference is None:
+            return "Season Stats: no local logs or reference yet"
+        df = reference  # Serve the remote numbers until the local ones agree again
+    df.to_csv(os.path.join(out_dir, STATS_FILE), index=False)
+    return f"Season Stats ({'local' if df is not reference else 'stats.nba.com'}): {len(df)} players"
+
+def run_logs(out_dir):
     print("   🟣 Starting Game Logs (Incremental)...")
     # This runs the fast update
-    gamelogs.run_scrape(LOGS_PATH)
+    gamelogs.run_scrape(LOGS_STORE_DIR, legacy_csv_path=LOGS_PATH)
     return "Game Logs Updated"
 
-def run_schedule():
+def run_schedule(out_dir):
     print("   📅 Starting Game Schedule...")
-    # This scraper saves its own file, so we just run it
-    df, _ = schedule.get_dashboard_data()
-    # Ensure it saves to the right place via the imported module if needed, 
-    # but based on previous edit it saves to ../data/current/nba_dashboard_games.json relative to itself.
-    # To be safe, we can rely on its internal saving or explicit save here if it returned raw data.
-    # The previous edit to fetch_todays_games.py handles the saving.
+    df, raw_data = schedule.get_dashboard_data()
+    write_json(os.path.join(out_dir, GAMES_FILE), raw_data, indent=2, default=str)
     return f"Schedule: {len(df)} games"
 
-def run_shooting_zones():
+def run_shooting_zones(out_dir):
     print("   🏀 Starting Shooting Zones...")
-    data = shooting_zones.get_shooting_zones_data()
-    with open(SHOOTING_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+    data = shooting_zones.get_shooting_zones_data(SHOOTING_STORE_DIR)
+    write_json(os.path.join(out_dir, SHOOTING_FILE), data, indent=4)
     return f"Shooting Zones: {len(data)} players"
 
-def run_assist_zones():
+def run_assist_zones(out_dir):
     print("   🤝 Starting Assist Zones...")
-    data = assist_zones.get_assist_zones_data()
-    with open(ASSISTS_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+    data = assist_zones.get_assist_zones_data(ASSIST_STORE_DIR)
+    write_json(os.path.join(out_dir, ASSISTS_FILE), data, indent=4)
     return f"Assist Zones: {len(data)} players"
 
-def main():
+def run_full(status=None, books=True):
+    """
+    One complete pipeline run (every scraper, aggregation, publish).
+    books=False leaves the sportsbooks to the daemon's odds ticks and aggregates
+    the live generation's odds CSVs (the latest tick's) instead.
+    """
     start_time = time.time()
     print("🚀 PIPELINE STARTED")
 
-    # STEP 1: Run Scrapers (Parallel)
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(run_dk),
-            executor.submit(run_fd),
-            executor.submit(run_stats),
-            executor.submit(run_logs),
-            executor.submit(run_schedule),
-            executor.submit(run_shooting_zones),
-            executor.submit(run_assist_zones)
-        ]
-        
-        for future in concurrent.futures.as_completed(futures):
+    # Every stage writes into a private staging generation; readers keep seeing
+    # the previous one until it is published in a single atomic flip.
+    publisher = ArtifactPublisher(DATA_ROOT, keep=KEEP_GENERATIONS)
+    stage_dir = publisher.begin()
+    local_stats = use_local_stats()
+
+    try:
+        # STEP 1: Run Scrapers (Parallel)
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(run_stats, stage_dir, local_stats),
+                executor.submit(run_logs, stage_dir),
+                executor.submit(run_schedule, stage_dir),
+                executor.submit(run_shooting_zones, stage_dir),
+                executor.submit(run_assist_zones, stage_dir)
+            ]
+            if books:
+                futures += [executor.submit(run_dk, stage_dir, status), executor.submit(run_fd, stage_dir, status)]
+
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    print(f"   ✅ {future.result()}")
+                except Exception as e:
+                    print(f"   ❌ Scraper Failed: {e}")
+
+        # Season averages are derived from (or checked against) the freshly updated game-log store
+        if STATS_SOURCE == "local":
             try:
-                print(f"   ✅ {future.result()}")
+                print(f"   ✅ {run_local_stats(stage_dir, start_time, local_stats)}")
             except Exception as e:
-                print(f"   ❌ Scraper Failed: {e}")
-
-    # STEP 2: Run Aggregator
-    print("\n🔗 Running Aggregator...")
-    aggregator.run_aggregation(
-        stats_path=STATS_PATH,
-        dk_path=DK_PATH,
-        fd_path=FD_PATH,
-        logs_path=LOGS_PATH, 
-        shooting_path=SHOOTING_PATH,
-        assists_path=ASSISTS_PATH,
-        output_path=MASTER_PATH
-    )
+                print(f"   ❌ Local season stats failed: {e}")
+
+        with PUBLISH_LOCK:
+            # Failed stages fall back to the previous generation's artifact
+            carried = publisher.carry_over()
+            if carried:
+                print(f"   ↪️ Reusing previous: {', '.join(sorted(carried))}")
+
+            # STEP 2: Run Aggregator
+            print("\n🔗 Running Aggregator...")
+            aggregator.run_aggregation(
+                stats_path=publisher.path(STATS_FILE),
+                dk_path=publisher.path(DK_FILE),
+                fd_path=publisher.path(FD_FILE),
+                logs_path=LOGS_STORE_DIR,
+                shooting_path=publisher.path(SHOOTING_FILE),
+                assists_path=publisher.path(ASSISTS_FILE),
+                output_path=publisher.path(MASTER_FILE),
+                columnar_logs=COLUMNAR_GAME_LOGS,
+                compress=FEED_COMPRESSION,
+                binary_path=publisher.path(BINARY_FEED_FILE),
+                odds_history_path=ODDS_HISTORY_DIR,
+                games_path=publisher.path(GAMES_FILE),
+                defense_state_dir=DEFENSE_STORE_DIR,
+                rolling_state_dir=ROLLING_STORE_DIR
+            )
+            publisher.carry_over(groups=[FEED_GROUP])  # Keep the last good feed if aggregation failed
+
+            # STEP 3: Publish
+            published = publisher.commit()
+        print(f"   📤 Published generation {os.path.basename(published)}")
+    except BaseException:
+        publisher.abort()
+        raise
 
     total_time = time.time() - start_time
     print(f"\n✨ PIPELINE COMPLETE in {total_time:.2f} seconds")
+    return os.path.basename(published)
+
+def run_odds_tick(status=None):
+    """
+    Sportsbooks only: scrapes DK and FD, rebuilds just the props of the live
+    feed and publishes that as a new generation (other artifacts carried over).
+    """
+    publisher = ArtifactPublisher(DATA_ROOT, keep=KEEP_GENERATIONS)
+    stage_dir = publisher.begin()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(run_dk, stage_dir, status), executor.submit(run_fd, stage_dir, status)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    print(f"   ✅ {future.result()}")
+                except Exception as e:
+                    print(f"   ❌ Scraper Failed: {e}")
+
+        with PUBLISH_LOCK:  # A full run may have published since the scrape started
+            live_feed = os.path.join(publisher.current_dir or DATA_DIR, MASTER_FILE)
+            # A failed book keeps its previous CSV; everything else (including the feed,
+            # until refresh_props replaces it) is linked from the live generation
+            publisher.carry_over()
+            aggregator.refresh_props(
+                live_feed,
+                dk_path=publisher.path(DK_FILE),
+                fd_path=publisher.path(FD_FILE),
+                output_path=publisher.path(MASTER_FILE),
+                compress=FEED_COMPRESSION,
+                binary_path=publisher.path(BINARY_FEED_FILE),
+                odds_history_path=ODDS_HISTORY_DIR,
+                logs_path=LOGS_STORE_DIR
+            )
+            publisher.carry_over(groups=[FEED_GROUP])  # Undo a half-written feed pair
+            published = publisher.commit()
+    except BaseException:
+        publisher.abort()
+        raise
+    return os.path.basename(published)
+
+def run_daemon(odds_interval=ODDS_INTERVAL_SECONDS, stats_interval=STATS_INTERVAL_SECONDS, jitter=ODDS_JITTER):
+    """
+    Polls the sportsbooks every odds_interval seconds (randomised by +/- jitter)
+    and starts a full run every stats_interval seconds on a background thread,
+    so its slow stats scrapes never hold up the odds. A failed tick is logged
+    and the next one runs on schedule. Tick latency and per-book staleness are
+    written to STATUS_PATH after every tick.
+    """
+    status = PollStatus(STATUS_PATH, config={
+        "odds_interval": odds_interval, "stats_interval": stats_interval, "jitter": jitter
+    })
+    print(f"🔁 DAEMON STARTED (odds every {odds_interval}s ±{jitter:.0%}, full run every {stats_interval}s)")
+    full_runner = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    full, full_started = None, None
+    next_full = time.time()  # A full run first, so there is a feed to refresh
+    try:
+        while True:
+            if full is not None and full.done():
+                generation = None
+                try:
+                    generation = full.result()
+                except Exception as e:
+                    print(f"   ❌ Full run failed: {e}")
+                # A failed full run is retried on the next tick
+                next_full = full_started + stats_interval if generation is not None else time.time()
+                status.record_tick("full", time.time() - full_started, generation)
+                full = None
+            if full is None and time.time() >= next_full:
+                full_started = time.time()
+                full = full_runner.submit(run_full, None, False)  # The odds ticks scrape the books
+            status.next_full_at = None if full is not None else next_full
+
+            tick_start = time.time()
+            generation = None
+            try:
+                generation = run_odds_tick(status)
+            except Exception as e:
+                print(f"   ❌ Odds tick failed: {e}")
+            elapsed = time.time() - tick_start
+            status.record_tick("odds", elapsed, generation)
+            status.save()
+
+            stale = ", ".join(f"{book} {b['staleness_seconds']:.0f}s" if b.get("staleness_seconds") is not None
+                              else f"{book} never" for book, b in status.books.items())
+            running = f", full run {time.time() - full_started:.0f}s in" if full is not None else ""
+            print(f"   ⏱️ odds tick in {elapsed:.1f}s (staleness: {stale or 'n/a'}{running})")
+
+            # Jitter keeps the request pattern from being perfectly periodic
+            delay = odds_interval * random.uniform(1 - jitter, 1 + jitter)
+            time.sleep(max(0.0, delay - elapsed))
+    finally:
+        if full is not None and not full.done():
+            print("   ⏳ Waiting for the running full run to finish...")
+        full_runner.shutdown(wait=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape odds and stats, aggregate and publish the feed.")
+    parser.add_argument("--daemon", action="store_true", help="Keep polling odds instead of running once")
+    parser.add_argument("--odds-interval", type=float, default=ODDS_INTERVAL_SECONDS)
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL_SECONDS)
+    parser.add_argument("--jitter", type=float, default=ODDS_JITTER, help="Fraction of the odds interval")
+    args = parser.parse_args()
+
+    if not args.daemon:
+        run_full()
+        return
+    try:
+        run_daemon(args.odds_interval, args.stats_interval, args.jitter)
+    except KeyboardInterrupt:
+        print("\n👋 Daemon stopped")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,53 @@
+import numpy as np
 import pandas as pd
 import requests
 import os
+import sys
+import json
+import time
+import hashlib
 import concurrent.futures
+from datetime import datetime
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from fetch_todays_games import get_team_last_final_dates
+from zone_engine import zone_distributions
+
+# Allow `from utils...` when run standalone from the scrapers folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fetch_manifest import FetchManifest, STATUS_OK, STATUS_FAILED
 
 # --- CONFIGURATION ---
 STATS_FILE = os.path.join(os.path.dirname(__file__), '../data/current/season_stats.csv')
+URL = "https://api.pbpstats.com/get-assist-networks/nba"
+MAX_WORKERS = 5
+TIMEOUT = (5, 30)               # (connect, read) seconds
+ZONES = ['restricted_area', 'mid_range', 'left_corner', 'right_corner', 'top_key']
+NETWORKS_FILE = "teams.json"    # {team_id: {"through": "YYYY-MM-DD", "fetched_at": epoch, "players": {...}}}
+MANIFEST_FILE = "_manifest.json" # Fetch status per (team, last final date), see utils/fetch_manifest.py
+NETWORK_PART = "AssistNetwork"
+# pbpstats can lag the schedule, so (as in gamelogs.py) a network fetched soon after a
+# team's game is refetched every REVALIDATE_HOURS until a fetch made FINALIZE_AFTER_HOURS
+# after the game date marks it final
+REVALIDATE_HOURS = 6
+FINALIZE_AFTER_HOURS = 36
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://www.pbpstats.com/",
+    "Origin": "https://www.pbpstats.com",
+    "Accept": "application/json, text/plain, */*",
+    "Connection": "keep-alive"
+}
+
+def create_session(pool_size=MAX_WORKERS):
+    """One keep-alive session shared by every team request."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(connect=3, read=3, redirect=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    return session
 
 def get_all_team_ids():
     if not os.path.exists(STATS_FILE):
@@ -18,30 +59,18 @@ def get_all_team_ids():
         print(f"Error reading stats file: {e}")
         return []
 
-def fetch_team_assists(team_id, season="2025-26"):
-    url = "https://api.pbpstats.com/get-assist-networks/nba"
+def fetch_team_assists(team_id, season="2025-26", session=None):
+    """Per-passer assist totals by zone for one team, or None if the request failed."""
     params = {
         "Season": season,
         "SeasonType": "Regular Season",
         "EntityId": int(team_id),
         "EntityType": "Team"
     }
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Referer": "https://www.pbpstats.com/",
-        "Origin": "https://www.pbpstats.com",
-        "Accept": "application/json, text/plain, */*",
-        "Connection": "keep-alive"
-    }
-
-    session = requests.Session()
-    retry = Retry(connect=3, read=3, redirect=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('https://', adapter)
+    session = session or create_session(pool_size=1)
 
     try:
-        response = session.get(url, params=params, headers=headers, timeout=45)
+        response = session.get(URL, params=params, timeout=TIMEOUT)
         response.raise_for_status()
         data = response.json()
         
@@ -67,66 +96,119 @@ def fetch_team_assists(team_id, season="2025-26"):
         return player_totals
     except Exception as e:
         print(f"Error fetching PBPStats for team {team_id}: {e}")
-        return {}
+        return None
 
-def get_assist_zones_data():
-    """Fetches and transforms assist data for all players."""
-    team_ids = get_all_team_ids()
-    all_player_stats = {}
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_tid = {executor.submit(fetch_team_assists, tid): tid for tid in team_ids}
+def fetch_teams(team_ids):
+    """{team_id: player_totals} for the teams that fetched successfully (one pooled session)."""
+    networks = {}
+    session = create_session()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_tid = {executor.submit(fetch_team_assists, tid, session=session): tid for tid in team_ids}
         for future in concurrent.futures.as_completed(future_to_tid):
             tid = future_to_tid[future]
             try:
                 team_stats = future.result()
-                all_player_stats.update(team_stats)
+                if team_stats is not None:
+                    networks[tid] = team_stats
             except Exception as e:
                 print(f"Team {tid} generated an exception: {e}")
+    session.close()
+    return networks
 
-    results = {}
-    for p_name, stats in all_player_stats.items():
-        total = stats['Total']
-        if total == 0:
-            continue
-            
-        # Distribute percentages smartly exactly to 100%
-        distribution = {
-            'restricted_area': stats['Rim'] / total,
-            'mid_range': stats['Mid'] / total,
-            'left_corner': (stats['Corner3'] / 2) / total,
-            'right_corner': (stats['Corner3'] / 2) / total,
-            'top_key': stats['Arc3'] / total
-        }
-        
-        makes = {
-            'restricted_area': stats['Rim'],
-            'mid_range': stats['Mid'],
-            'left_corner': stats['Corner3'] / 2,
-            'right_corner': stats['Corner3'] / 2,
-            'top_key': stats['Arc3']
-        }
-        
-        raw_pcts = {zone: val * 100 for zone, val in distribution.items()}
-        int_pcts = {zone: int(val) for zone, val in raw_pcts.items()}
-        remainders = {zone: val - int(val) for zone, val in raw_pcts.items()}
-        
-        shortfall = 100 - sum(int_pcts.values())
-        sorted_zones_by_remainder = sorted(remainders.keys(), key=lambda k: remainders[k], reverse=True)
-        
-        for i in range(shortfall):
-            zone_to_bump = sorted_zones_by_remainder[i]
-            int_pcts[zone_to_bump] += 1
-            
-        results[p_name] = {
-            zone: {
-                "percentage": f"{int_pcts[zone]}%",
-                "makes": str(int(makes[zone]))
-            }
-            for zone in int_pcts.keys()
-        }
-        
-    return results
+def _load_networks(store_dir):
+    try:
+        with open(os.path.join(store_dir, NETWORKS_FILE)) as f:
+            return {int(tid): entry for tid, entry in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def _save_networks(store_dir, networks):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, NETWORKS_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({str(tid): entry for tid, entry in networks.items()}, f)
+    os.replace(path + ".tmp", path)
+
+def _network_key(tid, through):
+    """Manifest key: one team's network as of its last final game."""
+    return f"{tid}@{through}"
+
+def _network_hash(players):
+    return hashlib.sha1(json.dumps(players, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _settled_at(through):
+    if not through:
+        return 0  # No game played yet: nothing can still arrive
+    return datetime.strptime(through, "%Y-%m-%d").timestamp() + FINALIZE_AFTER_HOURS * 3600
+
+def update_team_networks(store_dir, now=None):
+    """
+    Refetches only the teams whose network is not final for their last final
+    game (all teams the first time); returns every team's network.
+    """
+    now = now or time.time()
+    stored = _load_networks(store_dir)
+    manifest = FetchManifest(os.path.join(store_dir, MANIFEST_FILE))
+    try:
+        last_final = {int(tid): date for tid, date in get_team_last_final_dates().items()}
+    except Exception as e:
+        print(f"   ⚠️ Schedule unavailable ({type(e).__name__}), refetching every team's assist network")
+        last_final = None
+
+    team_ids = {int(tid) for tid in get_all_team_ids()} | set(stored) | set(last_final or {})
+    if last_final is None:
+        keys = {}
+        stale = sorted(team_ids)
+    else:
+        keys = {tid: _network_key(tid, last_final.get(tid, "")) for tid in team_ids}
+        stale = sorted(tid for tid in team_ids
+                       if tid not in stored or manifest.due(keys[tid], [NETWORK_PART], REVALIDATE_HOURS * 3600, now))
+
+    fetched = fetch_teams(stale) if stale else {}
+    changed = 0
+    for tid, players in fetched.items():
+        # Without the schedule we cannot date the network: leave "through" empty so it is refetched
+        through = last_final.get(tid, "") if last_final is not None else ""
+        stored[tid] = {"through": through, "fetched_at": now, "players": players}
+        if tid in keys:
+            changed += manifest.record(keys[tid], NETWORK_PART, STATUS_OK, _network_hash(players), len(players), now)
+            manifest.finalize(keys[tid], [NETWORK_PART], _settled_at(through))
+    for tid in set(stale) - set(fetched):
+        if tid in keys:
+            manifest.record(keys[tid], NETWORK_PART, STATUS_FAILED, now=now)
+    if fetched:
+        _save_networks(store_dir, stored)
+    if keys:
+        # Only each team's current game is tracked; older keys are superseded
+        current = set(keys.values())
+        manifest.entries = {key: entry for key, entry in manifest.entries.items() if key in current}
+        manifest.save()
+
+    print(f"   🤝 Assist networks: refetched {len(fetched)}/{len(stale)} unsettled teams ({changed} changed), "
+          f"{len(team_ids) - len(stale)} final")
+    return {tid: entry["players"] for tid, entry in stored.items()}
+
+def get_assist_zones_data(store_dir=None):
+    """Fetches and transforms assist data for all players (incremental when a store_dir is given)."""
+    if store_dir:
+        networks = update_team_networks(store_dir)
+    else:
+        networks = fetch_teams(get_all_team_ids())
+
+    all_player_stats = {}
+    for tid in sorted(networks):
+        all_player_stats.update(networks[tid])
+
+    return get_player_distributions(all_player_stats)
+
+def get_player_distributions(all_player_stats):
+    """{player: {zone: {"percentage", "makes"}}}; corner threes are split evenly left/right."""
+    names = list(all_player_stats.keys())
+    counts = np.array([[s['Rim'], s['Mid'], s['Corner3'] / 2, s['Corner3'] / 2, s['Arc3']]
+                       for s in all_player_stats.values()], dtype=np.float64).reshape(-1, len(ZONES))
+    totals = np.array([s['Total'] for s in all_player_stats.values()], dtype=np.float64)
+    # Shares are of the total assisted value, so the counts double as the "makes"
+    return zone_distributions(names, counts, counts, ZONES, totals)
 
 def main():
     print("Fetching all assist zones...")
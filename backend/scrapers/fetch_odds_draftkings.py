@@ -2,6 +2,11 @@ import requests
 import time
 import random
 import re
+import threading
+import concurrent.futures
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from market_cache import MarketCache
 from datetime import datetime
 from dateutil import tz
 
@@ -31,6 +36,43 @@ PLAYER_PROP_CATEGORIES = {
     'stocks': '13781'
 }
 
+MAX_WORKERS = len(PLAYER_PROP_CATEGORIES)  # Every category in flight at once...
+REQUESTS_PER_SECOND = 10                    # ...but request starts are spaced out
+TIMEOUT = 15
+
+# Market names look like "Jayson Tatum Points O/U": the player is everything before the first stat word or number
+REMOVE_TERMS = ["Points", "Rebounds", "Assists", "Threes", "Three", "Pointers", "Pointer", "3-Point", "Steals", "Blocks", "Turnovers", "O/U", "+", "Made"]
+NAME_STOP = re.compile(r"(?:^|\s)(?:" + "|".join(map(re.escape, REMOVE_TERMS)) + r"|\d+)(?=\s|$)")
+EASTERN = tz.gettz('America/New_York')
+PARSE_CACHE = MarketCache("DraftKings")  # Reused across refreshes of the same process
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart (with a little jitter) across threads."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_at)
+            self.next_at = start_at + self.interval * random.uniform(1.0, 1.5)
+        time.sleep(max(0.0, start_at - now))
+
+def create_session(pool_size=MAX_WORKERS):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size))
+    return session
+
+def extract_player_name(market_name):
+    """'Jayson Tatum Points O/U' -> 'Jayson Tatum'."""
+    match = NAME_STOP.search(market_name)
+    name = market_name[:match.start()] if match else market_name
+    return " ".join(name.split())
+
 def normalize_player_name(name):
     if not name: return "unknown_player"
     name = name.lower().strip()
@@ -70,7 +112,7 @@ def format_odds_for_display(odds_int):
         return f"+{odds_int}"
     return str(odds_int)
 
-def fetch_category(subcategory_id, prop_label):
+def fetch_category(subcategory_id, prop_label, session=None):
     timestamp = int(time.time() * 1000)
     url = (
         f"{DK_API_BASE}?isBatchable=false&templateVars={LEAGUE_ID}%2C{subcategory_id}"
@@ -80,21 +122,37 @@ def fetch_category(subcategory_id, prop_label):
     )
     
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = (session or requests).get(url, headers=HEADERS, timeout=TIMEOUT)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         print(f"  ❌ Error fetching {prop_label}: {e}")
         return None
 
-def parse_dk_data(data, prop_type_key):
+def parse_dk_data(data, prop_type_key, cache=None):
     if not data: return []
     
     events = data.get('events', [])
     markets = data.get('markets', [])
     selections = data.get('selections', [])
     
-    event_map = {e['id']: e for e in events}
+    # Event metadata is parsed once per payload, not once per market
+    today = datetime.now().strftime('%Y-%m-%d')
+    event_info = {}
+    for event in events:
+        game_date = today
+        start_date = event.get('startEventDate')
+        if start_date:
+            try:
+                dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+                game_date = dt.astimezone(EASTERN).strftime('%Y-%m-%d')
+            except: pass
+        # DK typically has teamName1, teamName2, teamShortName1, teamShortName2
+        # We can't easily link the player directly to the team without more parsing,
+        # but we can return the matchup or both teams to help the matcher.
+        event_info[event['id']] = (event.get('name', 'Unknown'), event.get('teamShortName1', 'UNK'),
+                                   event.get('teamShortName2', 'UNK'), game_date)
+    unknown_event = ('Unknown', 'UNK', 'UNK', today)
     
     # Map Selections by MarketId
     selections_by_market = {}
@@ -110,90 +168,94 @@ def parse_dk_data(data, prop_type_key):
     for market in markets:
         m_id = market.get('id')
         market_outcomes = selections_by_market.get(m_id, [])
+        event = event_info.get(market.get('eventId'), unknown_event)
+        if cache is None:
+            parsed.extend(parse_market(market, market_outcomes, event, prop_type_key))
+        else:
+            parsed.extend(cache.parse((prop_type_key, m_id), (market, market_outcomes, event),
+                                      lambda: parse_market(market, market_outcomes, event, prop_type_key)))
         
-        if len(market_outcomes) < 2: continue
+    return parsed
 
-        # Identify Over/Under
-        over_sel = None
-        under_sel = None
-        
-        for sel in market_outcomes:
-            label = sel.get('label', '').lower()
-            outcome_type = sel.get('outcomeType', '').lower()
-            
-            if 'over' in label or 'over' in outcome_type: over_sel = sel
-            elif 'under' in label or 'under' in outcome_type: under_sel = sel
-        
-        if not over_sel or not under_sel: continue
-
-        # Extract Name
-        market_name = market.get('name', '')
-        remove_terms = ["Points", "Rebounds", "Assists", "Threes", "Three", "Pointers", "Pointer", "3-Point", "Steals", "Blocks", "Turnovers", "O/U", "+", "Made"]
-        clean_name = market_name
-        tokens = clean_name.split()
-        player_tokens = []
-        for t in tokens:
-            if t in remove_terms or t == "O/U" or t.isdigit(): break
-            player_tokens.append(t)
-        player_name = " ".join(player_tokens).strip()
-
-        # Event Info
-        event_id = market.get('eventId')
-        event = event_map.get(event_id, {})
-        game_name = event.get('name', 'Unknown')
-        
-        # Team Extraction
-        # DK typically has teamName1, teamName2, teamShortName1, teamShortName2
-        # We can't easily link the player directly to the team without more parsing,
-        # but we can return the matchup or both teams to help the matcher.
-        team1 = event.get('teamShortName1', 'UNK')
-        team2 = event.get('teamShortName2', 'UNK')
-        
-        start_date = event.get('startEventDate')
-        game_date = datetime.now().strftime('%Y-%m-%d')
-        if start_date:
-            try:
-                dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                game_date = dt.astimezone(tz.gettz('America/New_York')).strftime('%Y-%m-%d')
-            except: pass
+def parse_market(market, market_outcomes, event, prop_type_key):
+    """The prop row (as a 0/1-item list) for one market and its selections."""
+    if len(market_outcomes) < 2: return []
 
-        # Odds Parsing
-        line = over_sel.get('points')
-        if line is None: continue 
-
-        raw_over = over_sel.get('displayOdds', {}).get('american')
-        raw_under = under_sel.get('displayOdds', {}).get('american')
-
-        # Store as INTEGER in the data (best practice)
-        over_int = parse_odds(raw_over)
-        under_int = parse_odds(raw_under)
-
-        parsed.append({
-            "player": normalize_player_name(player_name),
-            "team": "Unknown", # DK doesn't give us player-team link easily here, but we can use matchup
-            "team_options": [team1, team2], # NEW: Pass possible teams to matcher
-            "prop_type": prop_type_key,
-            "line": float(line),
-            "over_odds": over_int,
-            "under_odds": under_int,
-            "game": game_name,
-            "game_date": game_date,
-            "sportsbook": "draftkings"
-        })
+    # Identify Over/Under
+    over_sel = None
+    under_sel = None
+    
+    for sel in market_outcomes:
+        label = sel.get('label', '').lower()
+        outcome_type = sel.get('outcomeType', '').lower()
         
-    return parsed
+        if 'over' in label or 'over' in outcome_type: over_sel = sel
+        elif 'under' in label or 'under' in outcome_type: under_sel = sel
+    
+    if not over_sel or not under_sel: return []
+
+    player_name = extract_player_name(market.get('name', ''))
+    game_name, team1, team2, game_date = event
+
+    # Odds Parsing
+    line = over_sel.get('points')
+    if line is None: return []
+
+    raw_over = over_sel.get('displayOdds', {}).get('american')
+    raw_under = under_sel.get('displayOdds', {}).get('american')
+
+    # Store as INTEGER in the data (best practice)
+    over_int = parse_odds(raw_over)
+    under_int = parse_odds(raw_under)
+
+    return [{
+        "player": normalize_player_name(player_name),
+        "team": "Unknown", # DK doesn't give us player-team link easily here, but we can use matchup
+        "team_options": [team1, team2], # NEW: Pass possible teams to matcher
+        "prop_type": prop_type_key,
+        "line": float(line),
+        "over_odds": over_int,
+        "under_odds": under_int,
+        "game": game_name,
+        "game_date": game_date,
+        "sportsbook": "draftkings"
+    }]
 
 def fetch_dk_odds():
     print("🚀 Starting DraftKings Odds Fetch...")
     all_props = []
     
-    for prop_key, cat_id in PLAYER_PROP_CATEGORIES.items():
-        time.sleep(random.uniform(0.3, 0.8))
-        data = fetch_category(cat_id, prop_key)
-        props = parse_dk_data(data, prop_key)
-        
-        # print(f"  Found {len(props)} props for '{prop_key}'")
-        all_props.extend(props)
+    start = time.perf_counter()
+    limiter = RateLimiter(REQUESTS_PER_SECOND)
+    session = create_session()
+
+    def fetch(prop_key, cat_id):
+        limiter.wait()
+        data = fetch_category(cat_id, prop_key, session=session)
+        if data is None:
+            return None  # Request failed (an empty category is {} with no events)
+        return parse_dk_data(data, prop_key, cache=PARSE_CACHE)
+
+    # All categories concurrently; results are kept in category order
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch, prop_key, cat_id) for prop_key, cat_id in PLAYER_PROP_CATEGORIES.items()]
+        for prop_key, future in zip(PLAYER_PROP_CATEGORIES, futures):
+            try:
+                props = future.result()
+            except Exception as e:
+                print(f"  ❌ Error parsing {prop_key}: {e}")
+                props = None
+            if props is None:
+                failed.append(prop_key)
+            else:
+                all_props.extend(props)
+    session.close()
+    PARSE_CACHE.end_run()
+    print(f"   ⏱️ DraftKings: {len(PLAYER_PROP_CATEGORIES)} categories in {time.perf_counter() - start:.1f}s")
+    if failed:
+        # A partial slate would read as pulled props downstream; the caller keeps the last full one
+        raise RuntimeError(f"DraftKings: {len(failed)}/{len(PLAYER_PROP_CATEGORIES)} categories failed ({', '.join(failed)})")
     
     print(f"✅ Finished DK. Collected {len(all_props)} total props.")
 
@@ -2,6 +2,12 @@
 import requests
 import json
 import time
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from market_cache import MarketCache
 from datetime import datetime, timedelta, timezone
 from dateutil import tz
 
@@ -16,54 +22,66 @@ HEADERS = {
     'Accept': 'application/json'
 }
 
-def get_nba_main_page_data():
+IGNORED_TABS = ['game-lines', 'popular', 'odds', 'same-game-parlay', 'quick-bets', 'half', 'quarter',
+                '4th-quarter', '1st-quarter', '2nd-quarter', '3rd-quarter', 'total-parlays', 'team-props',
+                'race-to', 'margin', 'parlays', 'teasers', 'featured', 'live-sgp', 'same-game-parlay™']
+MAX_WORKERS = 8   # Concurrent requests across all events and tabs of a slate
+TIMEOUT = 15
+PARSE_CACHE = MarketCache("FanDuel")  # Reused across refreshes of the same process
+
+def create_session(pool_size=MAX_WORKERS):
+    """One keep-alive session shared by every request of a slate."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size))
+    return session
+
+def get_nba_main_page_data(session=None):
     """Fetches the main NBA page."""
     url = f"https://api.sportsbook.fanduel.com/sbapi/content-managed-page?page=CUSTOM&customPageId=nba&pbHorizontal=false&_ak={FANDUEL_PUBLIC_ACCESS_KEY}&timezone=America%2FNew_York"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = (session or requests).get(url, headers=HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"Error fetching NBA main page: {e}")
         return None
 
-def get_player_props(event_id, prop_tab_name):
-    """Fetches specific prop tab data."""
+def get_player_props(event_id, prop_tab_name=None, session=None):
+    """Fetches an event page: a specific prop tab, or the default tab (plus the tab layout) when None."""
     cache_buster = int(time.time())
-    url = f"https://api.sportsbook.fanduel.com/sbapi/event-page?_ak={FANDUEL_PUBLIC_ACCESS_KEY}&eventId={event_id}&tab={prop_tab_name}&_={cache_buster}"
+    tab = f"&tab={prop_tab_name}" if prop_tab_name else ""
+    url = f"https://api.sportsbook.fanduel.com/sbapi/event-page?_ak={FANDUEL_PUBLIC_ACCESS_KEY}&eventId={event_id}{tab}&_={cache_buster}"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = (session or requests).get(url, headers=HEADERS, timeout=TIMEOUT)
         response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"Error fetching props for event {event_id}: {e}")
         return None
 
-def get_all_available_tabs(event_id):
-    """Fetches available tabs for an event."""
-    cache_buster = int(time.time())
-    url = f"https://api.sportsbook.fanduel.com/sbapi/event-page?_ak={FANDUEL_PUBLIC_ACCESS_KEY}&eventId={event_id}&_={cache_buster}"
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        tabs = data.get('layout', {}).get('tabs', {})
-        available_tabs = []
-        
-        ignored_tabs = ['game-lines', 'popular', 'odds', 'same-game-parlay', 'quick-bets', 'half', 'quarter', 
-                        '4th-quarter', '1st-quarter', '2nd-quarter', '3rd-quarter', 'total-parlays', 'team-props', 
-                        'race-to', 'margin', 'parlays', 'teasers', 'featured', 'live-sgp', 'same-game-parlay™']
-
-        for tab_id, tab_info in tabs.items():
-            tab_title = tab_info.get('title', '')
-            tab_name = tab_title.lower().replace(' ', '-')
-            if tab_name in ignored_tabs:
-                continue
-            available_tabs.append({'name': tab_name, 'title': tab_title})
-        return available_tabs
-    except Exception as e:
-        print(f"Error fetching tabs for event {event_id}: {e}")
-        return []
+def get_all_available_tabs(event_page):
+    """
+    Prop tabs listed in an event page's layout, without the tab the page
+    itself was served with (its markets are already in the response), and
+    whether that default tab is one of IGNORED_TABS.
+    """
+    layout = event_page.get('layout', {})
+    tabs = layout.get('tabs', {})
+    default_tab_id = str(layout.get('defaultTabId', next(iter(tabs), '')))
+    available_tabs = []
+    default_ignored = False
+    for tab_id, tab_info in tabs.items():
+        tab_title = tab_info.get('title', '')
+        tab_name = tab_title.lower().replace(' ', '-')
+        if str(tab_id) == default_tab_id:
+            default_ignored = tab_name in IGNORED_TABS
+            continue
+        if tab_name in IGNORED_TABS:
+            continue
+        available_tabs.append({'name': tab_name, 'title': tab_title})
+    return available_tabs, default_ignored
 
 def normalize_player_name(name):
     if not name: return "unknown_player"
@@ -123,10 +141,67 @@ def extract_team_name(logo_url):
     except: 
         return "UNK"
 
+def parse_markets(markets, game_name, game_date, seen, cache=None):
+    """Over/under player props from an event page's markets; `seen` skips markets already parsed."""
+    props = []
+    for market_id, market in markets.items():
+        if market_id in seen: continue
+        seen.add(market_id)
+        if cache is None:
+            props.extend(parse_market(market, game_name, game_date))
+        else:
+            props.extend(cache.parse(market_id, (market, game_name, game_date),
+                                     lambda: parse_market(market, game_name, game_date)))
+    return props
+
+def parse_market(market, game_name, game_date):
+    """The prop row (as a 0/1-item list) for one over/under player market."""
+    market_name = market.get('marketName', '')
+    if " - " not in market_name: return []
+
+    try:
+        player_name_raw, prop_type_raw = market_name.rsplit(' - ', 1)
+    except: return []
+
+    runners = market.get('runners', [])
+    if len(runners) != 2: return []
+
+    over_runner = next((r for r in runners if r.get('result', {}).get('type') == 'OVER'), None)
+    under_runner = next((r for r in runners if r.get('result', {}).get('type') == 'UNDER'), None)
+
+    if not over_runner or not under_runner: return []
+
+    line = over_runner.get('handicap')
+    over_odds = over_runner.get('winRunnerOdds', {}).get('americanDisplayOdds', {}).get('americanOdds')
+    under_odds = under_runner.get('winRunnerOdds', {}).get('americanDisplayOdds', {}).get('americanOdds')
+
+    if line is None or over_odds is None: return []
+
+    return [{
+        "player": normalize_player_name(player_name_raw),
+        "team": extract_team_name(over_runner.get('secondaryLogo', '')),
+        "prop_type": normalize_prop_type(prop_type_raw),
+        "line": float(line),
+        "over_odds": int(over_odds),
+        "under_odds": int(under_odds),
+        "game": game_name,
+        "game_date": game_date, # Using scrape date as strict game date for now
+        "sportsbook": "fanduel"
+    }]
+
+def _timed_fetch(session, event_id, tab_name):
+    start = time.perf_counter()
+    data = get_player_props(event_id, tab_name, session=session)
+    return data, time.perf_counter() - start
+
 def fetch_odds():
     print("🚀 Starting FanDuel Odds Fetch...")
-    main_page = get_nba_main_page_data()
-    if not main_page: return []
+    slate_start = time.perf_counter()
+    session = create_session()
+    main_page = get_nba_main_page_data(session)
+    if not main_page:
+        session.close()
+        raise RuntimeError("FanDuel: NBA main page unavailable")
 
     upcoming_events = []
     attachments = main_page.get('attachments', {})
@@ -144,53 +219,46 @@ def fetch_odds():
              upcoming_events.append(event)
 
     all_props = []
+    seen = {event['eventId']: set() for event in upcoming_events}
+    names = {event['eventId']: event['name'] for event in upcoming_events}
+    latencies = []
+    failed = []
 
-    for event in upcoming_events:
-        event_id = event['eventId']
-        game_name = event['name']
-        print(f"  Processing Game: {game_name}")
-        
-        tabs = get_all_available_tabs(event_id)
-        for tab in tabs:
-            prop_data = get_player_props(event_id, tab['name'])
-            if not prop_data: continue
-            
-            markets = prop_data.get('attachments', {}).get('markets', {})
-            for market in markets.values():
-                market_name = market.get('marketName', '')
-                if " - " not in market_name: continue
-                
-                try:
-                    player_name_raw, prop_type_raw = market_name.rsplit(' - ', 1)
-                except: continue
+    # Every event page first (default tab markets + tab layout), then every remaining
+    # tab of every event, all on one bounded pool; results are parsed as they land
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pending = {executor.submit(_timed_fetch, session, event_id, None): (event_id, None)
+                   for event_id in names}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                event_id, tab_name = pending.pop(future)
+                prop_data, elapsed = future.result()
+                latencies.append(elapsed)
+                if prop_data is None:
+                    failed.append(f"{names[event_id]} {tab_name or 'event page'}")
+                    continue
+                if not prop_data: continue
 
-                runners = market.get('runners', [])
-                if len(runners) != 2: continue
-                
-                over_runner = next((r for r in runners if r.get('result', {}).get('type') == 'OVER'), None)
-                under_runner = next((r for r in runners if r.get('result', {}).get('type') == 'UNDER'), None)
-                
-                if not over_runner or not under_runner: continue
+                if tab_name is None:
+                    tabs, default_ignored = get_all_available_tabs(prop_data)
+                    print(f"  Processing Game: {names[event_id]} ({len(tabs)} prop tabs)")
+                    for tab in tabs:
+                        pending[executor.submit(_timed_fetch, session, event_id, tab['name'])] = (event_id, tab['name'])
+                    if default_ignored: continue  # Served with e.g. the popular tab: filtered like the tab itself
 
-                line = over_runner.get('handicap')
-                over_odds = over_runner.get('winRunnerOdds', {}).get('americanDisplayOdds', {}).get('americanOdds')
-                under_odds = under_runner.get('winRunnerOdds', {}).get('americanDisplayOdds', {}).get('americanOdds')
-                
-                if line is None or over_odds is None: continue
-
-                prop_entry = {
-                    "player": normalize_player_name(player_name_raw),
-                    "team": extract_team_name(over_runner.get('secondaryLogo', '')),
-                    "prop_type": normalize_prop_type(prop_type_raw),
-                    "line": float(line),
-                    "over_odds": int(over_odds),
-                    "under_odds": int(under_odds),
-                    "game": game_name,
-                    "game_date": today_str, # Using scrape date as strict game date for now
-                    "sportsbook": "fanduel"
-                }
-                all_props.append(prop_entry)
-    
+                markets = prop_data.get('attachments', {}).get('markets', {})
+                all_props.extend(parse_markets(markets, names[event_id], today_str, seen[event_id], cache=PARSE_CACHE))
+    session.close()
+    PARSE_CACHE.end_run()
+
+    if latencies:
+        print(f"   ⏱️ FanDuel slate: {len(names)} games, {len(latencies)} requests in "
+              f"{time.perf_counter() - slate_start:.1f}s "
+              f"(p50 {np.percentile(latencies, 50) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms)")
+    if failed:
+        # A partial slate would read as pulled props downstream; the caller keeps the last full one
+        raise RuntimeError(f"FanDuel: {len(failed)}/{len(latencies)} requests failed ({', '.join(failed[:5])})")
     print(f"✅ Finished. Collected {len(all_props)} props.")
     return all_props
 
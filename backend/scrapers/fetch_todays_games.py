@@ -3,6 +3,13 @@ import pandas as pd
 import json
 from datetime import datetime, timezone, timedelta
 import os
+import sys
+
+# Allow `from utils...` when run standalone from the scrapers folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.publisher import ArtifactPublisher
+
+GAMES_FILE = "nba_dashboard_games.json"
 
 def get_nba_schedule():
     """Get NBA schedule data"""
@@ -20,6 +27,34 @@ def get_nba_schedule():
     response = requests.get(url=url, headers=HEADERS)
     return response.json()
 
+def get_team_last_final_dates(data=None, season_prefix='002'):
+    """{team_id: 'YYYY-MM-DD'} of each team's most recent final regular-season game."""
+    data = data if data is not None else get_nba_schedule()
+    last_final = {}
+    for date_obj in data.get('leagueSchedule', {}).get('gameDates', []):
+        date = datetime.strptime(date_obj.get('gameDate', '').split(' ')[0], '%m/%d/%Y').strftime('%Y-%m-%d')
+        for g in date_obj.get('games', []):
+            if not str(g.get('gameId', '')).startswith(season_prefix) or g.get('gameStatus') != 3:
+                continue
+            for side in ('homeTeam', 'awayTeam'):
+                team_id = g.get(side, {}).get('teamId')
+                if team_id and date > last_final.get(team_id, ''):
+                    last_final[team_id] = date
+    return last_final
+
+def get_completed_game_dates(data=None, season_prefix='002'):
+    """
+    Dates ('MM/DD/YYYY', newest first) with at least one final regular-season game.
+    Game IDs starting with season_prefix ('002' = regular season) are counted.
+    """
+    data = data if data is not None else get_nba_schedule()
+    completed = []
+    for date_obj in data.get('leagueSchedule', {}).get('gameDates', []):
+        games = [g for g in date_obj.get('games', []) if str(g.get('gameId', '')).startswith(season_prefix)]
+        if any(g.get('gameStatus') == 3 for g in games):
+            completed.append(date_obj.get('gameDate', '').split(' ')[0])
+    return sorted(completed, key=lambda d: datetime.strptime(d, '%m/%d/%Y'), reverse=True)
+
 def parse_game_data(game):
     """Parse game data from the schedule endpoint"""
     home_team = game.get('homeTeam', {})
@@ -164,54 +199,65 @@ def get_dashboard_data():
     
     return df, all_games_data
 
-# Get the data
-df, raw_data = get_dashboard_data()
-
-# Display summary
-print(f"\n{'='*80}")
-print("NBA DASHBOARD DATA SUMMARY")
-print(f"{'='*80}")
-
-if not df.empty:
-    print(f"\n📊 Overview:")
-    print(f"Total games: {len(df)}")
-    print(f"Scheduled games: {df['is_scheduled'].sum()}")
-    print(f"Live games: {df['is_live'].sum()}")
-    print(f"Final games: {df['is_final'].sum()}")
-
-    print(f"\n🏀 Games Today:")
-
-    for idx, row in df.iterrows():
-        if row['is_live']:
-            status_icon = "🟢 LIVE"
-            status_info = ""
-        elif row['is_final']:
-            status_icon = "✅ FINAL"
-            status_info = ""
-        else:
-            status_icon = "⏰"
-            status_info = row['game_time_et']
-        
-        print(f"\n{status_icon} {row['matchup']} {status_info}")
-        print(f"   Game ID: {row['game_id']}")
-        print(f"   Score: {row['display_score']}")
-        print(f"   Arena: {row['arena_full']}")
-        print(f"   Status: {row['game_status_text']}")
-        
-        if row.get('home_leader_name'):
-            print(f"   Home Leader: {row['home_leader_name']} ({row['home_leader_points']} pts)")
-        if row.get('away_leader_name'):
-            print(f"   Away Leader: {row['away_leader_name']} ({row['away_leader_points']} pts)")
-else:
-    print("No games found for today.")
-
-# Save to files
-output_path = os.path.join(os.path.dirname(__file__), '../data/current/nba_dashboard_games.json')
-# Ensure directory exists
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-with open(output_path, 'w') as f:
-    json.dump(raw_data, f, indent=2, default=str)
-
-print(f"\n💾 Data saved to:")
-print(f"   - {output_path}")
\ No newline at end of file
+def main():
+    # Get the data
+    df, raw_data = get_dashboard_data()
+
+    # Display summary
+    print(f"\n{'='*80}")
+    print("NBA DASHBOARD DATA SUMMARY")
+    print(f"{'='*80}")
+
+    if not df.empty:
+        print(f"\n📊 Overview:")
+        print(f"Total games: {len(df)}")
+        print(f"Scheduled games: {df['is_scheduled'].sum()}")
+        print(f"Live games: {df['is_live'].sum()}")
+        print(f"Final games: {df['is_final'].sum()}")
+
+        print(f"\n🏀 Games Today:")
+
+        for idx, row in df.iterrows():
+            if row['is_live']:
+                status_icon = "🟢 LIVE"
+                status_info = ""
+            elif row['is_final']:
+                status_icon = "✅ FINAL"
+                status_info = ""
+            else:
+                status_icon = "⏰"
+                status_info = row['game_time_et']
+
+            print(f"\n{status_icon} {row['matchup']} {status_info}")
+            print(f"   Game ID: {row['game_id']}")
+            print(f"   Score: {row['display_score']}")
+            print(f"   Arena: {row['arena_full']}")
+            print(f"   Status: {row['game_status_text']}")
+
+            if row.get('home_leader_name'):
+                print(f"   Home Leader: {row['home_leader_name']} ({row['home_leader_points']} pts)")
+            if row.get('away_leader_name'):
+                print(f"   Away Leader: {row['away_leader_name']} ({row['away_leader_points']} pts)")
+    else:
+        print("No games found for today.")
+
+    # Publish as a new generation (see utils/publisher.py): the schedule is written
+    # into the staging directory and every other artifact is carried over, so files
+    # hard-linked into older generations are never rewritten in place
+    publisher = ArtifactPublisher(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+    publisher.begin()
+    try:
+        output_path = publisher.path(GAMES_FILE)
+        with open(output_path, 'w') as f:
+            json.dump(raw_data, f, indent=2, default=str)
+        publisher.carry_over()
+        published = publisher.commit()
+    except BaseException:
+        publisher.abort()
+        raise
+
+    print(f"\n💾 Data saved to:")
+    print(f"   - {os.path.join(published, GAMES_FILE)}")
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,26 @@ import requests
 import time
 import urllib.parse
 import os
+import sys
 from nba_api.stats.endpoints import leaguegamelog
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Allow `from utils...` when run standalone from the scrapers folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.gamelog_store import GameLogStore, MANIFEST_FILE
+from utils.fetch_manifest import FetchManifest, frame_hash, STATUS_OK, STATUS_EMPTY, STATUS_FAILED
+from result_set import get_result_set, decode_frame
+from fetch_todays_games import get_completed_game_dates
+
 # ==========================================
 # CONFIGURATION
 # ==========================================
 UPDATE_WINDOW_DAYS = 5 
-MAX_HISTORY_GAMES = 35 
 MAX_WORKERS = 4  # Concurrency limit to prevent throttling
+REVALIDATE_HOURS = 6              # Done cells of unsettled dates are refetched at most this often
+FINALIZE_AFTER_HOURS = 36         # Cells fetched this long after the game date are final
+BACKFILL_DATES_PER_RUN = 30       # Never-fetched season dates added per run (newest first) until the season is covered
 
 # Browser fingerprinting to bypass NBA protections
 HEADERS = {
@@ -27,16 +37,26 @@ HEADERS = {
 }
 
 PT_MEASURE_TYPES = ["Passing", "Rebounding", "Drives"]
+BASE_PART = "LeagueGameLog"       # Manifest cell for the box-score rows themselves
+
+# Columns kept from each tracking endpoint (NaN in the store while a cell has failed)
+MEASURE_COLUMNS = {
+    "Passing": ['POTENTIAL_AST', 'AST_POINTS_CREATED', 'PASSES_MADE'],
+    "Rebounding": ['REB_CHANCES', 'REB_CONTEST_PCT'],
+    "Drives": ['DRIVES', 'DRIVE_PTS', 'DRIVE_PASSES'],
+}
 
-def fetch_tracking_data_for_date(date_str):
+def fetch_tracking_data_for_date(date_str, measure_types=PT_MEASURE_TYPES):
     """
-    Fetches Drives, Passing, and Rebounding for a single date.
-    Uses your original requests logic for safety, but adds retry handling.
+    Fetches the given tracking measure types for a single date.
+    Returns {PtMeasureType: DataFrame | None}: PLAYER_ID + MEASURE_COLUMNS on
+    success (empty if the endpoint had no rows), None once retries are exhausted.
     """
-    daily_merged = None
+    results = {}
     encoded_date = urllib.parse.quote(date_str, safe='')
     
-    for PT in PT_MEASURE_TYPES:
+    for PT in measure_types:
+        results[PT] = None
         max_retries = 3
         for attempt in range(max_retries):
             try:
@@ -53,23 +73,9 @@ def fetch_tracking_data_for_date(date_str):
                 if resp.status_code != 200: 
                     raise ValueError(f"Bad status code: {resp.status_code}")
                 
-                r = resp.json()
-                row_set = r['resultSets'][0].get('rowSet', [])
-                api_headers = r['resultSets'][0].get('headers', [])
-                
-                if not row_set: 
-                    break # Success, but no data for this specific tracking type today
-                
-                df_pt = pd.DataFrame(row_set, columns=api_headers)
-                cols_to_keep = ['PLAYER_ID', 'POTENTIAL_AST', 'AST_POINTS_CREATED', 'REB_CHANCES', 'REB_CONTEST_PCT', 'DRIVES', 'DRIVE_PTS', 'DRIVE_PASSES']
-                df_pt = df_pt[[c for c in cols_to_keep if c in df_pt.columns]]
-
-                if daily_merged is None: 
-                    daily_merged = df_pt
-                else: 
-                    daily_merged = pd.merge(daily_merged, df_pt, on='PLAYER_ID', how='outer')
-                
-                # Success! Break the retry loop
+                # Decode only the tracking columns we keep (empty = no data for this type today)
+                result_set = get_result_set(resp.json())
+                results[PT] = decode_frame(result_set, ['PLAYER_ID'] + MEASURE_COLUMNS[PT])
                 break 
 
             except Exception as e:
@@ -78,34 +84,49 @@ def fetch_tracking_data_for_date(date_str):
                     time.sleep(3 * (attempt + 1)) # Wait 3s, then 6s before retrying
                 else:
                     print(f"      ❌ Giving up on {PT} for {date_str}.")
-            
-    if daily_merged is not None:
-        daily_merged['DATE_STR'] = date_str
         
-    return daily_merged
+    return results
 
-def run_scrape(output_path, n_games=20):
-    print(f"   📅 Managing Game Logs at {output_path}")
-    
-    # 1. DETERMINE SCRAPE STRATEGY
-    target_dates = []
-    existing_df = pd.DataFrame()
-    full_refresh = True
+def _iso(date_str):
+    """'MM/DD/YYYY' -> 'YYYY-MM-DD' (the store/manifest key)."""
+    return datetime.strptime(date_str, '%m/%d/%Y').strftime('%Y-%m-%d')
 
-    if os.path.exists(output_path):
-        try:
-            print("      Found existing logs. Running INCREMENTAL update.")
-            existing_df = pd.read_csv(output_path)
-            if 'GAME_DATE' in existing_df.columns:
-                existing_df['GAME_DATE'] = pd.to_datetime(existing_df['GAME_DATE'])
-            full_refresh = False
-        except Exception as e:
-            print(f"      ⚠️ Corrupt CSV ({e}). forcing full refresh.")
-            full_refresh = True
+def build_date_partition(df_base, fetched, df_existing):
+    """
+    One date's rows: fresh box scores plus, per measure type, the fresh cell if it
+    was fetched, else the previously stored columns, else NaN (never fetched / failed).
+    Players missing from a fetched cell really had no tracking events (0).
+    """
+    df = df_base.copy()
+    for PT, cols in MEASURE_COLUMNS.items():
+        cell = fetched.get(PT, "missing")
+        if isinstance(cell, pd.DataFrame):
+            if cell.empty:
+                for col in cols:
+                    df[col] = 0.0
+            else:
+                df = df.merge(cell[['PLAYER_ID'] + cols], on='PLAYER_ID', how='left')
+                df[cols] = df[cols].fillna(0)
+        elif not df_existing.empty and all(c in df_existing.columns for c in cols):
+            df = df.merge(df_existing[['PLAYER_ID'] + cols], on='PLAYER_ID', how='left')
+        else:
+            for col in cols:
+                df[col] = float('nan')
 
-    # 2. FETCH BASE LOGS (Your original base log logic)
-    # 2. FETCH BASE LOGS (Now with Stealth Headers & Retries)
-    df_logs = None
+    # Combos
+    df['PTS+REB+AST'] = df['PTS'] + df['REB'] + df['AST']
+    df['PTS+REB'] = df['PTS'] + df['REB']
+    df['PTS+AST'] = df['PTS'] + df['AST']
+    df['REB+AST'] = df['REB'] + df['AST']
+    df['STL+BLK'] = df['STL'] + df['BLK']
+    return df
+
+def fetch_base_logs(date_from=None, date_to=None):
+    """
+    LeagueGameLog for every player, optionally bounded to [date_from, date_to]
+    ('MM/DD/YYYY'), so incremental runs only download the days they need.
+    Returns None after 3 failed attempts.
+    """
     for attempt in range(3):
         try:
             # We explicitly pass your custom HEADERS and a 15s timeout here
@@ -114,96 +135,179 @@ def run_scrape(output_path, n_games=20):
                 player_or_team_abbreviation='P', 
                 direction='DESC', 
                 sorter='DATE',
+                date_from_nullable=date_from or '',
+                date_to_nullable=date_to or '',
                 headers=HEADERS, 
                 timeout=15
             )
             df_logs = game_log.get_data_frames()[0]
             df_logs['GAME_DATE'] = pd.to_datetime(df_logs['GAME_DATE'])
             df_logs['DATE_STR'] = df_logs['GAME_DATE'].dt.strftime('%m/%d/%Y')
-            break  # Success! Break out of the retry loop
+            return df_logs
             
         except Exception as e:
             print(f"   ⚠️ Base log attempt {attempt + 1} failed: {type(e).__name__} ({e})")
             if attempt < 2:
                 time.sleep(3) # Wait 3 seconds before trying again
-                
-    if df_logs is None:
-        print("   ❌ Fatal Error: Could not fetch base LeagueGameLog after 3 attempts.")
-        return
+    return None
 
-    # 3. DEFINE DATES TO SCRAPE (Strictly < Today)
-    all_active_dates = sorted(df_logs['DATE_STR'].unique().tolist(), key=lambda x: datetime.strptime(x, '%m/%d/%Y'), reverse=True)
-    today_obj = datetime.now().date()
-    valid_dates = [d for d in all_active_dates if datetime.strptime(d, '%m/%d/%Y').date() < today_obj]
-    
+def select_target_dates(valid_dates, stored_dates, n_games, full_refresh):
+    """Completed dates ('MM/DD/YYYY', newest first) this run should (re)fetch."""
     if full_refresh:
-        target_dates = valid_dates[:n_games+5]
-        print(f"      🔄 Full Refresh: Scraping last {len(target_dates)} COMPLETED dates.")
+        return valid_dates[:n_games+5]
+
+    cutoff_date = datetime.now() - timedelta(days=UPDATE_WINDOW_DAYS)
+    target_dates = [d for d in valid_dates if datetime.strptime(d, '%m/%d/%Y') >= cutoff_date]
+    if stored_dates:
+        last_saved_date = datetime.strptime(stored_dates[-1], '%Y-%m-%d')
+        missed_dates = [d for d in valid_dates if datetime.strptime(d, '%m/%d/%Y') > last_saved_date]
+        target_dates = list(set(target_dates + missed_dates))
+    return target_dates
+
+def date_windows(dates, max_gap_days=UPDATE_WINDOW_DAYS):
+    """Sorted 'MM/DD/YYYY' dates -> [(from, to)], splitting wherever the gap exceeds max_gap_days."""
+    windows = []
+    for d in dates:
+        if windows and (datetime.strptime(d, '%m/%d/%Y') - datetime.strptime(windows[-1][1], '%m/%d/%Y')).days <= max_gap_days:
+            windows[-1][1] = d
+        else:
+            windows.append([d, d])
+    return [tuple(w) for w in windows]
+
+def run_scrape(store_dir, n_games=20, legacy_csv_path=None):
+    """
+    Updates the date-partitioned game-log store (see utils/gamelog_store.py).
+    Only the partitions for the dates fetched in this run are rewritten; full
+    history is retained and readers trim to however many games they need.
+    """
+    print(f"   📅 Managing Game Logs at {store_dir}")
+    store = GameLogStore(store_dir)
+
+    # One-off migration from the old single-file gamelogs.csv
+    if store.is_empty() and legacy_csv_path and os.path.exists(legacy_csv_path):
+        try:
+            migrated = store.import_csv(legacy_csv_path)
+            print(f"      📦 Migrated {len(migrated)} dates from {os.path.basename(legacy_csv_path)}")
+        except Exception as e:
+            print(f"      ⚠️ Could not migrate legacy CSV ({e}).")
+
+    # 1. DETERMINE SCRAPE STRATEGY
+    manifest = FetchManifest(os.path.join(store_dir, MANIFEST_FILE))
+    target_dates = []
+    stored_dates = store.dates()
+    full_refresh = not stored_dates
+    if not full_refresh:
+        print(f"      Found {len(stored_dates)} stored dates. Running INCREMENTAL update.")
+
+    # 2. COMPLETED DATES (from the schedule, so we never need the full log to find them)
+    today_obj = datetime.now().date()
+    try:
+        completed_dates = get_completed_game_dates()
+    except Exception as e:
+        print(f"      ⚠️ Schedule unavailable ({type(e).__name__}), falling back to the full-season log.")
+        completed_dates = None
+
+    # 3. TARGET DATES
+    df_logs = None
+    if completed_dates is not None:
+        valid_dates = [d for d in completed_dates if datetime.strptime(d, '%m/%d/%Y').date() < today_obj]
     else:
-        cutoff_date = datetime.now() - timedelta(days=UPDATE_WINDOW_DAYS)
-        target_dates = [d for d in valid_dates if datetime.strptime(d, '%m/%d/%Y') >= cutoff_date]
-        if not existing_df.empty:
-            last_saved_date = existing_df['GAME_DATE'].max()
-            missed_dates = [d for d in valid_dates if datetime.strptime(d, '%m/%d/%Y') > last_saved_date]
-            target_dates = list(set(target_dates + missed_dates))
-            
-        print(f"      ➕ Incremental: Scraping {len(target_dates)} dates (Since {cutoff_date.strftime('%Y-%m-%d')}, excluding Today)")
+        df_logs = fetch_base_logs()
+        if df_logs is None:
+            print("   ❌ Fatal Error: Could not fetch base LeagueGameLog after 3 attempts.")
+            return
+        # Legacy discovery: every date present in the full-season log (Strictly < Today)
+        all_active_dates = sorted(df_logs['DATE_STR'].unique().tolist(), key=lambda x: datetime.strptime(x, '%m/%d/%Y'), reverse=True)
+        valid_dates = [d for d in all_active_dates if datetime.strptime(d, '%m/%d/%Y').date() < today_obj]
 
-    if not target_dates:
+    target_dates = set(select_target_dates(valid_dates, stored_dates, n_games, full_refresh))
+    # Backfill: season dates this store never fetched (older than its first refresh, or
+    # migrated from the capped gamelogs.csv), so season totals and windows see every game
+    backfill = [d for d in valid_dates if _iso(d) not in manifest.entries and d not in target_dates]
+    if backfill:
+        print(f"      🧱 Backfilling {min(len(backfill), BACKFILL_DATES_PER_RUN)} of {len(backfill)} unfetched season dates")
+        target_dates |= set(backfill[:BACKFILL_DATES_PER_RUN])
+    # Cells that failed on older dates are retried even outside the update window
+    target_dates |= {d for d in valid_dates if _iso(d) in manifest.entries and manifest.due(_iso(d), PT_MEASURE_TYPES)}
+
+    # 4. PLAN: only the (date, measure type) cells that are missing, failed or due a recheck
+    now = time.time()
+    plan = {}
+    for date_str in sorted(target_dates, key=lambda x: datetime.strptime(x, '%m/%d/%Y')):
+        if _iso(date_str) not in stored_dates:
+            plan[date_str] = list(PT_MEASURE_TYPES)
+        else:
+            due = manifest.due(_iso(date_str), PT_MEASURE_TYPES, REVALIDATE_HOURS * 3600, now)
+            if due:
+                plan[date_str] = due
+
+    n_cells = sum(len(due) for due in plan.values())
+    label = "🔄 Full Refresh" if full_refresh else "➕ Incremental"
+    print(f"      {label}: {len(plan)} dates / {n_cells} tracking cells to fetch "
+          f"({len(target_dates) - len(plan)} dates up to date)")
+
+    if not plan:
         print("      ✅ Data is up to date (No completed games to fetch).")
         return
 
-    # 4. FETCH ADVANCED STATS (ThreadPool Speed!)
-    print(f"      🚀 Launching {MAX_WORKERS} threads for {len(target_dates)} dates...")
-    advanced_data_list = []
+    # Box scores for just the planned dates (one bounded request per cluster of dates)
+    if df_logs is None:
+        chunks = []
+        for date_from, date_to in date_windows(list(plan)):
+            chunk = fetch_base_logs(date_from, date_to)
+            if chunk is None:
+                print("   ❌ Fatal Error: Could not fetch base LeagueGameLog after 3 attempts.")
+                return
+            chunks.append(chunk)
+        df_logs = pd.concat(chunks, ignore_index=True)
+
+    # 5. FETCH ADVANCED STATS (ThreadPool Speed!)
+    print(f"      🚀 Launching {MAX_WORKERS} threads for {n_cells} cells...")
+    fetched = {}
     
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_map = {executor.submit(fetch_tracking_data_for_date, d): d for d in target_dates}
+        future_map = {executor.submit(fetch_tracking_data_for_date, d, due): d for d, due in plan.items() if due}
         
         for i, future in enumerate(as_completed(future_map)):
             date_str = future_map[future]
             try:
-                result = future.result()
-                if result is not None:
-                    advanced_data_list.append(result)
-                print(f"      [{i+1}/{len(target_dates)}] Completed {date_str}")
+                fetched[date_str] = future.result()
+                print(f"      [{i+1}/{len(future_map)}] Completed {date_str}")
             except Exception as e:
                 print(f"      ⚠️ Failed {date_str}: {e}")
 
-    # 5. MERGE & SAVE
-    if advanced_data_list:
-        df_advanced_new = pd.concat(advanced_data_list, ignore_index=True)
-        df_logs_filtered = df_logs[df_logs['DATE_STR'].isin(target_dates)]
-        df_new_final = pd.merge(df_logs_filtered, df_advanced_new, on=['PLAYER_ID', 'DATE_STR'], how='left')
-        
-        # Combos
-        df_new_final = df_new_final.fillna(0)
-        df_new_final['PTS+REB+AST'] = df_new_final['PTS'] + df_new_final['REB'] + df_new_final['AST']
-        df_new_final['PTS+REB'] = df_new_final['PTS'] + df_new_final['REB']
-        df_new_final['PTS+AST'] = df_new_final['PTS'] + df_new_final['AST']
-        df_new_final['REB+AST'] = df_new_final['REB'] + df_new_final['AST']
-        df_new_final['STL+BLK'] = df_new_final['STL'] + df_new_final['BLK']
-
-        if not existing_df.empty:
-            print(f"      ✂️ Replacing overlapping data for {len(target_dates)} dates...")
-            existing_df = existing_df[~existing_df['DATE_STR'].isin(target_dates)]
-            final_df = pd.concat([existing_df, df_new_final], ignore_index=True)
-        else:
-            final_df = df_new_final
-    else:
-        final_df = existing_df
+    # 6. MERGE & SAVE (only dates whose content changed are rewritten)
+    written, failed_cells = [], 0
+    for date_str in plan:
+        iso = _iso(date_str)
+        df_base = df_logs[df_logs['DATE_STR'] == date_str]
+        if df_base.empty:
+            continue
 
-    if not final_df.empty:
-        final_df['GAME_DATE'] = pd.to_datetime(final_df['GAME_DATE'])
-        final_df = final_df.sort_values(by=['PLAYER_ID', 'GAME_DATE'], ascending=[True, False])
-        final_df = final_df.groupby('PLAYER_ID').head(MAX_HISTORY_GAMES).reset_index(drop=True)
-        
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        final_df.to_csv(output_path, index=False)
-        print(f"   💾 Updated logs saved! (Rows: {len(final_df)})")
+        cells = fetched.get(date_str, {PT: None for PT in plan[date_str]})
+        changed = manifest.record(iso, BASE_PART, STATUS_OK, frame_hash(df_base), len(df_base), now)
+        for PT, cell in cells.items():
+            if cell is None:
+                manifest.record(iso, PT, STATUS_FAILED, now=now)
+                failed_cells += 1
+            else:
+                status = STATUS_OK if not cell.empty else STATUS_EMPTY
+                changed |= manifest.record(iso, PT, status, frame_hash(cell), len(cell), now)
+
+        if changed or iso not in stored_dates:
+            existing = store.read(date_from=iso, date_to=iso) if iso in stored_dates else pd.DataFrame()
+            written += store.write_partitions(build_date_partition(df_base, cells, existing))
+
+        settled_at = datetime.strptime(iso, '%Y-%m-%d').timestamp() + FINALIZE_AFTER_HOURS * 3600
+        manifest.finalize(iso, PT_MEASURE_TYPES + [BASE_PART], settled_at)
+
+    manifest.save()
+    failed = f", {failed_cells} cells failed (stored as NaN, retried next run)" if failed_cells else ""
+    print(f"   💾 Updated {len(written)} date partitions{failed}")
 
 if __name__ == "__main__":
     current_script_dir = os.path.dirname(os.path.abspath(__file__))
     backend_dir = os.path.dirname(current_script_dir)
-    output_path = os.path.join(backend_dir, "data", "current", "gamelogs.csv")
-    run_scrape(output_path)
\ No newline at end of file
+    store_dir = os.path.join(backend_dir, "data", "store", "gamelogs")
+    legacy_csv_path = os.path.join(backend_dir, "data", "current", "gamelogs.csv")
+    run_scrape(store_dir, legacy_csv_path=legacy_csv_path)
\ No newline at end of file
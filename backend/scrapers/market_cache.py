@@ -0,0 +1,87 @@
+"""
+Per-market parse cache for sportsbook payloads.
+
+Most markets come back unchanged between odds refreshes. Each market's raw
+JSON (plus whatever context its rows depend on, e.g. the event) is
+fingerprinted; when the fingerprint matches the previous run the parsed rows
+are reused instead of parsing the market again. The cache lives in memory, so
+it pays off across refreshes of a long-running process (run_pipeline --daemon).
+"""
+import json
+import time
+import threading
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder is slower but gives the same fingerprints per run
+    orjson = None
+
+def fingerprint(*parts):
+    """
+    Serialized JSON-like objects (dict key order matters, as served). The
+    bytes themselves are compared: a market is a few hundred bytes, and
+    skipping a digest keeps the unchanged path cheaper than parsing.
+    """
+    if orjson is not None:
+        return orjson.dumps(parts)
+    return json.dumps(parts, separators=(",", ":")).encode("utf-8")
+
+class MarketCache:
+    """
+    {market key: (fingerprint, parsed rows)} from the previous run.
+
+    parse() returns the cached rows when the market is unchanged and calls the
+    parser otherwise. Markets not seen during a run are dropped at end_run().
+    Safe to share between the threads of one run.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.entries = {}
+        self.lock = threading.Lock()
+        # Latest measured per-market costs, used to estimate the time saved
+        self.seconds_per_market = 0.0
+        self.check_per_market = 0.0
+        self._reset_run()
+
+    def _reset_run(self):
+        self.seen = set()
+        self.misses = 0
+        self.parse_seconds = 0.0
+        self.check_seconds = 0.0
+
+    def parse(self, key, parts, parser):
+        start = time.perf_counter()
+        fp = fingerprint(*parts)
+        cached = self.entries.get(key)
+        self.seen.add(key)  # set.add is atomic; the hit path takes no lock
+        if cached is not None and cached[0] == fp:
+            return cached[1]
+
+        parse_start = time.perf_counter()
+        rows = parser()
+        self.entries[key] = (fp, rows)
+        with self.lock:
+            self.misses += 1
+            self.parse_seconds += time.perf_counter() - parse_start
+            self.check_seconds += parse_start - start
+        return rows
+
+    def end_run(self):
+        """Evicts markets that disappeared, logs reuse for the run and returns the stats."""
+        for key in list(self.entries):
+            if key not in self.seen:
+                del self.entries[key]
+        total = len(self.seen)
+        hits = total - self.misses
+        if self.misses:
+            self.seconds_per_market = self.parse_seconds / self.misses
+            self.check_per_market = self.check_seconds / self.misses
+        # Unchanged markets would have cost about as much to parse as the changed ones did,
+        # minus what fingerprinting them cost
+        saved = hits * max(0.0, self.seconds_per_market - self.check_per_market)
+        stats = {"markets": total, "reused": hits, "parse_ms": self.parse_seconds * 1000, "saved_ms": saved * 1000}
+        if total:
+            print(f"   ♻️ {self.label}: reused {hits}/{total} unchanged markets "
+                  f"(parsed {self.misses} in {stats['parse_ms']:.0f} ms, ~{stats['saved_ms']:.0f} ms saved)")
+        self._reset_run()
+        return stats
@@ -0,0 +1,82 @@
+"""
+Direct decoder for stats.nba.com `resultSets` payloads.
+
+Builds typed numpy column arrays for just the requested columns straight from
+`rowSet`, instead of materialising every column as an object DataFrame and
+then dropping most of it.
+"""
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+def get_result_set(payload, index=0):
+    """The first (or index-th) result set; shot-location responses use a single dict."""
+    result_sets = payload.get('resultSets', payload.get('resultSet'))
+    if isinstance(result_sets, dict):
+        return result_sets
+    return result_sets[index] if result_sets else {'headers': [], 'rowSet': []}
+
+def result_set_columns(result_set, group_aliases=None):
+    """
+    Flat column names for a result set.
+
+    Multi-level headers (e.g. leaguedashplayershotlocations) look like
+      [{"name": "SHOT_CATEGORY", "columnsToSkip": 6, "columnSpan": 3, "columnNames": ["Restricted Area", ...]},
+       {"name": "columns", "columnNames": ["PLAYER_ID", ..., "FGM", "FGA", "FG_PCT", "FGM", ...]}]
+    Grouped columns become "<group>_<column>", with group labels mapped through
+    group_aliases (e.g. {"Restricted Area": "RA"}) when given.
+    """
+    headers = result_set.get('headers', [])
+    if not headers or isinstance(headers[0], str):
+        return list(headers)
+
+    group_header, column_header = headers[0], headers[-1]
+    names = list(column_header['columnNames'])
+    skip = group_header.get('columnsToSkip', 0)
+    span = group_header.get('columnSpan', 1)
+    aliases = group_aliases or {}
+
+    for g, group in enumerate(group_header['columnNames']):
+        prefix = aliases.get(group, group)
+        for i in range(skip + g * span, min(skip + (g + 1) * span, len(names))):
+            names[i] = f"{prefix}_{names[i]}"
+    return names
+
+def _typed(values, dtype=None):
+    if dtype is not None:
+        return np.array(values, dtype=dtype)
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, bool) or not isinstance(sample, (int, float)):
+        return np.array(values, dtype=object)
+    if all(type(v) is int for v in values):
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=np.float64)  # None -> NaN
+
+def decode_result_set(result_set, columns=None, dtypes=None, group_aliases=None):
+    """
+    {column: ndarray} for the requested columns (all columns if None).
+    Requested columns missing from the response are skipped. Numeric columns
+    come back as int64/float64 (None -> NaN), everything else as object.
+    """
+    names = result_set_columns(result_set, group_aliases)
+    rows = result_set.get('rowSet') or []
+    position = {name: i for i, name in enumerate(names)}  # Last wins on duplicate names
+    wanted = [c for c in (columns if columns is not None else names) if c in position]
+    dtypes = dtypes or {}
+
+    if not wanted:
+        return {}
+    if not rows:
+        return {c: np.array([], dtype=dtypes.get(c, object)) for c in wanted}
+
+    getter = itemgetter(*[position[c] for c in wanted])
+    picked = map(getter, rows)
+    if len(wanted) == 1:
+        picked = ((v,) for v in picked)
+    transposed = zip(*picked)
+    return {c: _typed(list(values), dtypes.get(c)) for c, values in zip(wanted, transposed)}
+
+def decode_frame(result_set, columns=None, dtypes=None, group_aliases=None):
+    """Same as decode_result_set, wrapped in a DataFrame without copying the arrays."""
+    return pd.DataFrame(decode_result_set(result_set, columns, dtypes, group_aliases), copy=False)
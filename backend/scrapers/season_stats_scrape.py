@@ -6,6 +6,23 @@ import pandas as pd
 import concurrent.futures
 import time
 import random
+from result_set import get_result_set, decode_frame
+
+# Columns decoded from each endpoint (everything else in the response is skipped)
+BASE_COLUMNS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'AGE', 'GP', 'MIN', 'TEAM_ID',
+    'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG3M', 
+    'OREB', 'DREB', 'DD2', 'TD3',
+    'FGM', 'FGA', 'FG3A', 'FTM', 'FTA', 
+    'PF', 'PFD', 'PLUS_MINUS',
+    'FG_PCT', 'FG3_PCT', 'FT_PCT'
+]
+MERGE_KEYS = ['PLAYER_ID', 'TEAM_ID']
+TRACKING_COLUMNS = {
+    "Passing": ['POTENTIAL_AST', 'PASSES_MADE'],
+    "Drives": ['DRIVES', 'DRIVE_PTS'],
+    "Rebounding": ['REB_CHANCES', 'REB_CONTEST_PCT'],
+}
 
 class NBAStatsEngine:
     def __init__(self):
@@ -45,8 +62,9 @@ class NBAStatsEngine:
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
 
-    def _fetch_url(self, url, tag=None):
-        """Helper to fetch a single URL with jitter and error handling."""
+    def _fetch_url(self, url, tag=None, columns=None):
+        """Helper to fetch a single URL with jitter and error handling.
+        Only `columns` (all if None) are decoded from the response."""
         try:
             # --- PROTECTION LAYER 3: JITTER ---
             # Sleep a tiny random amount (0.1 to 0.5s) so requests don't hit 
@@ -57,10 +75,7 @@ class NBAStatsEngine:
             r = self.session.get(url, timeout=15)
             r.raise_for_status() # Raises error for 4xx/5xx codes
             
-            data = r.json()
-            headers = data['resultSets'][0]['headers']
-            rows = data['resultSets'][0]['rowSet']
-            return tag, pd.DataFrame(rows, columns=headers)
+            return tag, decode_frame(get_result_set(r.json()), columns)
             
         except requests.exceptions.HTTPError as errh:
             print(f"Http Error for {tag}: {errh}")
@@ -94,7 +109,11 @@ class NBAStatsEngine:
         # Limited to 3 workers to be "polite" to the API (reduces instant load)
         dfs = {}
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_url = {executor.submit(self._fetch_url, url, tag): tag for tag, url in urls_map.items()}
+            future_to_url = {
+                executor.submit(self._fetch_url, url, tag,
+                                BASE_COLUMNS if tag == "Base" else MERGE_KEYS + TRACKING_COLUMNS[tag]): tag
+                for tag, url in urls_map.items()
+            }
             for future in concurrent.futures.as_completed(future_to_url):
                 tag, df = future.result()
                 dfs[tag] = df
@@ -104,33 +123,13 @@ class NBAStatsEngine:
             print("CRITICAL: Base stats failed to load. Aborting.")
             return pd.DataFrame()
 
+        # Already projected to BASE_COLUMNS by the decoder
         main_df = dfs["Base"]
-        
-        columns_to_keep = [
-            'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'AGE', 'GP', 'MIN', 'TEAM_ID',
-            'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG3M', 
-            'OREB', 'DREB', 'DD2', 'TD3',
-            'FGM', 'FGA', 'FG3A', 'FTM', 'FTA', 
-            'PF', 'PFD', 'PLUS_MINUS',
-            'FG_PCT', 'FG3_PCT', 'FT_PCT'
-        ]
-        
-        main_df = main_df[[c for c in columns_to_keep if c in main_df.columns]]
-
-        # 4. Merge Advanced Stats
-        merge_keys = ['PLAYER_ID', 'TEAM_ID']
-
-        if not dfs.get("Passing", pd.DataFrame()).empty:
-            pass_cols = merge_keys + ['POTENTIAL_AST', 'PASSES_MADE']
-            main_df = main_df.merge(dfs["Passing"][pass_cols], on=merge_keys, how='left')
-
-        if not dfs.get("Drives", pd.DataFrame()).empty:
-            drive_cols = merge_keys + ['DRIVES', 'DRIVE_PTS']
-            main_df = main_df.merge(dfs["Drives"][drive_cols], on=merge_keys, how='left')
 
-        if not dfs.get("Rebounding", pd.DataFrame()).empty:
-            reb_cols = merge_keys + ['REB_CHANCES', 'REB_CONTEST_PCT']
-            main_df = main_df.merge(dfs["Rebounding"][reb_cols], on=merge_keys, how='left')
+        # 4. Merge Advanced Stats (each already projected to MERGE_KEYS + its columns)
+        for tag in TRACKING_COLUMNS:
+            if not dfs.get(tag, pd.DataFrame()).empty:
+                main_df = main_df.merge(dfs[tag], on=MERGE_KEYS, how='left')
 
         # 5. Calculate Edge Metrics
         main_df = main_df.fillna(0)
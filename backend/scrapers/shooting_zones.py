@@ -1,7 +1,14 @@
+import os
+import json
+import time
 import requests
 import pandas as pd
+from datetime import datetime, timedelta
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from result_set import get_result_set, decode_frame
+from fetch_todays_games import get_completed_game_dates
+from zone_engine import zone_distributions
 
 URL = "https://stats.nba.com/stats/leaguedashplayershotlocations"
 
@@ -42,6 +49,44 @@ PARAMS = {
     "TeamID": "0",
 }
 
+# ---- ZONE COLUMNS ----
+# Shot-category header labels -> column prefixes (e.g. "Restricted Area" FGA -> RA_FGA)
+ZONE_PREFIXES = {
+    "Restricted Area": "RA",
+    "In The Paint (Non-RA)": "PAINT",
+    "Mid-Range": "MID",
+    "Left Corner 3": "LC3",
+    "Right Corner 3": "RC3",
+    "Above the Break 3": "AB3",
+    "Backcourt": "BC",
+    "Corner 3": "C3",
+}
+COUNT_COLUMNS = [
+    f"{prefix}_{stat}" for prefix in ("RA", "PAINT", "MID", "LC3", "RC3", "AB3") for stat in ("FGM", "FGA")
+]
+ZONE_COLUMNS = ["PLAYER_ID", "PLAYER_NAME"] + COUNT_COLUMNS
+# Column prefix -> output zone key
+ZONE_ORDER = {
+    "RA": "restricted_area",
+    "PAINT": "paint",
+    "MID": "mid_range",
+    "LC3": "left_corner",
+    "RC3": "right_corner",
+    "AB3": "top_key",
+}
+
+# ---- INCREMENTAL STORE ----
+# Totals are additive, so the stored table only needs the games since the last run
+# Dates stay open (refetched every REVALIDATE_HOURS, not folded into the totals) until
+# FINALIZE_AFTER_HOURS after the game date, like gamelogs.py: a game the endpoint had
+# not ingested yet on the first pull still arrives
+TOTALS_FILE = "totals.parquet"            # Cumulative FGM/FGA by zone per player, settled dates only
+DISTRIBUTIONS_FILE = "distributions.json" # Last computed output per player (settled + open dates)
+STATE_FILE = "state.json"                 # {"through", "open_through", "open_at", "open_players", "full_at"}
+FULL_REFRESH_DAYS = 7                     # Re-pull season totals weekly to absorb stat corrections
+REVALIDATE_HOURS = 6
+FINALIZE_AFTER_HOURS = 36
+
 # ---- SESSION WITH RETRIES ----
 def create_session():
     session = requests.Session()
@@ -51,24 +96,23 @@ def create_session():
     return session
 
 
-def fetch_shot_locations():
+def fetch_shot_locations(date_from=None, date_to=None):
+    """Season-to-date zone totals, or only the games in [date_from, date_to] ('MM/DD/YYYY')."""
     session = create_session()
 
+    params = dict(PARAMS, DateFrom=date_from or "", DateTo=date_to or "")
     response = session.get(
         URL,
         headers=HEADERS,
-        params=PARAMS,
+        params=params,
         timeout=15
     )
     response.raise_for_status()
 
-    data = response.json()
-    result_set = data["resultSets"]
-
-    columns = result_set["headers"][1]["columnNames"]
-    df = pd.DataFrame(result_set["rowSet"], columns=columns)
-
-    return df
+    # Multi-level headers are flattened to RA_FGA, PAINT_FGM, ... and only the
+    # columns the distribution needs are decoded
+    result_set = get_result_set(response.json())
+    return decode_frame(result_set, ZONE_COLUMNS, group_aliases=ZONE_PREFIXES)
 
 
 # ---------------------------------------------------------
@@ -80,96 +124,135 @@ def get_all_player_zone_distributions(df):
     if df.empty:
         return results
 
-    # Rename duplicate zone columns
-    zone_cols = [
-        "RA_FGM","RA_FGA","RA_PCT",
-        "PAINT_FGM","PAINT_FGA","PAINT_PCT",
-        "MID_FGM","MID_FGA","MID_PCT",
-        "LC3_FGM","LC3_FGA","LC3_PCT",
-        "RC3_FGM","RC3_FGA","RC3_PCT",
-        "AB3_FGM","AB3_FGA","AB3_PCT",
-        "BC_FGM","BC_FGA","BC_PCT",
-        "C3_FGM","C3_FGA","C3_PCT",
-    ]
-
-    df_zones = df.copy()
-    df_zones = df_zones.fillna(0)
-    try:
-        df_zones.columns = list(df_zones.columns[:6]) + zone_cols
-    except Exception as e:
-        print(f"Error renaming columns in shooting zones: {e}")
+    # Columns are already named per zone by the decoder (see ZONE_PREFIXES)
+    missing = [c for c in ZONE_COLUMNS if c not in df.columns]
+    if missing:
+        print(f"Error in shooting zones: missing columns {missing}")
         return results
 
-    for _, p in df_zones.iterrows():
-        player_name = p["PLAYER_NAME"]
-
-        # Total attempts (exclude duplicate aggregate corner-3 column)
-        total_fga = (
-            p["RA_FGA"] +
-            p["PAINT_FGA"] +
-            p["MID_FGA"] +
-            p["LC3_FGA"] +
-            p["RC3_FGA"] +
-            p["AB3_FGA"]
-        )
-
-        if total_fga == 0:
-            continue
-
-        distribution = {
-            "restricted_area": p["RA_FGA"] / total_fga,
-            "paint": p["PAINT_FGA"] / total_fga,
-            "mid_range": p["MID_FGA"] / total_fga,
-            "left_corner": p["LC3_FGA"] / total_fga,
-            "right_corner": p["RC3_FGA"] / total_fga,
-            "top_key": p["AB3_FGA"] / total_fga,
-        }
-        
-        makes = {
-            "restricted_area": p["RA_FGM"],
-            "paint": p["PAINT_FGM"],
-            "mid_range": p["MID_FGM"],
-            "left_corner": p["LC3_FGM"],
-            "right_corner": p["RC3_FGM"],
-            "top_key": p["AB3_FGM"],
-        }
-
-        # 1. Get raw percentages (e.g., 15.33203125)
-        raw_pcts = {zone: val * 100 for zone, val in distribution.items()}
-        
-        # 2. Separate into integer parts and decimal remainders
-        int_pcts = {zone: int(val) for zone, val in raw_pcts.items()}
-        remainders = {zone: val - int(val) for zone, val in raw_pcts.items()}
-        
-        # 3. Calculate how many percentage points we need to reach exactly 100
-        shortfall = 100 - sum(int_pcts.values())
-        
-        # 4. Sort the zones by who had the highest decimal remainder
-        sorted_zones_by_remainder = sorted(remainders.keys(), key=lambda k: remainders[k], reverse=True)
-        
-        # 5. Distribute the missing points to those with the highest remainders
-        for i in range(shortfall):
-            zone_to_bump = sorted_zones_by_remainder[i]
-            int_pcts[zone_to_bump] += 1
-
-        results[player_name] = {
-            zone: {
-                "percentage": f"{int_pcts[zone]}%",
-                "makes": str(int(makes[zone]))
-            }
-            for zone in int_pcts.keys()
-        }
-
-    return results
-
-def get_shooting_zones_data():
-    """Entry point for the pipeline"""
+    # Total attempts exclude the duplicate aggregate corner-3 column
+    fga = df[[f"{prefix}_FGA" for prefix in ZONE_ORDER]].fillna(0).to_numpy()
+    fgm = df[[f"{prefix}_FGM" for prefix in ZONE_ORDER]].fillna(0).to_numpy()
+    return zone_distributions(df["PLAYER_NAME"].tolist(), fga, fgm, list(ZONE_ORDER.values()))
+
+# ---------------------------------------------------------
+# 🔁 Incremental totals
+# ---------------------------------------------------------
+def add_totals(totals, delta):
+    """Adds a date-bounded delta to the cumulative table (new players are appended)."""
+    delta = delta[ZONE_COLUMNS].fillna({c: 0 for c in COUNT_COLUMNS})
+    if totals.empty:
+        return delta.reset_index(drop=True)
+    merged = pd.concat([totals[ZONE_COLUMNS], delta], ignore_index=True)
+    names = merged.groupby("PLAYER_ID")["PLAYER_NAME"].last()   # Latest spelling wins
+    summed = merged.groupby("PLAYER_ID")[COUNT_COLUMNS].sum()
+    return summed.join(names).reset_index()[ZONE_COLUMNS]
+
+def _load_store(store_dir):
+    state, totals, distributions = {}, pd.DataFrame(), {}
+    try:
+        with open(os.path.join(store_dir, STATE_FILE)) as f:
+            state = json.load(f)
+        totals = pd.read_parquet(os.path.join(store_dir, TOTALS_FILE))
+        with open(os.path.join(store_dir, DISTRIBUTIONS_FILE)) as f:
+            distributions = json.load(f)
+    except (OSError, ValueError):
+        return {}, pd.DataFrame(), {}  # Missing or partial store -> full refresh
+    return state, totals, distributions
+
+def _save_store(store_dir, state, totals, distributions):
+    os.makedirs(store_dir, exist_ok=True)
+    # State last: it is what marks the other two files as consistent
+    totals.to_parquet(os.path.join(store_dir, TOTALS_FILE + ".tmp"), index=False)
+    os.replace(os.path.join(store_dir, TOTALS_FILE + ".tmp"), os.path.join(store_dir, TOTALS_FILE))
+    for name, payload in ((DISTRIBUTIONS_FILE, distributions), (STATE_FILE, state)):
+        with open(os.path.join(store_dir, name + ".tmp"), "w") as f:
+            json.dump(payload, f)
+        os.replace(os.path.join(store_dir, name + ".tmp"), os.path.join(store_dir, name))
+
+def _next_day(date):
+    return (datetime.strptime(date, "%m/%d/%Y") + timedelta(days=1)).strftime("%m/%d/%Y")
+
+def _is_settled(date, now):
+    return datetime.strptime(date, "%m/%d/%Y").timestamp() + FINALIZE_AFTER_HOURS * 3600 <= now
+
+def _later(a, b):
+    """a > b for 'MM/DD/YYYY' dates (None is before every date)."""
+    return a is not None and (b is None or datetime.strptime(a, "%m/%d/%Y") > datetime.strptime(b, "%m/%d/%Y"))
+
+def update_shooting_zones(store_dir, now=None):
+    """
+    Brings the stored cumulative totals up to the last settled game date with one
+    date-bounded request, refetches the still-open recent dates on top of them, and
+    recomputes distributions only for players whose totals changed. Returns
+    {player_name: zones} for every player.
+    """
+    now = now or time.time()
+    today = datetime.fromtimestamp(now).date()
+    completed = [d for d in get_completed_game_dates() if datetime.strptime(d, "%m/%d/%Y").date() < today]
+    if not completed:
+        return get_all_player_zone_distributions(fetch_shot_locations())
+    through = completed[0]  # Newest completed date
+    settled = next((d for d in completed if _is_settled(d, now)), None)
+
+    state, totals, distributions = _load_store(store_dir)
+    full = not state or now - state.get("full_at", 0) > FULL_REFRESH_DAYS * 86400
+    open_due = (_later(through, state.get("open_through") or state.get("through"))
+                or (_later(through, settled) and now - state.get("open_at", 0) > REVALIDATE_HOURS * 3600))
+
+    changed_ids = set(state.get("open_players", []))  # Their open games are replaced below
+    if full:
+        totals = add_totals(pd.DataFrame(), fetch_shot_locations(date_to=settled)) if settled else pd.DataFrame()
+        state = {"through": settled, "full_at": now}
+        changed_ids |= set(totals["PLAYER_ID"]) if not totals.empty else set()
+        distributions = {}
+        print(f"   🏀 Shooting zones: full season totals through {settled} for {len(totals)} players")
+    elif _later(settled, state.get("through")):
+        date_from = _next_day(state["through"]) if state.get("through") else None
+        delta = fetch_shot_locations(date_from=date_from, date_to=settled)
+        delta = delta[delta[COUNT_COLUMNS].fillna(0).sum(axis=1) > 0]
+        totals = add_totals(totals, delta)
+        changed_ids |= set(delta["PLAYER_ID"])
+        state = dict(state, through=settled)
+        print(f"   🏀 Shooting zones: settled {date_from or 'season'}-{settled}, {len(delta)} players")
+    elif not open_due:
+        print(f"   🏀 Shooting zones: up to date through {through}")
+        return distributions
+
+    # Dates after the settled ones are refetched whole until they settle
+    current = totals
+    state = dict(state, open_through=None, open_at=now, open_players=[])
+    if _later(through, settled):
+        date_from = _next_day(settled) if settled else None
+        open_delta = fetch_shot_locations(date_from=date_from, date_to=through)
+        open_delta = open_delta[open_delta[COUNT_COLUMNS].fillna(0).sum(axis=1) > 0]
+        current = add_totals(totals, open_delta)
+        state.update(open_through=through, open_players=[int(pid) for pid in open_delta["PLAYER_ID"]])
+        changed_ids |= set(state["open_players"])
+        print(f"   🏀 Shooting zones: open dates {date_from or 'season'}-{through}, {len(open_delta)} players")
+
+    if not current.empty:
+        changed = current[current["PLAYER_ID"].isin(changed_ids)]
+        distributions.update(get_all_player_zone_distributions(changed))
+        # Output is keyed by name: drop the old key of a player whose spelling changed
+        names = set(current["PLAYER_NAME"])
+        distributions = {name: zones for name, zones in distributions.items() if name in names}
+        print(f"   🏀 Shooting zones: recomputed {len(changed)} players")
+
+    _save_store(store_dir, state, totals, distributions)
+    return distributions
+
+def get_shooting_zones_data(store_dir=None):
+    """Entry point for the pipeline (incremental when a store_dir is given)"""
     try:
+        if store_dir:
+            return update_shooting_zones(store_dir)
         df = fetch_shot_locations()
         return get_all_player_zone_distributions(df)
     except Exception as e:
         print(f"Error fetching shooting zones: {e}")
-        return {}
+        # Serve the last stored distributions rather than nothing
+        return _load_store(store_dir)[2] if store_dir else {}
 
 # ---------------------------------------------------------
 # 🚀 MAIN
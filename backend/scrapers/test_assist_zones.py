@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+import assist_zones
+from assist_zones import update_team_networks, FINALIZE_AFTER_HOURS, REVALIDATE_HOURS
+
+HOUR = 3600
+
+def at(date, hours):
+    return datetime.strptime(date, "%Y-%m-%d").timestamp() + hours * HOUR
+
+class TestTeamNetworks(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.last_final = {1: "2026-01-10", 2: "2026-01-09"}
+        self.assists = {1: 10, 2: 20}  # What pbpstats currently has per team
+        self.requested = []
+        fakes = {
+            'get_team_last_final_dates': lambda: dict(self.last_final),
+            'get_all_team_ids': lambda: [],
+            'fetch_teams': self.fetch_teams,
+        }
+        self.originals = {name: getattr(assist_zones, name) for name in fakes}
+        for name, fake in fakes.items():
+            setattr(assist_zones, name, fake)
+
+    def tearDown(self):
+        for name, original in self.originals.items():
+            setattr(assist_zones, name, original)
+        shutil.rmtree(self.store_dir)
+
+    def fetch_teams(self, team_ids):
+        self.requested.append(sorted(team_ids))
+        return {tid: {f"Passer {tid}": {'Total': self.assists[tid]}} for tid in team_ids}
+
+    def run_at(self, now):
+        return update_team_networks(self.store_dir, now=now)
+
+    def test_lagging_network_is_revalidated_until_final(self):
+        self.run_at(at("2026-01-10", 3))  # Team 1 played last night; pbpstats may not have it yet
+        self.assertEqual(self.requested, [[1, 2]])
+
+        self.run_at(at("2026-01-10", 4))
+        self.assertEqual(len(self.requested), 1)  # Not due for revalidation yet
+
+        self.assists[1] = 14  # pbpstats catches up
+        networks = self.run_at(at("2026-01-10", 3 + REVALIDATE_HOURS))
+        self.assertEqual(self.requested[-1], [1, 2])
+        self.assertEqual(networks[1]["Passer 1"]["Total"], 14)
+
+        # Fetched FINALIZE_AFTER_HOURS after each game: final, never fetched again for that game
+        self.run_at(at("2026-01-10", FINALIZE_AFTER_HOURS))
+        n_requests = len(self.requested)
+        self.run_at(at("2026-01-12", 0))
+        self.assertEqual(len(self.requested), n_requests)
+
+        # A new game reopens only that team
+        self.last_final[2] = "2026-01-12"
+        self.run_at(at("2026-01-12", 12))
+        self.assertEqual(self.requested[-1], [2])
+
+if __name__ == '__main__':
+    unittest.main()
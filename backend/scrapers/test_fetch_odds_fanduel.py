@@ -0,0 +1,20 @@
+import unittest
+from fetch_odds_fanduel import get_all_available_tabs
+
+def event_page(default_tab_id):
+    return {'layout': {'defaultTabId': default_tab_id, 'tabs': {
+        '1': {'title': 'Popular'}, '2': {'title': 'Player Points'}, '3': {'title': 'Player Rebounds'}}}}
+
+class TestAvailableTabs(unittest.TestCase):
+    def test_ignored_default_tab(self):
+        tabs, default_ignored = get_all_available_tabs(event_page(1))
+        self.assertEqual([t['name'] for t in tabs], ['player-points', 'player-rebounds'])
+        self.assertTrue(default_ignored)  # Its markets are the popular tab's, so they are skipped
+
+    def test_prop_default_tab(self):
+        tabs, default_ignored = get_all_available_tabs(event_page(2))
+        self.assertEqual([t['name'] for t in tabs], ['player-rebounds'])  # Already in the page
+        self.assertFalse(default_ignored)
+
+if __name__ == '__main__':
+    unittest.main()
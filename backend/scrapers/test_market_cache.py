@@ -0,0 +1,34 @@
+import unittest
+from market_cache import MarketCache
+
+class TestMarketCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MarketCache("test")
+        self.calls = []
+
+    def parse(self, key, market):
+        def parser():
+            self.calls.append(key)
+            return [{"line": market["line"]}]
+        return self.cache.parse(key, (market, "game"), parser)
+
+    def test_reuses_unchanged_markets(self):
+        self.parse("a", {"line": 10.5})
+        self.parse("b", {"line": 4.5})
+        self.cache.end_run()
+
+        self.assertEqual(self.parse("a", {"line": 10.5}), [{"line": 10.5}])
+        self.assertEqual(self.parse("b", {"line": 5.5}), [{"line": 5.5}])
+        stats = self.cache.end_run()
+        self.assertEqual(self.calls, ["a", "b", "b"])
+        self.assertEqual((stats["markets"], stats["reused"]), (2, 1))
+
+    def test_evicts_markets_not_seen(self):
+        self.parse("a", {"line": 10.5})
+        self.cache.end_run()
+        self.cache.end_run()
+        self.parse("a", {"line": 10.5})
+        self.assertEqual(self.calls, ["a", "a"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from result_set import get_result_set, decode_result_set, decode_frame
+
+FLAT = {'resultSets': [{
+    'name': 'LeagueDashPtStats',
+    'headers': ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'POTENTIAL_AST', 'DRIVES'],
+    'rowSet': [[1, 'A', 10, 5.5, 3], [2, 'B', 20, None, 7]],
+}]}
+
+SHOT_LOCATIONS = {'resultSets': {
+    'name': 'ShotLocations',
+    'headers': [
+        {'name': 'SHOT_CATEGORY', 'columnsToSkip': 2, 'columnSpan': 3,
+         'columnNames': ['Restricted Area', 'Mid-Range']},
+        {'name': 'columns', 'columnNames': ['PLAYER_ID', 'PLAYER_NAME',
+                                            'FGM', 'FGA', 'FG_PCT', 'FGM', 'FGA', 'FG_PCT']},
+    ],
+    'rowSet': [[1, 'A', 4, 6, 0.667, 1, 5, 0.2]],
+}}
+
+class TestResultSet(unittest.TestCase):
+    def test_projection_and_types(self):
+        cols = decode_result_set(get_result_set(FLAT), ['PLAYER_ID', 'POTENTIAL_AST', 'NOT_THERE'])
+        self.assertEqual(list(cols), ['PLAYER_ID', 'POTENTIAL_AST'])
+        self.assertEqual(cols['PLAYER_ID'].dtype, np.int64)
+        self.assertEqual(cols['POTENTIAL_AST'].dtype, np.float64)
+        self.assertTrue(np.isnan(cols['POTENTIAL_AST'][1]))
+
+    def test_single_column_and_empty(self):
+        self.assertEqual(decode_frame(get_result_set(FLAT), ['PLAYER_NAME'])['PLAYER_NAME'].tolist(), ['A', 'B'])
+        empty = decode_frame({'headers': ['PLAYER_ID'], 'rowSet': []}, ['PLAYER_ID'])
+        self.assertTrue(empty.empty)
+
+    def test_multi_level_headers(self):
+        df = decode_frame(get_result_set(SHOT_LOCATIONS), ['PLAYER_NAME', 'RA_FGA', 'MID_FGM'],
+                          group_aliases={'Restricted Area': 'RA', 'Mid-Range': 'MID'})
+        self.assertEqual(df.iloc[0].tolist(), ['A', 6, 1])
+
+if __name__ == '__main__':
+    unittest.main()
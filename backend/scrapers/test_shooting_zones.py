@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import shooting_zones
+from shooting_zones import (add_totals, get_all_player_zone_distributions, update_shooting_zones,
+                            COUNT_COLUMNS, ZONE_COLUMNS, STATE_FILE, FULL_REFRESH_DAYS, REVALIDATE_HOURS)
+
+DATES = pd.date_range('2025-10-22', periods=12).strftime('%m/%d/%Y').tolist()
+
+class FakeLeague:
+    """Per-game zone counts, served summed over a date range like leaguedashplayershotlocations."""
+    def __init__(self, seed=7):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for i, date in enumerate(DATES):
+            for pid in range(1, 9):
+                if pid == 8 and i < 5:
+                    continue  # Debuts mid-run
+                if rng.random() < 0.25:
+                    continue  # Did not play
+                fga = rng.integers(0, 8, len(COUNT_COLUMNS) // 2)
+                fgm = rng.binomial(fga, 0.45)
+                counts = np.ravel(np.column_stack([fgm, fga]))  # RA_FGM, RA_FGA, PAINT_FGM, ...
+                name = f"Player {pid}" + (" Jr." if pid == 3 and i >= 6 else "")  # Name fix mid-season
+                rows.append({'DATE': date, 'PLAYER_ID': pid, 'PLAYER_NAME': name,
+                             **dict(zip(COUNT_COLUMNS, counts.astype(float)))})
+        self.games = pd.DataFrame(rows)
+        self.games['DAY'] = pd.to_datetime(self.games['DATE'])
+        self.through = DATES[0]
+        self.unposted = set()  # Played dates the endpoint has not ingested yet
+        self.requests = []
+
+    def completed(self):
+        return [d for d in DATES[::-1] if datetime.strptime(d, '%m/%d/%Y') <= datetime.strptime(self.through, '%m/%d/%Y')]
+
+    def fetch(self, date_from=None, date_to=None):
+        self.requests.append((date_from, date_to))
+        return self.totals(date_from, date_to, skip=self.unposted)
+
+    def totals(self, date_from=None, date_to=None, skip=()):
+        games = self.games[(self.games['DAY'] <= pd.Timestamp(date_to)) & ~self.games['DATE'].isin(skip)]
+        if date_from:
+            games = games[games['DAY'] >= pd.Timestamp(date_from)]
+        games = games.sort_values('DAY')
+        summed = games.groupby('PLAYER_ID')[COUNT_COLUMNS].sum()
+        names = games.groupby('PLAYER_ID')['PLAYER_NAME'].last()
+        out = summed.join(names).reset_index()[ZONE_COLUMNS]
+        out.loc[out['PLAYER_ID'] == 2, 'LC3_FGA'] = np.nan  # The endpoint sends nulls for empty zones
+        return out
+
+class TestIncrementalShootingZones(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.league = FakeLeague()
+        self.patched = {'fetch_shot_locations': self.league.fetch, 'get_completed_game_dates': self.league.completed}
+        self.originals = {name: getattr(shooting_zones, name) for name in self.patched}
+        for name, fake in self.patched.items():
+            setattr(shooting_zones, name, fake)
+
+    def tearDown(self):
+        for name, original in self.originals.items():
+            setattr(shooting_zones, name, original)
+        shutil.rmtree(self.store_dir)
+
+    def full_recomputation(self):
+        totals = add_totals(pd.DataFrame(), self.league.totals(date_to=self.league.through))
+        return totals, get_all_player_zone_distributions(totals)
+
+    def stored_totals(self):
+        return pd.read_parquet(os.path.join(self.store_dir, shooting_zones.TOTALS_FILE))
+
+    def assert_matches_full(self, distributions):
+        expected_totals, expected = self.full_recomputation()
+        got = self.stored_totals().sort_values('PLAYER_ID').reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected_totals.sort_values('PLAYER_ID').reset_index(drop=True),
+                                      check_dtype=False)
+        self.assertEqual(distributions, expected)
+
+    def test_daily_deltas_equal_full_recomputation(self):
+        # A full pull, then one date-bounded delta per run for FULL_REFRESH_DAYS days
+        for i in range(3, 4 + FULL_REFRESH_DAYS):
+            self.league.through = DATES[i]
+            self.assert_matches_full(update_shooting_zones(self.store_dir))
+        self.assertEqual(self.league.requests[0], (None, DATES[3]))
+        self.assertTrue(all(date_from for date_from, _ in self.league.requests[1:]))
+
+        # Up to date: no request at all
+        n_requests = len(self.league.requests)
+        self.assert_matches_full(update_shooting_zones(self.store_dir))
+        self.assertEqual(len(self.league.requests), n_requests)
+
+    def test_weekly_full_refresh_absorbs_corrections(self):
+        self.league.through = DATES[4]
+        update_shooting_zones(self.store_dir)
+        # A stat correction to an already-ingested game is invisible to deltas...
+        self.league.games.loc[self.league.games.index[0], 'RA_FGA'] += 5
+        self.league.through = DATES[5]
+        update_shooting_zones(self.store_dir)
+        self.assertNotEqual(self.stored_totals()['RA_FGA'].sum(), self.full_recomputation()[0]['RA_FGA'].sum())
+
+        # ...until the store is FULL_REFRESH_DAYS old and is pulled again
+        state_path = os.path.join(self.store_dir, STATE_FILE)
+        with open(state_path) as f:
+            state = json.load(f)
+        state['full_at'] -= FULL_REFRESH_DAYS * 86400 + 1
+        with open(state_path, 'w') as f:
+            json.dump(state, f)
+        self.league.through = DATES[6]
+        self.assert_matches_full(update_shooting_zones(self.store_dir))
+        self.assertEqual(self.league.requests[-1], (None, DATES[6]))
+
+    def test_late_games_arrive_while_dates_are_open(self):
+        self.league.through = DATES[5]
+        night = datetime.strptime(DATES[5], '%m/%d/%Y').timestamp()
+        self.league.unposted = {DATES[5]}
+        first = update_shooting_zones(self.store_dir, now=night + 25 * 3600)
+        self.assertNotEqual(first, self.full_recomputation()[1])  # That night's games are missing
+
+        self.league.unposted = set()
+        n_requests = len(self.league.requests)
+        self.assertEqual(update_shooting_zones(self.store_dir, now=night + 26 * 3600), first)
+        self.assertEqual(len(self.league.requests), n_requests)   # Revalidated at most every REVALIDATE_HOURS
+
+        revalidated = update_shooting_zones(self.store_dir, now=night + (25 + REVALIDATE_HOURS + 1) * 3600)
+        self.assertEqual(revalidated, self.full_recomputation()[1])
+        self.assertEqual(self.league.requests[-1], (DATES[5], DATES[5]))
+
+        self.assert_matches_full(update_shooting_zones(self.store_dir, now=night + 37 * 3600))  # Settled: folded in
+
+if __name__ == '__main__':
+    unittest.main()
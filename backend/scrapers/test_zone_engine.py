@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from zone_engine import largest_remainder_percentages, zone_distributions
+
+def reference(row, total):
+    """The per-row loop the engine replaced."""
+    raw = [v / total * 100 for v in row]
+    ints = [int(v) for v in raw]
+    order = sorted(range(len(row)), key=lambda i: raw[i] - ints[i], reverse=True)
+    for i in range(100 - sum(ints)):
+        ints[order[i]] += 1
+    return ints
+
+class TestZoneEngine(unittest.TestCase):
+    def test_matches_per_row_loop(self):
+        rng = np.random.default_rng(0)
+        counts = rng.poisson(rng.uniform(0, 80, (500, 1)), (500, 6))
+        counts[counts.sum(axis=1) == 0, 0] = 1
+        pcts = largest_remainder_percentages(counts)
+        for row, got in zip(counts, pcts):
+            self.assertEqual(got.tolist(), reference(row.tolist(), row.sum()))
+        self.assertTrue((pcts.sum(axis=1) == 100).all())
+
+    def test_ties_go_to_earlier_zone(self):
+        self.assertEqual(largest_remainder_percentages([[1, 1, 1]]).tolist(), [[34, 33, 33]])
+
+    def test_zero_total(self):
+        self.assertEqual(largest_remainder_percentages([[0, 0, 0]]).tolist(), [[0, 0, 0]])
+        out = zone_distributions(['A', 'B'], [[0, 0], [3, 1]], [[0, 0], [2.5, 1]], ['x', 'y'])
+        self.assertEqual(out, {'B': {'x': {'percentage': '75%', 'makes': '2'},
+                                     'y': {'percentage': '25%', 'makes': '1'}}})
+
+    def test_explicit_totals(self):
+        # Shares of a total larger than the zone sum: the shortfall is capped at one point per zone
+        self.assertEqual(largest_remainder_percentages([[1, 1]], totals=[4]).tolist(), [[26, 26]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Vectorized zone distributions shared by shooting_zones and assist_zones.
+
+Every player is a row of per-zone counts. Shares, whole-number percentages
+and the largest-remainder correction (so each row sums to exactly 100%) are
+computed for all players at once; only the final dict formatting is a loop.
+"""
+import numpy as np
+
+def largest_remainder_percentages(counts, totals=None):
+    """
+    Integer percentages per row that add up to 100.
+
+    Each zone gets floor(100 * count / total); the points still missing are
+    handed out one each to the zones with the largest remainders (ties go to
+    the earlier zone). `totals` defaults to the row sums. Rows with a zero
+    total are returned as zeros.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=1) if totals is None else np.asarray(totals, dtype=np.float64)
+    n_rows, n_zones = counts.shape
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = np.where(totals[:, None] > 0, counts / totals[:, None], 0.0) * 100
+    floors = np.floor(raw)
+    remainders = raw - floors
+    shortfall = 100 - floors.sum(axis=1)
+    shortfall[totals <= 0] = 0
+
+    # Rank of each zone by remainder within its row (0 = largest, stable on ties)
+    order = np.argsort(-remainders, axis=1, kind="stable")
+    rank = np.empty_like(order)
+    rank[np.arange(n_rows)[:, None], order] = np.arange(n_zones)
+
+    return (floors + (rank < shortfall[:, None])).astype(np.int64)
+
+def zone_distributions(names, counts, makes, zones, totals=None):
+    """
+    {name: {zone: {"percentage": "NN%", "makes": "N"}}} for every row with a
+    positive total. Later rows win on duplicate names.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=1) if totals is None else np.asarray(totals, dtype=np.float64)
+    pcts = largest_remainder_percentages(counts, totals)
+    makes = np.trunc(np.asarray(makes, dtype=np.float64)).astype(np.int64)
+
+    results = {}
+    for i in np.flatnonzero(totals > 0):
+        results[names[i]] = {
+            zone: {"percentage": f"{pct}%", "makes": str(made)}
+            for zone, pct, made in zip(zones, pcts[i].tolist(), makes[i].tolist())
+        }
+    return results
@@ -0,0 +1,218 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from aiohttp.test_utils import AioHTTPTestCase, TestClient
+import api_server
+from api_server import create_app, load_snapshot, STATE_KEY
+from utils.feed_snapshot import FEED_FILE, GAMES_FILE
+from utils.feed_writer import write_feed, brotli
+
+FEED = "/data/current/" + FEED_FILE
+
+def feed_players(line=24.5):
+    return [
+        {'id': 2544, 'name': 'LeBron James', 'team': 'LAL',
+         'props': {'PTS': {'dk': {'line': line, 'over': -115, 'under': -105}}}},
+        {'id': 1628983, 'name': 'Shai Gilgeous-Alexander', 'team': 'OKC', 'props': {}},
+    ]
+
+def publish_feed(data_dir, players):
+    write_feed(os.path.join(data_dir, FEED_FILE), iter(players), header={'game_log_columns': []},
+               gzip_companion=True, brotli_companion=True)
+    with open(os.path.join(data_dir, GAMES_FILE), "w") as f:
+        json.dump([{'game_id': '0022500001', 'home_team_tricode': 'LAL', 'away_team_tricode': 'OKC'}], f)
+
+async def read_event(response):
+    """Next SSE event as (id, event, data), skipping keep-alive comments."""
+    fields = {}
+    while True:
+        line = (await response.content.readline()).decode().rstrip("\n")
+        if not line:
+            if fields:
+                return fields.get("id"), fields.get("event"), json.loads(fields.get("data", "null"))
+            continue
+        if not line.startswith(":"):
+            key, value = line.split(": ", 1)
+            fields[key] = value
+
+class ApiServerCase(AioHTTPTestCase):
+    players = feed_players()
+
+    async def get_application(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        if self.players is not None:
+            publish_feed(self.tmp_dir.name, self.players)
+        return create_app(self.tmp_dir.name, assets_dir=self.tmp_dir.name + "/none", history_dir=None, status_path=None)
+
+    async def tearDownAsync(self):
+        self.tmp_dir.cleanup()
+
+    @property
+    def state(self):
+        return self.app[STATE_KEY]
+
+class TestFeedResponses(ApiServerCase):
+    async def test_etag_and_304(self):
+        res = await self.client.get(FEED, headers={'Accept-Encoding': 'identity'})
+        self.assertEqual(res.status, 200)
+        etag = res.headers['ETag']
+        self.assertEqual(etag, f'"{self.state.snapshot.version}"')
+        self.assertEqual(len((await res.json())['players']), 2)
+
+        for if_none_match in (etag, f'"stale", {etag}', '*'):
+            res = await self.client.get(FEED, headers={'Accept-Encoding': 'identity', 'If-None-Match': if_none_match})
+            self.assertEqual(res.status, 304)
+            self.assertEqual(res.headers['ETag'], etag)
+        res = await self.client.get(FEED, headers={'Accept-Encoding': 'identity', 'If-None-Match': '"stale"'})
+        self.assertEqual(res.status, 200)
+
+    async def test_precompressed_encoding(self):
+        path = os.path.join(self.tmp_dir.name, FEED_FILE)
+        with open(path, "rb") as f:
+            identity = f.read()
+        raw = TestClient(self.server, auto_decompress=False)
+        try:
+            cases = [('gzip, deflate', 'gzip', '.gz'), ('identity', None, '')]
+            if brotli is not None:
+                cases.append(('gzip, br;q=1.0', 'br', '.br'))
+            for accept, coding, suffix in cases:
+                res = await raw.get(FEED, headers={'Accept-Encoding': accept})
+                self.assertEqual(res.headers.get('Content-Encoding'), coding)
+                self.assertEqual(res.headers['Vary'], 'Accept-Encoding')
+                with open(path + suffix, "rb") as f:
+                    self.assertEqual(await res.read(), f.read())  # The companion file, not recompressed
+                if coding:
+                    self.assertTrue(res.headers['ETag'].endswith(f'-{"gz" if coding == "gzip" else coding}"'))
+        finally:
+            await raw.close()
+        self.assertEqual(gzip.decompress(self.state.snapshot.file(FEED_FILE).gzip), identity)
+
+    async def test_player_and_game(self):
+        res = await self.client.get("/api/players/2544")
+        self.assertEqual((await res.json())['players'][0]['name'], 'LeBron James')
+        self.assertEqual((await self.client.get("/api/players/1")).status, 404)
+        self.assertEqual((await self.client.get("/api/players/abc")).status, 400)
+        res = await self.client.get("/api/games/0022500001")
+        self.assertEqual(len((await res.json())['players']), 2)
+
+class TestOddsStream(ApiServerCase):
+    def move_line(self, line):
+        publish_feed(self.tmp_dir.name, feed_players(line))
+        return self.state.publish(*load_snapshot(self.tmp_dir.name))
+
+    async def test_hello_then_live_delta(self):
+        res = await self.client.get("/api/odds/stream")
+        event_id, event, data = await read_event(res)
+        self.assertEqual((event_id, event), (f"{self.state.epoch}:0", "hello"))
+        self.assertEqual(data['version'], self.state.snapshot.version)
+
+        base = self.state.snapshot.version
+        entry = self.move_line(25.5)
+        event_id, event, data = await read_event(res)
+        self.assertEqual((event_id, event), (f"{self.state.epoch}:1", "odds"))
+        self.assertEqual(data['base'], base)
+        self.assertEqual(data['changed'], [[2544, 'PTS', 'dk', 25.5, -115, -105, None]])
+        self.assertEqual(data, entry)
+        res.close()
+
+    async def test_resume_replays_missed_deltas(self):
+        self.move_line(25.5)
+        self.move_line(26.5)
+        res = await self.client.get("/api/odds/stream", headers={'Last-Event-ID': f"{self.state.epoch}:0"})
+        seen = [await read_event(res) for _ in range(2)]
+        self.assertEqual([e[0] for e in seen], [f"{self.state.epoch}:1", f"{self.state.epoch}:2"])
+        self.assertEqual([e[2]['changed'][0][3] for e in seen], [25.5, 26.5])
+        res.close()
+
+        res = await self.client.get("/api/odds/stream", params={'last_event_id': f"{self.state.epoch}:2"})
+        self.move_line(27.5)
+        self.assertEqual((await read_event(res))[0], f"{self.state.epoch}:3")  # Nothing replayed, live from here
+        res.close()
+
+    async def test_stale_feed_version_resets(self):
+        res = await self.client.get(FEED)
+        loaded = res.headers['X-Feed-Version']
+        self.assertIn('X-Feed-Version', res.headers['Access-Control-Expose-Headers'])
+        stream = await self.client.get("/api/odds/stream", params={'version': loaded})
+        self.assertEqual((await read_event(stream))[1], "hello")
+        stream.close()
+
+        self.move_line(25.5)  # Published between the client's GET and its subscribe
+        stream = await self.client.get("/api/odds/stream", params={'version': loaded})
+        event_id, event, data = await read_event(stream)
+        self.assertEqual((event_id, event), (f"{self.state.epoch}:1", "reset"))
+        self.assertEqual(data['version'], self.state.snapshot.version)
+        stream.close()
+
+    async def test_other_epoch_resets(self):
+        res = await self.client.get("/api/odds/stream", headers={'Last-Event-ID': "1:5"})
+        event_id, event, data = await read_event(res)
+        self.assertEqual(event, "reset")
+        self.assertEqual(data['version'], self.state.snapshot.version)
+        res.close()
+
+class TestStartWithoutFeed(ApiServerCase):
+    players = None
+
+    async def test_serves_empty_then_picks_up_feed(self):
+        api_server.RELOAD_POLL_SECONDS, poll = 0.05, api_server.RELOAD_POLL_SECONDS
+        try:
+            self.assertEqual((await self.client.get(FEED)).status, 404)
+            self.assertEqual((await (await self.client.get("/api/health")).json())['players'], 0)
+
+            publish_feed(self.tmp_dir.name, feed_players())
+            for _ in range(100):
+                if self.state.snapshot.players:
+                    break
+                await asyncio.sleep(0.05)
+            self.assertEqual((await self.client.get(FEED)).status, 200)
+            self.assertEqual((await (await self.client.get("/api/health")).json())['players'], 2)
+        finally:
+            api_server.RELOAD_POLL_SECONDS = poll
+
+class TestScheduleOnlyGeneration(ApiServerCase):
+    """fetch_todays_games.py publishes a generation whose feed is a hard link of the last one."""
+    players = None
+
+    async def get_application(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.generation('g1')
+        os.symlink(os.path.join(self.tmp_dir.name, 'g1'), os.path.join(self.tmp_dir.name, 'current'))
+        return create_app(os.path.join(self.tmp_dir.name, 'current'), assets_dir=self.tmp_dir.name + "/none",
+                          history_dir=None, status_path=None)
+
+    def generation(self, name, game_id=None):
+        gen_dir = os.path.join(self.tmp_dir.name, name)
+        os.makedirs(gen_dir)
+        if game_id is None:
+            publish_feed(gen_dir, feed_players())
+            return
+        previous = os.path.join(self.tmp_dir.name, 'g1')
+        for f in os.listdir(previous):
+            if f != GAMES_FILE:
+                os.link(os.path.join(previous, f), os.path.join(gen_dir, f))
+        with open(os.path.join(gen_dir, GAMES_FILE), "w") as f:
+            json.dump([{'game_id': game_id, 'home_team_tricode': 'BOS', 'away_team_tricode': 'NYK'}], f)
+
+    async def test_new_schedule_is_served(self):
+        api_server.RELOAD_POLL_SECONDS, poll = 0.05, api_server.RELOAD_POLL_SECONDS
+        try:
+            version = self.state.snapshot.version
+            self.generation('g2', game_id='0022500002')
+            tmp_link = os.path.join(self.tmp_dir.name, 'current.tmp')
+            os.symlink(os.path.join(self.tmp_dir.name, 'g2'), tmp_link)
+            os.replace(tmp_link, os.path.join(self.tmp_dir.name, 'current'))
+            for _ in range(100):
+                if '0022500002' in await (await self.client.get("/api/games")).text():
+                    break
+                await asyncio.sleep(0.05)
+            self.assertIn('0022500002', await (await self.client.get("/api/games")).text())
+            self.assertEqual(self.state.snapshot.version, version)  # Same feed: SSE clients stay put
+        finally:
+            api_server.RELOAD_POLL_SECONDS = poll
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import pandas as pd
+import run_pipeline
+from run_pipeline import run_odds_tick, DK_FILE, FD_FILE, MASTER_FILE
+from utils.publisher import ArtifactPublisher
+
+PLAYER = {'id': 2544, 'name': 'LeBron James', 'team': 'LAL', 'props': {}}
+
+def book_rows(line, over, under):
+    return [{'player': 'LeBron James', 'team': 'LAL', 'prop_type': 'points',
+             'line': line, 'over_odds': over, 'under_odds': under}]
+
+class TestOddsTickOutages(unittest.TestCase):
+    """A book that is down must not publish its quotes as removed."""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        # Prior generation: a feed and one CSV per book
+        publisher = ArtifactPublisher(self.root)
+        stage = publisher.begin()
+        pd.DataFrame(book_rows(24.5, -115, -105)).to_csv(os.path.join(stage, DK_FILE), index=False)
+        pd.DataFrame(book_rows(25.5, -110, -110)).to_csv(os.path.join(stage, FD_FILE), index=False)
+        with open(os.path.join(stage, MASTER_FILE), "w") as f:
+            json.dump({'game_log_columns': [], 'players': [PLAYER]}, f)
+        self.previous = publisher.commit()
+        for name, value in (('DATA_ROOT', self.root), ('DATA_DIR', os.path.join(self.root, 'current')),
+                            ('ODDS_HISTORY_DIR', None), ('LOGS_STORE_DIR', None), ('FEED_COMPRESSION', ())):
+            patcher = mock.patch.object(run_pipeline, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def tick(self, dk, fd):
+        with mock.patch.object(run_pipeline.draftkings, 'fetch_dk_odds', dk), \
+             mock.patch.object(run_pipeline.fanduel, 'fetch_odds', fd):
+            run_odds_tick()
+        return os.path.realpath(os.path.join(self.root, 'current'))
+
+    def test_empty_and_failed_books_keep_previous_quotes(self):
+        def fd_down():
+            raise RuntimeError("FanDuel: NBA main page unavailable")
+        published = self.tick(dk=lambda: [], fd=fd_down)
+
+        self.assertNotEqual(published, self.previous)
+        for name in (DK_FILE, FD_FILE):
+            self.assertTrue(os.path.samefile(os.path.join(published, name), os.path.join(self.previous, name)))
+        with open(os.path.join(published, MASTER_FILE)) as f:
+            quotes = json.load(f)['players'][0]['props']['PTS']
+        self.assertEqual((quotes['dk']['line'], quotes['fd']['line']), (24.5, 25.5))
+
+    def test_live_book_replaces_its_quotes(self):
+        published = self.tick(dk=lambda: book_rows(26.5, -120, 100), fd=lambda: [])
+        with open(os.path.join(published, MASTER_FILE)) as f:
+            quotes = json.load(f)['players'][0]['props']['PTS']
+        self.assertEqual((quotes['dk']['line'], quotes['fd']['line']), (26.5, 25.5))
+
+class TestDaemon(unittest.TestCase):
+    def test_odds_ticks_continue_during_a_full_run(self):
+        full_done = threading.Event()
+        ticks = []
+
+        def slow_full_run(status, books):
+            self.assertFalse(books)  # The odds ticks scrape the books
+            full_done.wait(5)
+            return "full-gen"
+
+        def odds_tick(status):
+            ticks.append(full_done.is_set())
+            if len(ticks) == 5:
+                full_done.set()  # Five ticks ran while the full run was still going
+            if len(ticks) == 8:
+                raise KeyboardInterrupt
+            return "odds-gen"
+
+        with tempfile.TemporaryDirectory() as tmp, \
+             mock.patch.object(run_pipeline, 'STATUS_PATH', os.path.join(tmp, 'status.json')), \
+             mock.patch.object(run_pipeline, 'run_full', slow_full_run), \
+             mock.patch.object(run_pipeline, 'run_odds_tick', odds_tick):
+            with self.assertRaises(KeyboardInterrupt):
+                run_pipeline.run_daemon(odds_interval=0.01, stats_interval=3600, jitter=0)
+            with open(os.path.join(tmp, 'status.json')) as f:
+                status = json.load(f)
+        self.assertEqual(ticks[:5], [False] * 5)
+        self.assertIsNotNone(status['last_full_at'])
+
+if __name__ == '__main__':
+    unittest.main()
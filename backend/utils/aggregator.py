@@ -3,6 +3,22 @@ import json
 import os
 import numpy as np
 from utils.player_matcher import PlayerMatcher
+from utils.feed_writer import write_feed
+from utils.gamelog_store import GameLogStore
+from utils.binary_feed import write_binary_feed
+from utils.odds_diff import quote_index
+from utils.odds_history import OddsHistoryStore
+from utils.hit_rates import attach_splits, LOG_COLUMNS as SPLIT_LOG_COLUMNS
+from utils.similar_players import attach_similar, score_similar_lines, opponent_map, LOG_COLUMNS as SIMILAR_LOG_COLUMNS
+from utils.defense_cube import build_defense_cube
+from utils.rolling_state import build_rolling_state, compact_rolling, rolling_coverage
+from utils.pricing import attach_pricing
+from utils.alt_lines import Ladder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ==========================================
 # 1. CONFIGURATION MAPPINGS
@@ -27,6 +43,23 @@ DISPLAY_STATS = [
     'PTS+REB+AST', 'PTS+REB', 'PTS+AST', 'REB+AST', 'STL+BLK'
 ]
 
+# How many recent games per player go into the feed
+GAME_LOG_HISTORY = 35
+
+# The game-log columns the Frontend actually reads (BarChart, Header ticker).
+# Only these are written when the feed uses the columnar game_log layout.
+GAME_LOG_COLUMNS = [
+    # Identity
+    'GAME_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN',
+    # Box score
+    'PTS', 'REB', 'AST', 'FG3M', 'FG3A', 'FGM', 'FGA', 'FTM', 'FTA',
+    'STL', 'BLK', 'TOV', 'PLUS_MINUS',
+    # Tracking
+    'POTENTIAL_AST', 'REB_CHANCES', 'DRIVES',
+    # Combos
+    'PTS+REB+AST', 'PTS+REB', 'PTS+AST', 'REB+AST', 'STL+BLK'
+]
+
 # ==========================================
 # 2. HELPER FUNCTIONS
 # ==========================================
@@ -72,21 +105,266 @@ def load_json(path):
             return {}
     return {}
 
+def load_game_logs(logs_path, player_ids=None, columns=None):
+    """
+    Loads the last GAME_LOG_HISTORY games per player.
+    logs_path is either the partitioned game-log store (a directory) or a legacy
+    gamelogs.csv; the store pushes the player/column selection down to Parquet.
+    """
+    if os.path.isdir(logs_path):
+        try:
+            return GameLogStore(logs_path).recent_games(GAME_LOG_HISTORY, columns=columns, player_ids=player_ids)
+        except Exception as e:
+            print(f"   ⚠️ Error reading game-log store: {e}")
+            return pd.DataFrame()
+
+    df_logs = load_csv(logs_path)
+    if df_logs.empty or 'PLAYER_ID' not in df_logs.columns:
+        return df_logs
+    return df_logs.groupby('PLAYER_ID').head(GAME_LOG_HISTORY).reset_index(drop=True)
+
+def load_season_logs(logs_path, player_ids=None, columns=None):
+    """Every stored game for the given players (by default only the columns the hit-rate splits need)."""
+    columns = list(dict.fromkeys(['PLAYER_ID', 'GAME_DATE'] + (columns or SPLIT_LOG_COLUMNS)))
+    if os.path.isdir(logs_path):
+        try:
+            return GameLogStore(logs_path).read(columns=columns, player_ids=player_ids)
+        except Exception as e:
+            print(f"   ⚠️ Error reading game-log store: {e}")
+            return pd.DataFrame()
+    df_logs = load_csv(logs_path)
+    return df_logs[[c for c in columns if c in df_logs.columns]] if not df_logs.empty else df_logs
+
+def add_splits(master_data, logs_path):
+    """Hit rates / averages / medians per quote (see hit_rates.py); errors only cost the splits."""
+    try:
+        player_ids = [pid for pid, p in master_data.items() if p['props']]
+        n_quotes = attach_splits(master_data, load_season_logs(logs_path, player_ids))
+        print(f"   🎯 Hit-rate splits for {n_quotes} quotes")
+    except Exception as e:
+        print(f"   ❌ Error computing hit-rate splits: {e}")
+
+def load_opponents(games_path):
+    """{team: tonight's opponent} from today's schedule (nba_dashboard_games.json); {} without one."""
+    if not games_path:
+        return {}
+    games = load_json(games_path)
+    return opponent_map(games if isinstance(games, list) else [])
+
+def add_similar(master_data, logs_path, opponents):
+    """Similar-player games vs tonight's opponent (see similar_players.py); errors only cost the panel."""
+    if not opponents:
+        return
+    try:
+        df_logs = load_season_logs(logs_path, columns=SIMILAR_LOG_COLUMNS)
+        n_players = attach_similar(master_data, df_logs, opponents)
+        print(f"   👥 Similar players for {n_players} players")
+    except Exception as e:
+        print(f"   ❌ Error computing similar players: {e}")
+
+def add_defense(master_data, logs_path, opponents, state_dir=None):
+    """Tonight's opponent slice of the defensive-allowance cube (see defense_cube.py) on every player."""
+    if not opponents:
+        return
+    try:
+        cube, n_read = build_defense_cube(logs_path, state_dir)
+        slices = {team: cube.slice(opp) for team, opp in opponents.items()}
+        n_players = 0
+        for player in master_data.values():
+            defense = slices.get(player['team'])
+            if defense:
+                player['defense'] = defense
+                n_players += 1
+        print(f"   🛡️ Defense cube: {len(cube.teams)} teams ({n_read} game rows read), attached to {n_players} players")
+    except Exception as e:
+        print(f"   ❌ Error building defense cube: {e}")
+
+def add_rolling(master_data, logs_path, state_dir=None):
+    """
+    Rolling means / variances / EWMAs / trends per stat (see rolling_state.py) for players with props.
+    Returns the logs' coverage for the feed header (None on failure).
+    """
+    try:
+        state, n_read = build_rolling_state(logs_path, state_dir)
+        rolling = compact_rolling(state, [pid for pid, p in master_data.items() if p['props']])
+        for pid, features in rolling.items():
+            master_data[pid]['rolling'] = features
+        coverage = rolling_coverage(logs_path, state)
+        print(f"   📐 Rolling features for {len(rolling)} players ({n_read} game rows read, from {coverage['from']})")
+        return coverage
+    except Exception as e:
+        print(f"   ❌ Error building rolling features: {e}")
+        return None
+
+def build_logs_map(df_logs, columnar=False):
+    """
+    Groups game logs by PLAYER_ID.
+    Row layout: a list of dicts (every column, repeated per game).
+    Columnar layout: one array per GAME_LOG_COLUMNS entry, in that order.
+    """
+    logs_map = {}
+    if df_logs.empty or 'PLAYER_ID' not in df_logs.columns:
+        return logs_map
+
+    df_logs = df_logs.fillna(0)
+    if not columnar:
+        for pid, group in df_logs.groupby('PLAYER_ID'):
+            logs_map[int(pid)] = group.to_dict(orient='records')
+        return logs_map
+
+    # Missing columns are sent as zeros so every player shares one column dictionary
+    for col in GAME_LOG_COLUMNS:
+        if col not in df_logs.columns:
+            df_logs[col] = 0
+    for pid, group in df_logs.groupby('PLAYER_ID'):
+        logs_map[int(pid)] = [group[col].tolist() for col in GAME_LOG_COLUMNS]
+    return logs_map
+
+def merge_odds(master_data, matcher, df, book_name):
+    """
+    Adds one book's quotes from its CSV rows to master_data[pid]['props'].
+    Every line the book posts for a player and prop goes into one Ladder; the
+    quote's line/over/under are its main line, and books posting alternates
+    also get the whole "ladder" (see alt_lines.py).
+    """
+    if df.empty: return
+    # Missing prices stay NaN (not 0, which would read as a real price)
+    prices = {col: pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64) if col in df.columns
+              else np.full(len(df), np.nan) for col in ('line', 'over_odds', 'under_odds')}
+    rows = {}
+    for i, (_, row) in enumerate(df.iterrows()):
+        # Extract basic info
+        player_name = row.get('player', '')
+        team_context = row.get('team', 'UNK')
+        
+        # Extract team options if available (from DK scraper update)
+        team_opts = []
+        raw_opts = row.get('team_options')
+        if isinstance(raw_opts, str) and "[" in raw_opts:
+            try:
+                import ast
+                team_opts = ast.literal_eval(raw_opts)
+            except: pass
+
+        # Match Player using robust matcher
+        pid = matcher.match_player(player_name, team_context, team_opts)
+        
+        if not pid or pid not in master_data: continue
+
+        # Map prop type (e.g. 'points' -> 'PTS')
+        raw_prop = row.get('prop_type', '')
+        clean_key = PROP_MAP.get(raw_prop, raw_prop).upper()
+
+        # Collect every posted line (row order no longer decides which one survives)
+        rows.setdefault((pid, clean_key), []).append(
+            (prices['line'][i], prices['over_odds'][i], prices['under_odds'][i])
+        )
+
+    for (pid, clean_key), quotes in rows.items():
+        ladder = Ladder(*zip(*quotes))
+        if ladder.main is None:
+            continue
+        rungs = ladder.to_feed()
+        main = ladder.main
+        quote = {
+            "line": rungs["lines"][main],
+            "over": rungs["over"][main],
+            "under": rungs["under"][main],
+            "implied": 0  # Set from the odds by add_pricing
+        }
+        if len(ladder) > 1:
+            quote["ladder"] = rungs
+        master_data[pid]['props'].setdefault(clean_key, {})[book_name] = quote
+
+def add_pricing(master_data):
+    """No-vig fair prices, EV and best price per quote across every book (see pricing.py)."""
+    try:
+        n_quotes = attach_pricing(master_data)
+        print(f"   💲 Priced {n_quotes} quotes")
+    except Exception as e:
+        print(f"   ❌ Error pricing quotes: {e}")
+
+def record_odds_history(master_data, odds_history_path):
+    if not odds_history_path:
+        return
+    try:
+        n_changes = OddsHistoryStore(odds_history_path).append(quote_index(master_data.values()))
+        print(f"   📈 Recorded {n_changes} odds changes")
+    except Exception as e:
+        print(f"   ❌ Error recording odds history: {e}")
+
+def write_outputs(master_data, output_path, columnar_logs=True, encoder="auto", compress=(), binary_path=None,
+                  header=None):
+    """
+    Writes master_feed.json (plus companions and the binary feed) from master_data.
+    header defaults to the columnar header when columnar_logs is set.
+    """
+    # Only save players who have EITHER stats OR odds (removes G-League noise)
+    def final_output():
+        return (
+            data for data in master_data.values()
+            if data['props'] or data['stats']['GP'] > 0
+        )
+
+    if header is None and columnar_logs:
+        header = {
+            "format": "columnar",
+            "game_log_columns": GAME_LOG_COLUMNS
+        }
+
+    try:
+        # Streamed one player at a time (no second full copy of the feed in memory)
+        report = write_feed(
+            output_path, final_output(), header=header, encoder=encoder,
+            gzip_companion='gzip' in compress, brotli_companion='brotli' in compress
+        )
+        rss = f", peak RSS {report['peak_rss_mb']:.0f} MB" if report['peak_rss_mb'] else ""
+        print(f"   ✅ Saved Master Feed ({report['players']} players, {report['bytes'] / 1e6:.1f} MB) to {output_path}")
+        print(f"      ⏱️ Serialized in {report['seconds']:.2f}s{rss}")
+    except Exception as e:
+        print(f"   ❌ Error saving JSON: {e}")
+
+    if binary_path:
+        try:
+            n_players = write_binary_feed(binary_path, final_output(), meta=header or {}, encoder=encoder)
+            print(f"   ✅ Saved Binary Feed ({n_players} players) to {binary_path}")
+        except Exception as e:
+            print(f"   ❌ Error saving binary feed: {e}")
+
 # ==========================================
 # 3. MAIN AGGREGATION LOGIC
 # ==========================================
-def run_aggregation(stats_path, dk_path, fd_path, logs_path, shooting_path, assists_path, output_path):
+def run_aggregation(stats_path, dk_path, fd_path, logs_path, shooting_path, assists_path, output_path,
+                    columnar_logs=True, encoder="auto", compress=(), binary_path=None,
+                    odds_history_path=None, games_path=None, defense_state_dir=None, rolling_state_dir=None):
+    """
+    Builds master_feed.json.
+    columnar_logs=True writes {"game_log_columns": [...], "players": [...]} with each
+    game_log as column arrays; False keeps the legacy list of players with row dicts.
+    encoder picks the JSON backend (see feed_writer.get_encoder); compress may contain
+    'gzip' and/or 'brotli' to also write .gz/.br companions in the same pass.
+    binary_path additionally writes the memory-mappable feed (see binary_feed.py).
+    odds_history_path appends this run's changed quotes to the odds history (see odds_history.py).
+    games_path (today's schedule) enables the similar-players panel (see similar_players.py) and
+    the opponent defense slices (see defense_cube.py, kept incrementally in defense_state_dir).
+    rolling_state_dir persists the per-player rolling-feature state (see rolling_state.py).
+    """
     print(f"   🔨 Aggregating Data...")
 
     # A. Load All Data
     df_stats = load_csv(stats_path)
     df_dk = load_csv(dk_path)
     df_fd = load_csv(fd_path)
-    df_logs = load_csv(logs_path)
     
     shooting_data = load_json(shooting_path)
     assists_data = load_json(assists_path)
 
+    df_logs = load_game_logs(
+        logs_path,
+        player_ids=df_stats['PLAYER_ID'].dropna().tolist() if 'PLAYER_ID' in df_stats.columns else None,
+        columns=GAME_LOG_COLUMNS if columnar_logs else None
+    )
+
     print(f"      Loaded: Stats({len(df_stats)}), DK({len(df_dk)}), FD({len(df_fd)}), Logs({len(df_logs)}), Shooting({len(shooting_data)}), Assists({len(assists_data)})")
 
     if df_stats.empty:
@@ -106,12 +384,7 @@ def run_aggregation(stats_path, dk_path, fd_path, logs_path, shooting_path, assi
     matcher = PlayerMatcher(stats_records)
 
     # C. Prepare Game Logs (Group by Player)
-    logs_map = {}
-    if not df_logs.empty and 'PLAYER_ID' in df_logs.columns:
-        df_logs = df_logs.fillna(0)
-        # Group by ID and convert to list of dicts
-        for pid, group in df_logs.groupby('PLAYER_ID'):
-            logs_map[int(pid)] = group.to_dict(orient='records')
+    logs_map = build_logs_map(df_logs, columnar=columnar_logs)
 
     # D. Map assist data from pbpstats to PLAYER_ID
     assists_by_pid = {}
@@ -143,61 +416,68 @@ def run_aggregation(stats_path, dk_path, fd_path, logs_path, shooting_path, assi
         }
 
     # E. Merge Betting Odds
-    # Helper to process odds files
-    def process_odds(df, book_name):
-        if df.empty: return
-        for _, row in df.iterrows():
-            # Extract basic info
-            player_name = row.get('player', '')
-            team_context = row.get('team', 'UNK')
-            
-            # Extract team options if available (from DK scraper update)
-            team_opts = []
-            raw_opts = row.get('team_options')
-            if isinstance(raw_opts, str) and "[" in raw_opts:
-                try:
-                    import ast
-                    team_opts = ast.literal_eval(raw_opts)
-                except: pass
-
-            # Match Player using robust matcher
-            pid = matcher.match_player(player_name, team_context, team_opts)
-            
-            if not pid or pid not in master_data: continue
-
-            # Map prop type (e.g. 'points' -> 'PTS')
-            raw_prop = row.get('prop_type', '')
-            clean_key = PROP_MAP.get(raw_prop, raw_prop).upper()
-            
-            # Initialize dict structure
-            if clean_key not in master_data[pid]['props']:
-                master_data[pid]['props'][clean_key] = {}
-            
-            # Add the line
-            master_data[pid]['props'][clean_key][book_name] = {
-                "line": row.get('line'),
-                "over": row.get('over_odds'),
-                "under": row.get('under_odds'),
-                "implied": row.get('implied_prob', 0)
-            }
-
-    process_odds(df_dk, "dk")
-    process_odds(df_fd, "fd")
-
-    # F. Filter & Save
-    # Only save players who have EITHER stats OR odds (removes G-League noise)
-    final_output = []
-    for pid, data in master_data.items():
-        if data['props'] or data['stats']['GP'] > 0:
-            final_output.append(data)
+    merge_odds(master_data, matcher, df_dk, "dk")
+    merge_odds(master_data, matcher, df_fd, "fd")
+    add_pricing(master_data)
+    add_splits(master_data, logs_path)
+    coverage = add_rolling(master_data, logs_path, rolling_state_dir)
+    opponents = load_opponents(games_path)
+    if games_path and not opponents:
+        print("   ⚠️ No games today, skipping similar players and opponent defense")
+    add_similar(master_data, logs_path, opponents)
+    add_defense(master_data, logs_path, opponents, defense_state_dir)
+
+    header = None
+    if columnar_logs:
+        header = {"format": "columnar", "game_log_columns": GAME_LOG_COLUMNS}
+        if coverage:
+            header["rolling_coverage"] = coverage  # How far back rolling mean/std/games reach
 
+    record_odds_history(master_data, odds_history_path)
+    write_outputs(master_data, output_path, columnar_logs, encoder, compress, binary_path, header=header)
+
+def refresh_props(feed_path, dk_path, fd_path, output_path, encoder="auto", compress=(), binary_path=None,
+                  odds_history_path=None, logs_path=None):
+    """
+    Props-only update of a published feed: every player's stats, game log and
+    zones are taken from feed_path as they are, only the `props` sections are
+    rebuilt from the two odds CSVs (with their hit-rate splits when logs_path is
+    given, and their similar-player scores). Used by the polling daemon between full runs.
+    Returns False (nothing written) if the feed cannot be read.
+    """
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w") as f:
-            json.dump(final_output, f, indent=4)
-        print(f"   ✅ Saved Master Feed ({len(final_output)} players) to {output_path}")
-    except Exception as e:
-        print(f"   ❌ Error saving JSON: {e}")
+        with open(feed_path, "rb") as f:
+            body = f.read()
+        feed = orjson.loads(body) if orjson is not None else json.loads(body)
+    except (OSError, ValueError) as e:
+        print(f"   ❌ Cannot refresh props, feed unreadable: {e}")
+        return False
+
+    columnar_logs = isinstance(feed, dict)
+    players = feed["players"] if columnar_logs else feed
+    header = {k: v for k, v in feed.items() if k != "players"} if columnar_logs else None  # Kept as published
+    master_data = {}
+    for player in players:
+        player["props"] = {}
+        master_data[int(player["id"])] = player
+
+    stats_records = [{'PLAYER_ID': p['id'], 'PLAYER_NAME': p['name'], 'TEAM_ABBREVIATION': p['team']}
+                     for p in master_data.values()]
+    matcher = PlayerMatcher(stats_records)
+
+    df_dk = load_csv(dk_path)
+    df_fd = load_csv(fd_path)
+    print(f"   🔨 Refreshing props: DK({len(df_dk)}), FD({len(df_fd)}) onto {len(master_data)} players")
+    merge_odds(master_data, matcher, df_dk, "dk")
+    merge_odds(master_data, matcher, df_fd, "fd")
+    add_pricing(master_data)
+    if logs_path:
+        add_splits(master_data, logs_path)
+    score_similar_lines(master_data)  # The similar games ride along in the feed; only the lines moved
+
+    record_odds_history(master_data, odds_history_path)
+    write_outputs(master_data, output_path, columnar_logs, encoder, compress, binary_path, header=header)
+    return True
 
 if __name__ == "__main__":
     # Test Run
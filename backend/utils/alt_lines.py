@@ -0,0 +1,70 @@
+import numpy as np
+
+from utils.odds_history import american_to_prob
+
+class Ladder:
+    """
+    Every line one book posts for one player and prop, sorted by line:
+
+      lines / over / under   parallel float arrays (NaN where a side is not offered)
+      main                   index of the main line: the most balanced two-way price
+                             (books do not flag it; alternates are priced far from even)
+
+    A line posted twice keeps the last quote seen.
+    """
+    def __init__(self, lines, over, under):
+        lines = np.asarray(lines, dtype=np.float64)
+        over = np.asarray(over, dtype=np.float64)
+        under = np.asarray(under, dtype=np.float64)
+        keep = ~np.isnan(lines)
+        lines, over, under = lines[keep], over[keep], under[keep]
+
+        # Last quote per line wins: unique over the reversed rows keeps the last occurrence
+        self.lines, first = np.unique(lines[::-1], return_index=True)
+        last = len(lines) - 1 - first
+        self.over, self.under = over[last], under[last]
+        self.main = self._main_index()
+
+    def _main_index(self):
+        if not len(self.lines):
+            return None
+        p_over, p_under = american_to_prob(self.over), american_to_prob(self.under)
+        balance = np.abs(p_over - p_under)
+        if np.isnan(balance).all():
+            return len(self.lines) // 2  # One-sided ladder: the middle rung
+        return int(np.nanargmin(balance))
+
+    def __len__(self):
+        return len(self.lines)
+
+    def quote(self, line):
+        """(over, under) posted at exactly `line`, or None."""
+        i = np.searchsorted(self.lines, line)
+        if i < len(self.lines) and self.lines[i] == line:
+            return self.over[i], self.under[i]
+        return None
+
+    def over_probability(self, lines):
+        """
+        Implied over probability at any line(s), vectorized: posted lines are
+        exact, lines in between are interpolated linearly across the ladder and
+        lines outside it take the nearest rung's probability. NaN without over prices.
+        """
+        p_over = american_to_prob(self.over)
+        has = ~np.isnan(p_over)
+        if not has.any():
+            return np.full(np.shape(lines), np.nan)
+        return np.interp(lines, self.lines[has], p_over[has])
+
+    def to_feed(self):
+        """Compact form for the feed: {"lines": [...], "over": [...], "under": [...], "main": i}."""
+        def values(a):
+            return [None if np.isnan(v) else (int(v) if float(v).is_integer() else float(v)) for v in a.tolist()]
+        return {"lines": self.lines.tolist(), "over": values(self.over), "under": values(self.under), "main": self.main}
+
+def prob_to_american(prob):
+    """Vectorized probability -> American odds (rounded; NaN outside (0, 1))."""
+    prob = np.asarray(prob, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        odds = np.where(prob >= 0.5, -100 * prob / (1 - prob), 100 * (1 - prob) / prob)
+    return np.where((prob > 0) & (prob < 1), np.round(odds), np.nan)
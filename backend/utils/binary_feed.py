@@ -0,0 +1,194 @@
+import mmap
+import os
+import struct
+import json
+
+from utils.feed_writer import get_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ==========================================
+# FILE LAYOUT
+# ==========================================
+# [HEADER][meta record][player records...][slot table]
+#
+# HEADER : magic, version, reserved, n_players, n_slots, table_offset
+# record : u32 length + compact JSON bytes (the first record is the feed meta)
+# table  : n_slots x (u32 PLAYER_ID, u64 record offset), open addressing with
+#          linear probing, PLAYER_ID 0 marks an empty slot. n_slots is a power
+#          of two >= 2 * n_players, so a lookup touches ~1 slot on average.
+MAGIC = b"NBAFEED1"
+VERSION = 2  # v2: home slots from the hash's high bits (v1 files are rejected and rewritten)
+HEADER = struct.Struct("<8sHHIIQ")
+SLOT = struct.Struct("<IQ")
+LENGTH = struct.Struct("<I")
+HASH_MULT = 2654435761  # Knuth multiplicative hash
+
+def _slot_count(n_players):
+    n_slots = 8
+    while n_slots < 2 * n_players:
+        n_slots *= 2
+    return n_slots
+
+def _home_slot(pid, bits):
+    # The high bits of the 32-bit product are the well-mixed ones
+    return ((pid * HASH_MULT) & 0xffffffff) >> (32 - bits)
+
+# ==========================================
+# WRITER
+# ==========================================
+def write_binary_feed(path, players, meta=None, encoder="auto"):
+    """
+    Writes players (iterable of feed records with an 'id') to a binary feed.
+    Records are streamed to disk; only the (id, offset) pairs stay in memory.
+    Written to a temp file and swapped in with os.replace.
+    """
+    encode = get_encoder(encoder) if isinstance(encoder, str) else encoder
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    offsets = {}
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)  # Patched once the table offset is known
+
+        def write_record(payload):
+            offset = f.tell()
+            f.write(LENGTH.pack(len(payload)))
+            f.write(payload)
+            return offset
+
+        write_record(encode(meta or {}))
+        for record in players:
+            offsets[int(record['id'])] = write_record(encode(record))
+
+        # Slot table
+        n_slots = _slot_count(len(offsets))
+        mask, bits = n_slots - 1, n_slots.bit_length() - 1
+        table = [(0, 0)] * n_slots
+        for pid, offset in offsets.items():
+            i = _home_slot(pid, bits)
+            while table[i][0] != 0:
+                i = (i + 1) & mask
+            table[i] = (pid, offset)
+
+        table_offset = f.tell()
+        f.write(b"".join(SLOT.pack(pid, offset) for pid, offset in table))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(offsets), n_slots, table_offset))
+
+    os.replace(tmp_path, path)
+    return len(offsets)
+
+# ==========================================
+# READER
+# ==========================================
+class BinaryFeed:
+    """
+    Memory-mapped reader. Opening costs one header parse; get(pid) hashes into
+    the slot table and decodes just that player's record, straight from the
+    mapped pages when orjson is available.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a v{VERSION} binary feed")
+        self._view = memoryview(self._mm)
+        # Point lookups: stop the kernel reading ahead pages we will not touch
+        if hasattr(mmap, "MADV_RANDOM"):
+            self._mm.madvise(mmap.MADV_RANDOM)
+
+        try:
+            magic, version, _, self.n_players, self.n_slots, self.table_offset = HEADER.unpack_from(self._mm, 0)
+        except struct.error:  # Shorter than a header
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a v{VERSION} binary feed")
+        self._mask = self.n_slots - 1
+        self._bits = self.n_slots.bit_length() - 1
+        self._meta = None
+
+    # --- Raw access ---
+    def _record(self, offset):
+        (length,) = LENGTH.unpack_from(self._mm, offset)
+        start = offset + LENGTH.size
+        return self._view[start:start + length]
+
+    def _find(self, pid):
+        i = _home_slot(pid, self._bits)
+        for _ in range(self.n_slots):
+            slot_pid, offset = SLOT.unpack_from(self._mm, self.table_offset + i * SLOT.size)
+            if slot_pid == pid:
+                return offset
+            if slot_pid == 0:
+                return None
+            i = (i + 1) & self._mask
+        return None
+
+    def raw(self, pid):
+        """
+        Zero-copy memoryview of the encoded record (None if missing). It is only
+        valid until close(); copy it (bytes(view)) to keep it longer.
+        """
+        offset = self._find(int(pid))
+        return None if offset is None else self._record(offset)
+
+    @staticmethod
+    def _decode(buf):
+        if orjson is not None:
+            return orjson.loads(buf)
+        return json.loads(bytes(buf))
+
+    # --- Public API ---
+    @property
+    def meta(self):
+        if self._meta is None:
+            self._meta = self._decode(self._record(HEADER.size))
+        return self._meta
+
+    def get(self, pid):
+        """Decoded player record, or None."""
+        buf = self.raw(pid)
+        return None if buf is None else self._decode(buf)
+
+    def player_ids(self):
+        ids = []
+        for i in range(self.n_slots):
+            pid, _ = SLOT.unpack_from(self._mm, self.table_offset + i * SLOT.size)
+            if pid:
+                ids.append(pid)
+        return ids
+
+    def __contains__(self, pid):
+        return self._find(int(pid)) is not None
+
+    def __len__(self):
+        return self.n_players
+
+    def close(self):
+        """
+        Releases the file. While views from raw() are still held the mapping
+        cannot be closed; it is then unmapped once they and this reader are gone.
+        """
+        try:
+            self._view.release()
+            self._mm.close()
+        except BufferError:
+            pass
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,208 @@
+import os
+import json
+import glob
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.gamelog_store import GameLogStore, MANIFEST_FILE
+from utils.fetch_manifest import FetchManifest
+from utils.season_averages import settled_through, settled_marks, rebuild_reason
+from utils.hit_rates import COMBO_STATS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# (label, most recent N games of the defense); None = the whole season
+DEFENSE_WINDOWS = [("L5", 5), ("L10", 10), ("SEASON", None)]
+BASE_STATS = ['PTS', 'REB', 'AST', 'FG3M', 'STL', 'BLK', 'TOV']
+DEFENSE_STATS = BASE_STATS + list(COMBO_STATS)
+STATE_FILE = "state.json"
+
+# ==========================================
+# 1. WHAT EACH DEFENSE ALLOWED, PER GAME
+# ==========================================
+def allowed_per_game(df_logs):
+    """
+    Player game rows -> one row per (GAME_DATE, DEF_TEAM): the box-score totals
+    of everyone who played against DEF_TEAM that night. The opponent is parsed
+    out of MATCHUP ("LAL vs. DEN", "LAL @ DEN") once, here.
+    """
+    columns = ['GAME_DATE', 'DEF_TEAM'] + BASE_STATS
+    if df_logs is None or df_logs.empty or 'MATCHUP' not in df_logs.columns:
+        return pd.DataFrame(columns=columns)
+    df = df_logs.dropna(subset=['MATCHUP'])
+    stats = pd.DataFrame({
+        stat: pd.to_numeric(df[stat], errors='coerce') if stat in df.columns else np.nan
+        for stat in BASE_STATS
+    })
+    stats['GAME_DATE'] = pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d')
+    stats['DEF_TEAM'] = df['MATCHUP'].astype(str).str.strip().str[-3:]
+    games = stats.groupby(['GAME_DATE', 'DEF_TEAM'])[BASE_STATS].sum(min_count=1)
+    return games.reset_index()[columns]
+
+def combine_games(a, b):
+    """a with b's rows added; a game present in both is taken from b (re-read dates win)."""
+    if a.empty:
+        return b
+    if b.empty:
+        return a
+    both = pd.concat([a, b], ignore_index=True)
+    return both.drop_duplicates(['GAME_DATE', 'DEF_TEAM'], keep='last').reset_index(drop=True)
+
+# ==========================================
+# 2. TEAM x STAT x WINDOW CUBE
+# ==========================================
+class DefenseCube:
+    """
+    values[team, stat, window]: per-game average each defense allowed over its
+    last N games (DEFENSE_WINDOWS), combos summed from the base stats.
+    ranks[team, stat, window]: 1 = allows the least in the league, len(teams)
+    = allows the most (the softest matchup for an over).
+    """
+    def __init__(self, games):
+        games = games.sort_values(['DEF_TEAM', 'GAME_DATE'], ascending=[True, False])
+        self.teams, rows = np.unique(games['DEF_TEAM'].to_numpy(dtype=str), return_inverse=True)
+        cols = games.groupby('DEF_TEAM').cumcount().to_numpy()
+        n_games = int(cols.max()) + 1 if len(cols) else 0
+        self.team_index = {team: i for i, team in enumerate(self.teams.tolist())}
+        self.stats = DEFENSE_STATS
+
+        # [teams, games, stats], newest game first, NaN padded
+        base = np.full((len(self.teams), n_games, len(BASE_STATS)), np.nan)
+        base[rows, cols] = games[BASE_STATS].to_numpy(dtype=np.float64)
+        position = {stat: i for i, stat in enumerate(BASE_STATS)}
+        combos = [base[..., [position[c] for c in parts]].sum(axis=2) for parts in COMBO_STATS.values()]
+        matrix = np.concatenate([base] + [c[..., None] for c in combos], axis=2)
+
+        self.values = np.full((len(self.teams), len(self.stats), len(DEFENSE_WINDOWS)), np.nan)
+        self.games = np.zeros((len(self.teams), len(DEFENSE_WINDOWS)), dtype=np.int64)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # Teams with no games in a window stay NaN
+            for w, (_, n) in enumerate(DEFENSE_WINDOWS):
+                window = matrix[:, :n] if n else matrix
+                self.values[:, :, w] = np.nanmean(window, axis=1)
+                self.games[:, w] = (~np.isnan(window[..., 0])).sum(axis=1)
+        self.ranks = self._ranks(self.values)
+
+    @staticmethod
+    def _ranks(values):
+        """Competition ranks (ties share the lower rank) along the team axis; NaN teams rank last."""
+        filled = np.where(np.isnan(values), np.inf, values)
+        sorted_values = np.sort(filled, axis=0)
+        ranks = np.empty(values.shape, dtype=np.int64)
+        for s in range(values.shape[1]):
+            for w in range(values.shape[2]):
+                ranks[:, s, w] = np.searchsorted(sorted_values[:, s, w], filled[:, s, w], side='left') + 1
+        return ranks
+
+    def slice(self, team):
+        """
+        One defense as {"team": "PHI", "teams": 30, "games": {"L5": 5, ...},
+        "stats": {"PTS": {"L5": [allowed per game, rank], ...}, ...}}; None if unknown.
+        """
+        t = self.team_index.get(team)
+        if t is None:
+            return None
+        labels = [label for label, _ in DEFENSE_WINDOWS]
+        values = np.round(self.values[t], 1).tolist()
+        ranks = self.ranks[t].tolist()
+        return {
+            "team": team,
+            "teams": len(self.teams),
+            "games": dict(zip(labels, self.games[t].tolist())),
+            "stats": {
+                stat: {
+                    label: [None if np.isnan(v) else v, r]
+                    for label, v, r in zip(labels, values[s], ranks[s])
+                }
+                for s, stat in enumerate(self.stats)
+            },
+        }
+
+# ==========================================
+# 3. INCREMENTAL STATE
+# ==========================================
+class DefenseGames:
+    """
+    Per-game allowed totals kept next to the game-log store (same scheme as
+    season_averages.SeasonTotals): settled dates are aggregated once and
+    persisted, only new and unsettled dates are read from the store again.
+    Backfilled or refetched settled dates rebuild it (see rebuild_reason).
+    """
+    def __init__(self, logs_store_dir, state_dir):
+        self.store = GameLogStore(logs_store_dir)
+        self.manifest = FetchManifest(os.path.join(logs_store_dir, MANIFEST_FILE))
+        self.state_dir = state_dir
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.state_dir, STATE_FILE)) as f:
+                state = json.load(f)
+            games = pd.read_parquet(os.path.join(self.state_dir, state['file']))
+            return state, games
+        except (OSError, ValueError, KeyError):
+            return {}, pd.DataFrame()
+
+    def _save(self, marks, games):
+        os.makedirs(self.state_dir, exist_ok=True)
+        name = f"allowed-{marks['settled_through']}.parquet"
+        games.to_parquet(os.path.join(self.state_dir, name + ".tmp"))
+        os.replace(os.path.join(self.state_dir, name + ".tmp"), os.path.join(self.state_dir, name))
+        with open(os.path.join(self.state_dir, STATE_FILE + ".tmp"), "w") as f:
+            json.dump(dict(marks, file=name), f)
+        os.replace(os.path.join(self.state_dir, STATE_FILE + ".tmp"), os.path.join(self.state_dir, STATE_FILE))
+        for old in glob.glob(os.path.join(self.state_dir, "allowed-*.parquet")):
+            if os.path.basename(old) != name:
+                os.remove(old)
+
+    def _read(self, date_from=None, date_to=None):
+        columns = ['GAME_DATE', 'MATCHUP'] + BASE_STATS
+        return self.store.read(columns=columns, date_from=date_from, date_to=date_to)
+
+    def build(self):
+        """Every defense game of the season; returns (games, game-log rows read)."""
+        dates = self.store.dates()
+        if not dates:
+            return allowed_per_game(None), 0
+        marks, settled = self._load()
+        settled_at = marks.get('settled_through')
+        new_settled = settled_through(self.manifest, dates)
+
+        reason = rebuild_reason(self.manifest, dates, marks, new_settled)
+        if reason:
+            print(f"   🔄 Rebuilding defense games: {reason}")
+            settled_at, settled = None, pd.DataFrame()
+
+        n_read = 0
+        if new_settled and new_settled != settled_at:
+            df_new = self._read(_next_day(settled_at), new_settled)
+            n_read += len(df_new)
+            settled = combine_games(settled, allowed_per_game(df_new))
+            settled_at = new_settled
+            self._save(settled_marks(self.manifest, dates, settled_at), settled)
+
+        df_tail = self._read(_next_day(settled_at))
+        n_read += len(df_tail)
+        return combine_games(settled, allowed_per_game(df_tail)), n_read
+
+def _next_day(date):
+    return (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') if date else None
+
+def build_defense_cube(logs_path, state_dir=None):
+    """
+    DefenseCube from the game-log store (incremental when state_dir is given)
+    or a legacy gamelogs.csv (read whole). Returns (cube, game-log rows read).
+    """
+    if os.path.isdir(logs_path):
+        if state_dir:
+            games, n_read = DefenseGames(logs_path, state_dir).build()
+        else:
+            df_logs = GameLogStore(logs_path).read(columns=['GAME_DATE', 'MATCHUP'] + BASE_STATS)
+            games, n_read = allowed_per_game(df_logs), len(df_logs)
+    else:
+        df_logs = pd.read_csv(logs_path)
+        games, n_read = allowed_per_game(df_logs), len(df_logs)
+    return DefenseCube(games), n_read
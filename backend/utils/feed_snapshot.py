@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import json
+import os
+
+from utils.feed_writer import get_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FEED_FILE = "master_feed.json"
+GAMES_FILE = "nba_dashboard_games.json"
+
+# ==========================================
+# 1. PRECOMPRESSED RESOURCES
+# ==========================================
+class Resource:
+    """One response body in identity, gzip and brotli form, with strong ETags."""
+    def __init__(self, body, content_type="application/json", gz=None, br=None):
+        self.body = body
+        self.content_type = content_type
+        self.gzip = gz if gz is not None else gzip.compress(body, compresslevel=6)
+        if br is not None:
+            self.brotli = br
+        else:
+            self.brotli = brotli.compress(body, quality=5) if brotli is not None else None
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Strong ETags differ per content-coding (RFC 9110 8.8.3)
+        self.etags = {"identity": f'"{digest}"', "gzip": f'"{digest}-gz"', "br": f'"{digest}-br"'}
+
+    def select(self, accept_encoding):
+        """Returns (coding, body, etag) for the client's Accept-Encoding."""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        if "br" in accepted and self.brotli is not None:
+            return "br", self.brotli, self.etags["br"]
+        if "gzip" in accepted:
+            return "gzip", self.gzip, self.etags["gzip"]
+        return "identity", self.body, self.etags["identity"]
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _read_companion(path, source_mtime):
+    """Precompressed companion written by feed_writer, if it is not stale."""
+    if os.path.exists(path) and os.path.getmtime(path) >= source_mtime:
+        return _read(path)
+    return None
+
+def _loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+# ==========================================
+# 2. SNAPSHOT
+# ==========================================
+class FeedSnapshot:
+    """
+    Immutable in-memory view of one published feed generation.
+    The whole-feed resources are built up front; per-player and per-game
+    responses are encoded on first request and cached for the snapshot's life.
+    """
+    def __init__(self, data_dir):
+        # Resolve the data/current symlink once so every file comes from the same generation
+        self.data_dir = data_dir = os.path.realpath(data_dir)
+        self.encode = get_encoder()
+        feed_path = os.path.join(data_dir, FEED_FILE)
+
+        feed_mtime = os.path.getmtime(feed_path)
+        feed_body = _read(feed_path)
+        feed = _loads(feed_body)  # Raises on a half-written file; caller keeps the old snapshot
+
+        self.files = {
+            FEED_FILE: Resource(
+                feed_body,
+                gz=_read_companion(feed_path + ".gz", feed_mtime),
+                br=_read_companion(feed_path + ".br", feed_mtime)
+            )
+        }
+
+        # Columnar feeds carry their column dictionary next to "players"
+        if isinstance(feed, dict):
+            self.meta = {k: v for k, v in feed.items() if k != "players"}
+            players = feed.get("players", [])
+        else:
+            self.meta = None
+            players = feed
+        self.players = {int(p["id"]): p for p in players}
+
+        games_path = os.path.join(data_dir, GAMES_FILE)
+        self.games = {}
+        if os.path.exists(games_path):
+            games_body = _read(games_path)
+            self.files[GAMES_FILE] = Resource(games_body)
+            self.games = {str(g.get("game_id")): g for g in _loads(games_body)}
+
+        self.version = self.files[FEED_FILE].etags["identity"].strip('"')
+        self._cache = {}
+
+    @classmethod
+    def empty(cls, data_dir):
+        """Served until the first pipeline run publishes a feed: no players, files 404."""
+        snapshot = cls.__new__(cls)
+        snapshot.data_dir = os.path.realpath(data_dir)
+        snapshot.encode = get_encoder()
+        snapshot.files, snapshot.meta, snapshot.players, snapshot.games = {}, None, {}, {}
+        snapshot.version = ""
+        snapshot._cache = {}
+        return snapshot
+
+    def _wrap(self, payload):
+        """Same envelope as the feed, so clients can reuse one decoder."""
+        if self.meta is None:
+            return payload
+        return {**self.meta, **payload}
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            obj = build()
+            self._cache[key] = None if obj is None else Resource(self.encode(obj))
+        return self._cache[key]
+
+    def file(self, name):
+        return self.files.get(name)
+
+    def player(self, pid):
+        def build():
+            player = self.players.get(pid)
+            if player is None:
+                return None
+            return self._wrap({"players": [player]}) if self.meta is not None else player
+        return self._cached(("player", pid), build)
+
+    def game(self, game_id):
+        def build():
+            game = self.games.get(game_id)
+            if game is None:
+                return None
+            teams = {game.get("home_team_tricode"), game.get("away_team_tricode")}
+            players = [p for p in self.players.values() if p.get("team") in teams]
+            return self._wrap({"game": game, "players": players})
+        return self._cached(("game", game_id), build)
+
+    def game_list(self):
+        return self._cached(("games",), lambda: list(self.games.values()))
@@ -0,0 +1,179 @@
+import json
+import gzip
+import math
+import os
+import time
+
+# Optional fast paths (fall back to the stdlib if missing)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==========================================
+# 1. ENCODERS
+# ==========================================
+def _json_default(obj):
+    """Handles numpy/pandas scalars and arrays the stdlib encoder rejects."""
+    if hasattr(obj, 'tolist') and getattr(obj, 'ndim', 0):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _finite(obj):
+    """Copy of obj with NaN/Infinity replaced by None (what orjson writes as null)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    if hasattr(obj, 'tolist') or hasattr(obj, 'item'):
+        return _finite(_json_default(obj))
+    return obj
+
+def _stdlib_dumps(obj):
+    """
+    Stdlib encoding with orjson's output (UTF-8, NaN/Infinity as null). Bare NaN
+    is not JSON and browsers reject it, so a record holding non-finite floats is
+    re-encoded with them replaced; records without any take the single fast pass.
+    """
+    try:
+        return json.dumps(obj, separators=(',', ':'), default=_json_default, allow_nan=False, ensure_ascii=False).encode('utf-8')
+    except ValueError:
+        return json.dumps(_finite(obj), separators=(',', ':'), default=_json_default, allow_nan=False, ensure_ascii=False).encode('utf-8')
+
+def get_encoder(name="auto"):
+    """
+    Returns a callable obj -> bytes.
+    'orjson' is the fast path, 'json' is the stdlib with compact separators,
+    'auto' picks orjson when it is installed.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        return lambda obj: orjson.dumps(obj, default=_json_default, option=options)
+
+    if name == "json":
+        return _stdlib_dumps
+
+    raise ValueError(f"Unknown encoder: {name}")
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+# ==========================================
+# 2. STREAMING WRITER
+# ==========================================
+class FeedWriter:
+    """
+    Writes a JSON document in chunks to the target file and, in the same pass,
+    to optional .gz / .br companions. Use as a context manager.
+    Everything is written to .tmp files and moved into place with os.replace on
+    a clean exit, so readers never see a partial feed.
+    """
+    def __init__(self, path, gzip_companion=False, brotli_companion=False):
+        self.path = path
+        self.gzip_file = None
+        self.brotli_compressor = None
+        self.brotli_file = None
+        self.bytes_written = 0
+        self.outputs = [path]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path + ".tmp", "wb")
+
+        if gzip_companion:
+            self.gzip_file = gzip.open(path + ".gz.tmp", "wb", compresslevel=6)
+            self.outputs.append(path + ".gz")
+        if brotli_companion:
+            if brotli is None:
+                print("   ⚠️ brotli not installed, skipping .br companion")
+            else:
+                self.brotli_compressor = brotli.Compressor(quality=5)
+                self.brotli_file = open(path + ".br.tmp", "wb")
+                self.outputs.append(path + ".br")
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        if self.gzip_file is not None:
+            self.gzip_file.write(chunk)
+        if self.brotli_compressor is not None:
+            self.brotli_file.write(self.brotli_compressor.process(chunk))
+        self.bytes_written += len(chunk)
+
+    def close(self, commit=True):
+        self.file.close()
+        if self.gzip_file is not None:
+            self.gzip_file.close()
+        if self.brotli_compressor is not None:
+            self.brotli_file.write(self.brotli_compressor.finish())
+            self.brotli_file.close()
+
+        for output in self.outputs:
+            if commit:
+                os.replace(output + ".tmp", output)
+            elif os.path.exists(output + ".tmp"):
+                os.remove(output + ".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+        return False
+
+def write_feed(path, players, header=None, encoder="auto", gzip_companion=False, brotli_companion=False):
+    """
+    Streams the master feed one player record at a time.
+
+    header=None writes a bare JSON list of players; otherwise the header dict is
+    written first and the records land under its "players" key.
+    Returns {"players", "bytes", "seconds", "peak_rss_mb"}.
+    """
+    encode = get_encoder(encoder) if isinstance(encoder, str) else encoder
+    start = time.perf_counter()
+    count = 0
+
+    with FeedWriter(path, gzip_companion, brotli_companion) as writer:
+        if header is None:
+            writer.write(b"[")
+        else:
+            # '{...}' -> '{...,"players":['
+            head = encode(header)
+            writer.write(head[:-1] + (b',' if len(head) > 2 else b'') + b'"players":[')
+
+        for record in players:
+            if count:
+                writer.write(b",")
+            writer.write(encode(record))
+            count += 1
+
+        writer.write(b"]" if header is None else b"]}")
+
+    return {
+        "players": count,
+        "bytes": writer.bytes_written,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb()
+    }
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import hashlib
+
+import pandas as pd
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+STATUS_OK = "ok"          # Fetched, data stored
+STATUS_EMPTY = "empty"    # Fetched, the endpoint had no rows (nothing to store)
+STATUS_FAILED = "failed"  # Retries exhausted; the stored cell is NaN until refetched
+DONE_STATUSES = (STATUS_OK, STATUS_EMPTY)
+
+def frame_hash(df):
+    """Content hash of a DataFrame (row order and values, not the index)."""
+    if df is None or df.empty:
+        return None
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(",".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+class FetchManifest:
+    """
+    Persisted record of what has been fetched, one cell per (key, part),
+    e.g. (game date, PtMeasureType):
+
+      {"2026-01-10": {"final": false,
+                      "cells": {"Passing": {"status": "ok", "hash": "...", "rows": 212,
+                                            "fetched_at": 1768100000.0, "attempts": 1}}}}
+
+    Runs ask which cells are due instead of refetching whole keys, and keys
+    whose cells are all done and old enough are marked final and never
+    fetched again.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"   ⚠️ Could not read manifest {os.path.basename(path)} ({e}), starting fresh")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    # --- Reads ---
+    def cell(self, key, part):
+        return self.entries.get(key, {}).get("cells", {}).get(part)
+
+    def is_final(self, key):
+        return self.entries.get(key, {}).get("final", False)
+
+    def due(self, key, parts, revalidate_after=None, now=None):
+        """
+        Parts of `key` that need fetching: never fetched, failed, or (when
+        revalidate_after seconds is given and the key is not final) stale.
+        """
+        if self.is_final(key):
+            return []
+        now = now or time.time()
+        due = []
+        for part in parts:
+            cell = self.cell(key, part)
+            if cell is None or cell["status"] not in DONE_STATUSES:
+                due.append(part)
+            elif revalidate_after is not None and now - cell["fetched_at"] >= revalidate_after:
+                due.append(part)
+        return due
+
+    # --- Writes ---
+    def record(self, key, part, status, content_hash=None, rows=0, now=None):
+        """Stores the outcome of one fetch; returns True if the content changed."""
+        entry = self.entries.setdefault(key, {"final": False, "cells": {}})
+        previous = entry["cells"].get(part) or {}
+        entry["cells"][part] = {
+            "status": status,
+            # A failed refetch keeps the last good hash (the stored data is unchanged)
+            "hash": content_hash if status != STATUS_FAILED else previous.get("hash"),
+            "rows": rows if status != STATUS_FAILED else previous.get("rows", 0),
+            "fetched_at": (now or time.time()) if status != STATUS_FAILED else previous.get("fetched_at", 0),
+            "attempts": previous.get("attempts", 0) + 1,
+        }
+        return status != STATUS_FAILED and previous.get("hash") != content_hash
+
+    def finalize(self, key, parts, settled_at):
+        """Marks `key` final once every part is done and was fetched at or after settled_at."""
+        cells = [self.cell(key, part) for part in parts]
+        if all(c and c["status"] in DONE_STATUSES and c["fetched_at"] >= settled_at for c in cells):
+            self.entries.setdefault(key, {"cells": {}})["final"] = True
+            return True
+        return False
@@ -0,0 +1,129 @@
+import os
+import glob
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+PARTITION_KEY = "date"          # Hive-style directory key: <root>/date=YYYY-MM-DD/
+PARTITION_FILE = "part.parquet" # One file per game date
+MANIFEST_FILE = "_manifest.json" # Per-(date, PtMeasureType) fetch status (see fetch_manifest.py)
+
+class GameLogStore:
+    """
+    Date-partitioned Parquet store for player game logs.
+
+    Layout: <root>/date=2025-11-08/part.parquet
+    Writes only touch the partitions of the dates being written, so an
+    incremental run costs O(new dates) no matter how much history is kept.
+    Reads push date filters down to partition pruning and PLAYER_ID filters
+    down to Parquet row-group statistics.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    # --- Layout helpers ---
+    def _partition_dir(self, date):
+        return os.path.join(self.root, f"{PARTITION_KEY}={date}")
+
+    def _partition_files(self):
+        return sorted(glob.glob(os.path.join(self.root, f"{PARTITION_KEY}=*", PARTITION_FILE)))
+
+    def dates(self):
+        """Sorted list of stored game dates ('YYYY-MM-DD')."""
+        return [os.path.basename(os.path.dirname(f)).split("=", 1)[1] for f in self._partition_files()]
+
+    def is_empty(self):
+        return not self._partition_files()
+
+    # --- Writes ---
+    def write_partitions(self, df):
+        """
+        Replaces the partitions for every GAME_DATE present in df.
+        Each partition is written to a temp file and swapped in with os.replace,
+        so readers never see a half-written date.
+        """
+        if df.empty:
+            return []
+
+        df = df.copy()
+        df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d')
+
+        written = []
+        for date, group in df.groupby('GAME_DATE'):
+            part_dir = self._partition_dir(date)
+            os.makedirs(part_dir, exist_ok=True)
+
+            group = group.sort_values('PLAYER_ID').reset_index(drop=True)
+            table = pa.Table.from_pandas(group, preserve_index=False)
+
+            final_path = os.path.join(part_dir, PARTITION_FILE)
+            tmp_path = final_path + ".tmp"
+            pq.write_table(table, tmp_path, compression="zstd")
+            os.replace(tmp_path, final_path)
+            written.append(date)
+        return written
+
+    def import_csv(self, csv_path):
+        """One-off migration from the legacy gamelogs.csv."""
+        df = pd.read_csv(csv_path)
+        if df.empty or 'GAME_DATE' not in df.columns:
+            return []
+        return self.write_partitions(df)
+
+    # --- Reads ---
+    def _dataset(self):
+        files = self._partition_files()
+        if not files:
+            return None
+        # Partitions written on different days can disagree on dtypes (e.g. a column
+        # that was all-int one day and had NaN the next), so unify permissively.
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+        schema = schema.append(pa.field(PARTITION_KEY, pa.string()))
+        partitioning = ds.partitioning(pa.schema([(PARTITION_KEY, pa.string())]), flavor="hive")
+        return ds.dataset(self.root, format="parquet", schema=schema, partitioning=partitioning,
+                          exclude_invalid_files=True)
+
+    def read(self, columns=None, player_ids=None, date_from=None, date_to=None):
+        """
+        Returns the matching rows as a DataFrame (empty if the store is empty).
+
+        Args:
+            columns (list): Column projection (None = all columns).
+            player_ids (iterable): Only these PLAYER_IDs.
+            date_from / date_to (str): Inclusive 'YYYY-MM-DD' bounds.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame()
+
+        expr = None
+        def _and(a, b):
+            return b if a is None else a & b
+
+        if date_from:
+            expr = _and(expr, ds.field(PARTITION_KEY) >= date_from)
+        if date_to:
+            expr = _and(expr, ds.field(PARTITION_KEY) <= date_to)
+        if player_ids is not None:
+            expr = _and(expr, ds.field('PLAYER_ID').isin([int(p) for p in player_ids]))
+
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        else:
+            columns = [c for c in dataset.schema.names if c != PARTITION_KEY]
+
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+    def recent_games(self, n_games, columns=None, player_ids=None, date_from=None):
+        """Last n_games per player, sorted PLAYER_ID asc / GAME_DATE desc (gamelogs.csv order)."""
+        if columns is not None:
+            columns = list(dict.fromkeys(['PLAYER_ID', 'GAME_DATE'] + list(columns)))
+        df = self.read(columns=columns, player_ids=player_ids, date_from=date_from)
+        if df.empty:
+            return df
+        df = df.sort_values(by=['PLAYER_ID', 'GAME_DATE'], ascending=[True, False])
+        return df.groupby('PLAYER_ID').head(n_games).reset_index(drop=True)
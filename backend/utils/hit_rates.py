@@ -0,0 +1,146 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# (label, most recent N games); None = every game of the season
+SPLIT_WINDOWS = [("L5", 5), ("L10", 10), ("L20", 20), ("SEASON", None)]
+# Order of the numbers in each window's array (see Player.props in frontend/types.ts)
+SPLIT_FIELDS = ["hits", "games", "avg", "median", "margin"]
+
+COMBO_STATS = {
+    'PTS+REB+AST': ['PTS', 'REB', 'AST'],
+    'PTS+REB': ['PTS', 'REB'],
+    'PTS+AST': ['PTS', 'AST'],
+    'REB+AST': ['REB', 'AST'],
+    'STL+BLK': ['STL', 'BLK'],
+}
+BASE_STATS = ['PTS', 'REB', 'AST', 'FG3M', 'STL', 'BLK', 'TOV']
+# Header ticker stats shipped as last-5 averages (compared with the season averages client-side)
+RECENT_STATS = ['PTS', 'AST', 'REB', 'FG3M', 'MIN', 'FGA']
+RECENT_GAMES = 5
+# Game-log columns the splits read
+LOG_COLUMNS = list(dict.fromkeys(BASE_STATS + RECENT_STATS + list(COMBO_STATS)))
+
+# ==========================================
+# 1. PLAYER x GAME MATRIX
+# ==========================================
+class GameMatrix:
+    """
+    One float matrix per stat, players x games, newest game first and NaN
+    padded past each player's last game, so every split is a slice + reduction
+    over all players at once.
+    """
+    def __init__(self, df_logs, stats):
+        df = df_logs.sort_values(['PLAYER_ID', 'GAME_DATE'], ascending=[True, False])
+        self.player_ids, rows = np.unique(df['PLAYER_ID'].to_numpy(dtype=np.int64), return_inverse=True)
+        cols = df.groupby('PLAYER_ID').cumcount().to_numpy()
+        self.n_games = int(cols.max()) + 1 if len(cols) else 0
+        self.row_of = {int(pid): i for i, pid in enumerate(self.player_ids)}
+
+        self.stats = {}
+        for stat in stats:
+            if stat in df.columns:
+                values = pd.to_numeric(df[stat], errors='coerce').to_numpy(dtype=np.float64)
+            elif stat in COMBO_STATS and all(c in df.columns for c in COMBO_STATS[stat]):
+                values = df[COMBO_STATS[stat]].apply(pd.to_numeric, errors='coerce').sum(axis=1, min_count=len(COMBO_STATS[stat])).to_numpy(dtype=np.float64)
+            else:
+                continue
+            matrix = np.full((len(self.player_ids), self.n_games), np.nan)
+            matrix[rows, cols] = values
+            self.stats[stat] = matrix
+
+# ==========================================
+# 2. SPLITS
+# ==========================================
+def window_splits(values, lines):
+    """
+    values: [N, G] game values (newest first, NaN = no game); lines: [N].
+    Returns [N, len(SPLIT_WINDOWS), len(SPLIT_FIELDS)] with a hit meaning value >= line
+    (same rule the dashboard has always used).
+    """
+    out = np.full((len(lines), len(SPLIT_WINDOWS), len(SPLIT_FIELDS)), np.nan)
+    lines = lines[:, None]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN windows (no games) stay NaN
+        for w, (_, n) in enumerate(SPLIT_WINDOWS):
+            window = values[:, :n] if n else values
+            played = ~np.isnan(window)
+            games = played.sum(axis=1)
+            avg = np.nanmean(window, axis=1)
+            out[:, w, 0] = ((window >= lines) & played).sum(axis=1)
+            out[:, w, 1] = games
+            out[:, w, 2] = avg
+            out[:, w, 3] = np.nanmedian(window, axis=1)
+            out[:, w, 4] = avg - lines[:, 0]
+    return out
+
+def compact_splits(splits):
+    """
+    [N, windows, fields] -> per quote {window: [hits, games, avg, median, margin]}
+    with int counts, one decimal, and None where a window has no games.
+    """
+    counts = splits[..., :2].astype(np.int64).tolist()
+    values = np.round(splits[..., 2:], 1).astype(object)
+    values[np.isnan(splits[..., 2:])] = None
+    values = values.tolist()
+    labels = [label for label, _ in SPLIT_WINDOWS]
+    return [
+        {label: c + v for label, c, v in zip(labels, quote_counts, quote_values)}
+        for quote_counts, quote_values in zip(counts, values)
+    ]
+
+def attach_splits(master_data, df_logs):
+    """
+    Adds to every quote in master_data[pid]['props'][prop][book] a compact
+    "splits": {"L5": [hits, games, avg, median, margin], "L10": ..., "L20": ..., "SEASON": ...}
+    and to every player "recent": {stat: last-5 average} for the header ticker.
+    df_logs holds the season's games (any order). Returns the number of quotes annotated.
+    """
+    if df_logs is None or df_logs.empty or 'PLAYER_ID' not in df_logs.columns:
+        return 0
+    props = {prop for p in master_data.values() for prop in p['props']}
+    matrix = GameMatrix(df_logs, list(dict.fromkeys(list(props) + RECENT_STATS)))
+
+    # Flatten every quote into one batch per stat
+    batches = {}
+    for pid, player in master_data.items():
+        row = matrix.row_of.get(pid)
+        if row is None:
+            continue
+        for prop, books in player['props'].items():
+            if prop not in matrix.stats:
+                continue
+            for book, quote in books.items():
+                try:
+                    line = float(quote.get('line'))
+                except (TypeError, ValueError):
+                    continue
+                if np.isnan(line):
+                    continue
+                batches.setdefault(prop, []).append((row, line, quote))
+
+    n_quotes = 0
+    for prop, batch in batches.items():
+        rows = np.array([b[0] for b in batch])
+        lines = np.array([b[1] for b in batch])
+        splits = compact_splits(window_splits(matrix.stats[prop][rows], lines))
+        for (_, _, quote), split in zip(batch, splits):
+            quote['splits'] = split
+        n_quotes += len(batch)
+
+    # Last-5 averages for the ticker, every player at once
+    recent = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for stat in RECENT_STATS:
+            if stat in matrix.stats:
+                recent[stat] = np.nanmean(matrix.stats[stat][:, :RECENT_GAMES], axis=1)
+    for pid, player in master_data.items():
+        row = matrix.row_of.get(pid)
+        if row is not None:
+            player['recent'] = {stat: round(float(v[row]), 1) for stat, v in recent.items() if not np.isnan(v[row])}
+    return n_quotes
@@ -0,0 +1,70 @@
+from collections import deque
+
+# Quote fields compared between snapshots (and sent for changed props)
+DIFF_FIELDS = ('line', 'over', 'under')
+
+def quote_index(players, ladders=False):
+    """
+    {(pid, prop, book): (line, over, under)} for every prop in a feed.
+    ladders=True appends the alt-line ladder (hashable, None without one), so a
+    move on any rung counts as a change even when the main line did not move.
+    """
+    index = {}
+    for p in players:
+        pid = int(p['id'])
+        for prop, books in (p.get('props') or {}).items():
+            for book, quote in books.items():
+                fields = tuple(quote.get(f) for f in DIFF_FIELDS)
+                index[(pid, prop, book)] = fields + (_freeze(quote.get('ladder')),) if ladders else fields
+    return index
+
+def _freeze(ladder):
+    if not ladder:
+        return None
+    return tuple(ladder['lines']), tuple(ladder['over']), tuple(ladder['under']), ladder['main']
+
+def _thaw(frozen):
+    if frozen is None:
+        return None
+    lines, over, under, main = frozen
+    return {"lines": list(lines), "over": list(over), "under": list(under), "main": main}
+
+def diff_quotes(old_index, new_index):
+    """
+    Compact diff between two quote indexes.
+    Returns {"changed": [[pid, prop, book, line, over, under], ...],
+             "removed": [[pid, prop, book], ...]}
+    Indexes built with ladders=True add the whole ladder (or None) to each
+    changed entry. New props count as changed.
+    """
+    changed = [
+        [*key, *quote[:len(DIFF_FIELDS)], *map(_thaw, quote[len(DIFF_FIELDS):])]
+        for key, quote in new_index.items()
+        if old_index.get(key) != quote
+    ]
+    removed = [list(key) for key in sorted(old_index.keys() - new_index.keys())]
+    return {"changed": changed, "removed": removed}
+
+class DeltaLog:
+    """
+    Bounded, sequence-numbered history of odds diffs.
+    Clients resume from the last sequence they saw; anything older than the
+    retained window means they must refetch the full feed.
+    """
+    def __init__(self, maxlen=500):
+        self.seq = 0
+        self.entries = deque(maxlen=maxlen)
+
+    def append(self, base_version, version, diff):
+        self.seq += 1
+        entry = {"seq": self.seq, "base": base_version, "version": version, **diff}
+        self.entries.append(entry)
+        return entry
+
+    def since(self, last_seq):
+        """Entries after last_seq, or None if the client is too far behind."""
+        if last_seq >= self.seq:
+            return []
+        if not self.entries or last_seq < self.entries[0]["seq"] - 1:
+            return None
+        return [e for e in self.entries if e["seq"] > last_seq]
@@ -0,0 +1,334 @@
+import os
+import glob
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+PARTITION_KEY = "date"           # Hive-style directory key: <root>/date=YYYY-MM-DD/
+COMPACT_FILE = "part.parquet"    # A finished day, merged and sorted by market
+LATEST_FILE = "latest.parquet"   # Last recorded quote per market (what the next run diffs against)
+
+SCHEMA = pa.schema([
+    ("ts", pa.int64()),                               # Capture time, ms since epoch (UTC)
+    ("player_id", pa.int32()),
+    ("prop", pa.dictionary(pa.int16(), pa.string())),
+    ("book", pa.dictionary(pa.int8(), pa.string())),
+    ("line", pa.float32()),                           # NaN line = market taken down
+    ("over", pa.int32()),                             # American odds
+    ("under", pa.int32()),
+])
+
+# Players/props/books are dictionary encoded; timestamps, ids and prices are
+# delta encoded (sorted by market then time in compacted days, so consecutive
+# values are small differences).
+PARQUET_OPTIONS = {
+    "compression": "zstd",
+    "use_dictionary": ["prop", "book"],
+    "column_encoding": {
+        "ts": "DELTA_BINARY_PACKED",
+        "player_id": "DELTA_BINARY_PACKED",
+        "over": "DELTA_BINARY_PACKED",
+        "under": "DELTA_BINARY_PACKED",
+        "line": "BYTE_STREAM_SPLIT",
+    },
+}
+
+def american_to_prob(odds):
+    """Vectorized American odds -> implied probability (NaN where missing)."""
+    odds = np.asarray(odds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds < 0, -odds / (100.0 - odds), 100.0 / (odds + 100.0))
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+# ==========================================
+# 1. STORE (append-only)
+# ==========================================
+class OddsHistoryStore:
+    """
+    Append-only, day-partitioned history of every quote change.
+
+    Layout: <root>/date=2026-01-10/183000-123456.parquet   one file per run (only changed quotes)
+            <root>/date=2026-01-09/part.parquet            past days compacted into one file
+            <root>/latest.parquet                          last quote per market
+
+    A market is (player_id, prop, book). A run records a row for every new or
+    changed quote and a NaN-line row when a book stops offering a market, so
+    "since open" is everything after the last take-down.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    # --- Layout helpers ---
+    def _partition_dir(self, date):
+        return os.path.join(self.root, f"{PARTITION_KEY}={date}")
+
+    def _partition_files(self, date_from=None, date_to=None):
+        files = sorted(glob.glob(os.path.join(self.root, f"{PARTITION_KEY}=*", "*.parquet")))
+        if date_from or date_to:
+            def keep(f):
+                date = os.path.basename(os.path.dirname(f)).split("=", 1)[1]
+                return (not date_from or date >= date_from) and (not date_to or date <= date_to)
+            files = [f for f in files if keep(f)]
+        return files
+
+    def dates(self):
+        return sorted({os.path.basename(os.path.dirname(f)).split("=", 1)[1] for f in self._partition_files()})
+
+    def _write(self, df, path):
+        table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path, **PARQUET_OPTIONS)
+        os.replace(tmp_path, path)
+
+    # --- Latest state ---
+    def latest(self):
+        """{(pid, prop, book): (line, over, under)} of the last recorded live quotes."""
+        path = os.path.join(self.root, LATEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        df = pq.read_table(path).to_pandas()
+        return {
+            (int(pid), str(prop), str(book)): (_num(line), _num(over), _num(under))
+            for pid, prop, book, line, over, under in zip(
+                df['player_id'], df['prop'], df['book'], df['line'], df['over'], df['under'])
+        }
+
+    # --- Writes ---
+    def append(self, quotes, ts=None):
+        """
+        Records the quotes of one run ({(pid, prop, book): (line, over, under)},
+        see odds_diff.quote_index) that differ from the last recorded state.
+        Books with no quotes at all in this run are treated as a failed scrape,
+        not as every market closing. Returns the number of rows written.
+        """
+        ts = ts or _now_ms()
+        previous = self.latest()
+        live_books = {book for _, _, book in quotes}
+
+        rows = [(*key, *quote) for key, quote in quotes.items() if previous.get(key) != _normalize(quote)]
+        closed = [key for key in previous if key not in quotes and key[2] in live_books]
+        rows += [(*key, None, None, None) for key in closed]
+
+        if rows:
+            df = _frame(rows, ts)
+            date = datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d")
+            part_dir = self._partition_dir(date)
+            os.makedirs(part_dir, exist_ok=True)
+            stamp = datetime.fromtimestamp(ts / 1000).strftime("%H%M%S-%f")
+            self._write(df, os.path.join(part_dir, f"{stamp}.parquet"))
+
+            latest = {**previous, **{key: _normalize(q) for key, q in quotes.items()}}
+            for key in closed:
+                latest.pop(key, None)
+            self._write(_frame([(*k, *q) for k, q in latest.items()], ts), os.path.join(self.root, LATEST_FILE))
+
+        self.compact(before=datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d"))
+        return len(rows)
+
+    def compact(self, before):
+        """Merges the per-run files of every day before `before` into one sorted file."""
+        for date in self.dates():
+            if date >= before:
+                continue
+            part_dir = self._partition_dir(date)
+            files = sorted(glob.glob(os.path.join(part_dir, "*.parquet")))
+            if len(files) == 1 and os.path.basename(files[0]) == COMPACT_FILE:
+                continue
+            df = pd.concat([pq.read_table(f).to_pandas() for f in files], ignore_index=True)
+            df = df.sort_values(['player_id', 'prop', 'book', 'ts'], kind='stable')
+            self._write(df, os.path.join(part_dir, COMPACT_FILE))
+            for f in files:
+                if os.path.basename(f) != COMPACT_FILE:
+                    os.remove(f)
+
+    # --- Reads ---
+    def read(self, date_from=None, date_to=None):
+        files = self._partition_files(date_from, date_to)
+        if not files:
+            return _frame([], 0)
+        table = pa.concat_tables([pq.read_table(f, schema=SCHEMA) for f in files])
+        return table.to_pandas()
+
+    def index(self, date_from=None, date_to=None):
+        return OddsHistoryIndex(self.read(date_from, date_to))
+
+class HistoryIndexCache:
+    """
+    OddsHistoryIndex over the whole store for a long-running reader. refresh()
+    rebuilds it only when the store's files changed and re-reads only the new or
+    replaced files (a run adds one; compaction replaces a day's files once).
+    """
+    def __init__(self, store):
+        self.store = store
+        self.index = None
+        self._signature = None
+        self._frames = {}  # path -> ((mtime_ns, size), DataFrame)
+
+    def refresh(self):
+        files = self.store._partition_files()
+        signature = []
+        for f in files:
+            st = os.stat(f)
+            signature.append((f, (st.st_mtime_ns, st.st_size)))
+        if signature == self._signature:
+            return self.index
+
+        frames = {}
+        for f, stamp in signature:
+            cached = self._frames.get(f)
+            frames[f] = cached if cached and cached[0] == stamp else (stamp, pq.read_table(f, schema=SCHEMA).to_pandas())
+        df = pd.concat([df for _, df in frames.values()], ignore_index=True) if frames else _frame([], 0)
+        self.index, self._signature, self._frames = OddsHistoryIndex(df), signature, frames
+        return self.index
+
+def _num(value):
+    """NaN/None -> None, numpy scalar -> python number (so quotes compare equal across runs)."""
+    if value is None or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def _normalize(quote):
+    line, over, under = (_num(v) for v in quote)
+    return (float(line) if line is not None else None,
+            int(over) if over is not None else None,
+            int(under) if under is not None else None)
+
+def _frame(rows, ts):
+    df = pd.DataFrame(rows, columns=['player_id', 'prop', 'book', 'line', 'over', 'under'])
+    df.insert(0, 'ts', np.int64(ts))
+    df['player_id'] = df['player_id'].astype('int32')
+    df['line'] = pd.to_numeric(df['line'], errors='coerce').astype('float32')
+    for col in ('over', 'under'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int32')
+    return df
+
+# ==========================================
+# 2. QUERY INDEX
+# ==========================================
+class OddsHistoryIndex:
+    """
+    In-memory, read-only index over a span of history.
+
+    Rows are sorted by (player_id, prop, book, ts), so one market is a
+    contiguous slice found by binary search, and a second time-sorted order
+    finds the rows of a recent window without scanning the season.
+    """
+    def __init__(self, df):
+        prop = df['prop'].astype('category')
+        book = df['book'].astype('category')
+        self.props = prop.cat.categories
+        self.books = book.cat.categories
+
+        pid = df['player_id'].to_numpy(np.int64)
+        prop_code = prop.cat.codes.to_numpy(np.int64)
+        book_code = book.cat.codes.to_numpy(np.int64)
+        ts = df['ts'].to_numpy(np.int64)
+        order = np.lexsort((ts, book_code, prop_code, pid))
+
+        self.pid = pid[order]
+        self.prop_code = prop_code[order]
+        self.book_code = book_code[order]
+        self.ts = ts[order]
+        self.line = df['line'].to_numpy(np.float64, na_value=np.nan)[order]
+        self.over = df['over'].to_numpy(np.float64, na_value=np.nan)[order]
+        self.under = df['under'].to_numpy(np.float64, na_value=np.nan)[order]
+
+        # Market id per row and the slice [start, end) of each market
+        new_market = np.ones(len(order), dtype=bool)
+        new_market[1:] = ((self.pid[1:] != self.pid[:-1]) |
+                          (self.prop_code[1:] != self.prop_code[:-1]) |
+                          (self.book_code[1:] != self.book_code[:-1]))
+        self.market = np.cumsum(new_market) - 1
+        self.market_start = np.flatnonzero(new_market)
+        self.market_end = np.append(self.market_start[1:], len(order))
+
+        self.by_time = np.argsort(self.ts, kind='stable')
+        self.ts_sorted = self.ts[self.by_time]
+
+    def __len__(self):
+        return len(self.ts)
+
+    def _rows(self, rows):
+        return pd.DataFrame({
+            'ts': self.ts[rows],
+            'player_id': self.pid[rows],
+            'prop': np.asarray(self.props)[self.prop_code[rows]] if len(rows) else [],
+            'book': np.asarray(self.books)[self.book_code[rows]] if len(rows) else [],
+            'line': self.line[rows],
+            'over': pd.Series(self.over[rows]).astype('Int32'),
+            'under': pd.Series(self.under[rows]).astype('Int32'),
+        })
+
+    def movement(self, player_id, prop, book=None):
+        """
+        Every quote for a player's prop since the market opened (after its last
+        take-down), per book, with moves relative to the opening quote.
+        """
+        lo, hi = np.searchsorted(self.pid, [player_id, player_id + 1])
+        if prop not in self.props:
+            return self._rows(np.array([], dtype=np.int64))
+        prop_code = self.props.get_loc(prop)
+        rows = lo + np.flatnonzero(self.prop_code[lo:hi] == prop_code)
+        if book is not None:
+            rows = rows[self.book_code[rows] == (self.books.get_loc(book) if book in self.books else -1)]
+
+        keep = []
+        for market in np.unique(self.market[rows]):
+            start, end = self.market_start[market], self.market_end[market]
+            # The last row may itself be the take-down that ended the current market
+            closed = np.flatnonzero(np.isnan(self.line[start:end - 1]))
+            open_at = start + closed[-1] + 1 if len(closed) else start
+            keep.append(np.arange(open_at, end))
+        rows = np.concatenate(keep) if keep else np.array([], dtype=np.int64)
+
+        df = self._rows(rows)
+        if not df.empty:
+            opening = df.groupby('book')[['line', 'over']].transform('first')
+            df['line_move'] = df['line'] - opening['line']
+            df['over_prob_move'] = american_to_prob(df['over']) - american_to_prob(opening['over'])
+        return df
+
+    def largest_moves(self, minutes=15, now=None, limit=20):
+        """
+        Markets that moved the most in the last `minutes`: line move first,
+        then the change in the over's implied probability.
+        """
+        now = now or _now_ms()
+        first = np.searchsorted(self.ts_sorted, now - minutes * 60_000)
+        recent = self.by_time[first:]
+        if not len(recent):
+            return self._rows(np.array([], dtype=np.int64))
+
+        # First in-window row of each market that moved in the window
+        recent = np.sort(recent)
+        markets, first_idx = np.unique(self.market[recent], return_index=True)
+        first_in_window = recent[first_idx]
+
+        # Baseline: the quote live just before the window (same market, not a take-down)
+        before = first_in_window - 1
+        has_before = (before >= self.market_start[markets]) & ~np.isnan(self.line[np.maximum(before, 0)])
+        base = np.where(has_before, before, first_in_window)
+        last = self.market_end[markets] - 1
+
+        live = ~np.isnan(self.line[last]) & ~np.isnan(self.line[base])
+        base, last = base[live], last[live]
+
+        line_move = self.line[last] - self.line[base]
+        prob_move = american_to_prob(self.over[last]) - american_to_prob(self.over[base])
+        rank = np.lexsort((-np.abs(np.nan_to_num(prob_move)), -np.abs(line_move)))[:limit]
+
+        df = self._rows(last[rank])
+        df['open_line'] = self.line[base[rank]]
+        df['open_over'] = self.over[base[rank]]
+        df['line_move'] = line_move[rank]
+        df['over_prob_move'] = prob_move[rank]
+        return df
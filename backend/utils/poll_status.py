@@ -0,0 +1,96 @@
+import os
+import json
+import time
+
+import numpy as np
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+STATUS_FILE = "pipeline_status.json"  # Lives in data/, outside the published generations
+TICK_HISTORY = 200                    # Ticks kept for the latency percentiles
+
+class PollStatus:
+    """
+    Health of the polling daemon, rewritten after every tick:
+
+      {"config": {...}, "last_tick": {"kind": "odds", "seconds": 4.2, ...},
+       "ticks": {"count": 812, "p50": 3.9, "p95": 6.1, "max": 11.0},
+       "books": {"dk": {"last_success": 1768100000.0, "rows": 4211, "fetch_seconds": 2.1,
+                        "error": null, "staleness_seconds": 3.8}, ...},
+       "last_full_at": ..., "next_full_at": ...}
+
+    A book's staleness is the age of its last successful scrape (rows > 0),
+    so a failing book shows up as a growing number rather than a gap.
+    """
+    def __init__(self, path, config=None):
+        self.path = path
+        self.started_at = time.time()
+        self.config = config or {}
+        self.books = {}
+        self.tick_seconds = []
+        self.tick_count = 0
+        self.last_tick = None
+        self.last_full_at = None
+        self.next_full_at = None
+
+    def record_book(self, book, rows, seconds, error=None, now=None):
+        now = now or time.time()
+        entry = self.books.setdefault(book, {"last_success": None, "rows": 0})
+        entry["fetch_seconds"] = round(seconds, 3)
+        entry["last_attempt"] = now
+        entry["error"] = error
+        if error is None and rows > 0:
+            entry["last_success"] = now
+            entry["rows"] = rows
+
+    def record_tick(self, kind, seconds, generation=None, now=None):
+        now = now or time.time()
+        self.tick_count += 1
+        self.tick_seconds = (self.tick_seconds + [seconds])[-TICK_HISTORY:]
+        self.last_tick = {"kind": kind, "finished_at": now, "seconds": round(seconds, 3), "generation": generation}
+        if kind == "full" and generation is not None:
+            self.last_full_at = now  # Only a published full run refreshed the stats
+
+    def snapshot(self, now=None):
+        now = now or time.time()
+        ticks = {"count": self.tick_count}
+        if self.tick_seconds:
+            ticks.update({
+                "p50": round(float(np.percentile(self.tick_seconds, 50)), 3),
+                "p95": round(float(np.percentile(self.tick_seconds, 95)), 3),
+                "max": round(max(self.tick_seconds), 3),
+            })
+        return with_staleness({
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": now,
+            "config": self.config,
+            "last_tick": self.last_tick,
+            "ticks": ticks,
+            "books": self.books,
+            "last_full_at": self.last_full_at,
+            "next_full_at": self.next_full_at,
+        }, now)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+def with_staleness(status, now=None):
+    """Recomputes every book's staleness_seconds against `now`."""
+    now = now or time.time()
+    for entry in (status.get("books") or {}).values():
+        last = entry.get("last_success")
+        entry["staleness_seconds"] = round(now - last, 1) if last else None
+    return status
+
+def read_status(path, now=None):
+    """The daemon's last written status with live staleness, or None if there is none."""
+    try:
+        with open(path) as f:
+            return with_staleness(json.load(f), now)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from utils.odds_history import american_to_prob
+
+# ==========================================
+# 1. ODDS CONVERSIONS (vectorized)
+# ==========================================
+def american_to_decimal(odds):
+    """American -> decimal odds (payout per unit staked, stake included); NaN where missing."""
+    odds = np.asarray(odds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, 1 + odds / 100.0, 1 + 100.0 / -odds)
+
+def no_vig(over_prob, under_prob):
+    """Two-way market -> (fair over, fair under, hold), removing the vig proportionally."""
+    total = over_prob + under_prob
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return over_prob / total, under_prob / total, total - 1
+
+# ==========================================
+# 2. SLATE PRICING
+# ==========================================
+def _to_float(values):
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+def price_slate(pids, props, lines, over, under, books):
+    """
+    Prices every quote of a slate at once. Inputs are equal-length sequences,
+    one entry per (player, prop, book) quote; books are whatever keys the feed
+    has, so a new sportsbook needs no code here.
+
+    Quotes on the same player, prop and line form a market. Per quote returns:
+      implied            over probability with the vig
+      fair_over          consensus no-vig over probability of its market
+                         (mean of the no-vig probabilities of every book quoting both sides)
+      ev_over/ev_under   expected profit per unit staked at this book's prices vs fair_over
+      best_over/under    best price per side in the market, and the book offering it
+    """
+    over = _to_float(over)
+    under = _to_float(under)
+    lines = _to_float(lines)
+    over_prob, under_prob = american_to_prob(over), american_to_prob(under)
+    fair_book, _, _ = no_vig(over_prob, under_prob)
+
+    markets = pd.DataFrame({'pid': pids, 'prop': props, 'line': lines})
+    market = markets.groupby(['pid', 'prop', 'line'], sort=False, dropna=False).ngroup().to_numpy()
+    n_markets = int(market.max()) + 1 if len(market) else 0
+
+    valid = ~np.isnan(fair_book)
+    sums = np.bincount(market[valid], weights=fair_book[valid], minlength=n_markets)
+    counts = np.bincount(market[valid], minlength=n_markets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fair_over = (sums / counts)[market]
+
+    over_dec, under_dec = american_to_decimal(over), american_to_decimal(under)
+    out = {
+        'implied': over_prob,
+        'fair_over': fair_over,
+        'ev_over': fair_over * over_dec - 1,
+        'ev_under': (1 - fair_over) * under_dec - 1,
+    }
+    books = np.asarray(books, dtype=object)
+    for side, odds, dec in (('over', over, over_dec), ('under', under, under_dec)):
+        best_odds, best_book = _best_per_market(market, n_markets, odds, dec, books)
+        out[f'best_{side}'] = best_odds
+        out[f'best_{side}_book'] = best_book
+    return out
+
+def _best_per_market(market, n_markets, odds, dec, books):
+    """Highest decimal payout per market (ties: first quote), broadcast back to every quote."""
+    best_odds = np.full(n_markets, np.nan)
+    best_book = np.full(n_markets, None, dtype=object)
+    has = ~np.isnan(dec)
+    idx = np.flatnonzero(has)
+    if len(idx):
+        order = idx[np.lexsort((-dec[idx], market[idx]))]  # By market, best payout first
+        first = order[np.unique(market[order], return_index=True)[1]]
+        best_odds[market[first]] = odds[first]
+        best_book[market[first]] = books[first]
+    return best_odds[market], best_book[market]
+
+def attach_pricing(master_data):
+    """
+    Adds to every quote in master_data[pid]['props'][prop][book]:
+      "implied": over probability with the vig (replaces the always-0 placeholder),
+      "fair": consensus no-vig over probability at that line,
+      "ev": [over, under] expected profit per unit at this book,
+      "best": [best over odds, book, best under odds, book] at that line.
+    Returns the number of quotes priced.
+    """
+    quotes, pids, props, lines, over, under, books = [], [], [], [], [], [], []
+    for pid, player in master_data.items():
+        for prop, prop_books in player['props'].items():
+            for book, quote in prop_books.items():
+                quotes.append(quote)
+                pids.append(pid)
+                props.append(prop)
+                lines.append(quote.get('line'))
+                over.append(quote.get('over'))
+                under.append(quote.get('under'))
+                books.append(book)
+    if not quotes:
+        return 0
+
+    priced = price_slate(pids, props, lines, over, under, books)
+
+    def rounded(values, digits):
+        out = np.round(values, digits).astype(object)
+        out[np.isnan(values)] = None
+        return out.tolist()
+
+    implied = rounded(priced['implied'], 4)
+    fair = rounded(priced['fair_over'], 4)
+    ev_over, ev_under = rounded(priced['ev_over'], 4), rounded(priced['ev_under'], 4)
+    best_over, best_under = rounded(priced['best_over'], 0), rounded(priced['best_under'], 0)
+    for i, quote in enumerate(quotes):
+        quote['implied'] = implied[i] if implied[i] is not None else 0
+        quote['fair'] = fair[i]
+        quote['ev'] = [ev_over[i], ev_under[i]]
+        quote['best'] = [
+            None if best_over[i] is None else int(best_over[i]), priced['best_over_book'][i],
+            None if best_under[i] is None else int(best_under[i]), priced['best_under_book'][i],
+        ]
+    return len(quotes)
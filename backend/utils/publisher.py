@@ -0,0 +1,150 @@
+import os
+import shutil
+import time
+from datetime import datetime
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+VERSIONS_DIR = "versions"
+CURRENT_LINK = "current"
+STAGING_PREFIX = ".staging-"
+DEFAULT_KEEP = 5
+STALE_STAGING_SECONDS = 6 * 3600  # Staging dirs older than this belong to crashed runs (a daemon full run overlaps many ticks)
+
+class ArtifactPublisher:
+    """
+    Double-buffered publishing of pipeline artifacts.
+
+    data/
+      versions/20260119-183000-123456/   immutable, fully written generations
+      versions/.staging-<gen>/           the run in progress
+      current -> versions/<gen>          symlink, flipped with one os.replace
+
+    Stages write into the staging directory; commit() renames it into place
+    and repoints `current`, so readers following data/current always see one
+    complete generation without locks. The last `keep` generations are kept.
+    """
+    def __init__(self, data_root, keep=DEFAULT_KEEP):
+        self.data_root = data_root
+        self.keep = keep
+        self.versions_dir = os.path.join(data_root, VERSIONS_DIR)
+        self.current_link = os.path.join(data_root, CURRENT_LINK)
+        self.staging_dir = None
+        self.generation = None
+        os.makedirs(self.versions_dir, exist_ok=True)
+        self._migrate_legacy_current()
+
+    # --- Setup ---
+    def _migrate_legacy_current(self):
+        """Turns an old in-place data/current directory into the first generation."""
+        if os.path.isdir(self.current_link) and not os.path.islink(self.current_link):
+            generation = self._new_generation_name()
+            os.rename(self.current_link, os.path.join(self.versions_dir, generation))
+            self._point_current_at(generation)
+            print(f"   📦 Migrated data/current into {VERSIONS_DIR}/{generation}")
+
+    @staticmethod
+    def _new_generation_name():
+        return datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+    @property
+    def current_dir(self):
+        """Resolved directory of the live generation (None before the first publish)."""
+        return os.path.realpath(self.current_link) if os.path.exists(self.current_link) else None
+
+    # --- Run lifecycle ---
+    def begin(self):
+        """Creates an empty staging directory for this run and returns its path."""
+        self.generation = self._new_generation_name()
+        self.staging_dir = os.path.join(self.versions_dir, STAGING_PREFIX + self.generation)
+        os.makedirs(self.staging_dir)
+        return self.staging_dir
+
+    def path(self, name):
+        return os.path.join(self.staging_dir, name)
+
+    def carry_over(self, groups=()):
+        """
+        Hard-links every artifact this run did not produce from the live generation
+        (e.g. a scraper failed), so the new generation is complete. Writers must
+        replace files (temp + os.replace), never rewrite them in place.
+
+        groups: tuples of artifact names that must come from one generation (e.g.
+        master_feed.json and master_feed.bin). If this run produced only part of a
+        group, that part and its companions ("<name>.gz") are discarded and the
+        whole group is carried over instead of mixing two generations.
+        """
+        current = self.current_dir
+        if not current:
+            return []
+        for group in groups:
+            self._discard_partial(group, current)
+        carried = []
+        for name in os.listdir(current):
+            src = os.path.join(current, name)
+            dst = self.path(name)
+            if os.path.isfile(src) and not os.path.exists(dst):
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)  # Cross-device or no hard-link support
+                carried.append(name)
+        return carried
+
+    def _produced(self, name, current):
+        """True if this run wrote `name` (rather than it being linked from the live generation)."""
+        dst, src = self.path(name), os.path.join(current, name)
+        if not os.path.isfile(dst):
+            return False
+        return not (os.path.isfile(src) and os.path.samefile(src, dst))
+
+    def _discard_partial(self, group, current):
+        produced = [name for name in group if self._produced(name, current)]
+        if not produced or len(produced) == len(group):
+            return
+        if not all(os.path.isfile(os.path.join(current, name)) for name in group):
+            return  # No complete set to fall back to (e.g. the first run): keep what we have
+        for name in os.listdir(self.staging_dir):
+            if any(name == p or name.startswith(p + ".") for p in produced):
+                os.remove(self.path(name))
+        missing = sorted(set(group) - set(produced))
+        print(f"   ⚠️ {', '.join(missing)} not produced, reusing the previous {', '.join(group)}")
+
+    def commit(self):
+        """Publishes the staging directory as the new current generation."""
+        final_dir = os.path.join(self.versions_dir, self.generation)
+        os.rename(self.staging_dir, final_dir)
+        self._point_current_at(self.generation)
+        self.staging_dir = None
+        self._prune()
+        return final_dir
+
+    def abort(self):
+        if self.staging_dir and os.path.isdir(self.staging_dir):
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        self.staging_dir = None
+
+    # --- Internals ---
+    def _point_current_at(self, generation):
+        target = os.path.join(VERSIONS_DIR, generation)  # Relative: survives moving data/
+        tmp_link = self.current_link + ".tmp"
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(target, tmp_link)
+        os.replace(tmp_link, self.current_link)
+
+    def _prune(self):
+        live = os.path.basename(self.current_dir or "")
+        generations = sorted(
+            d for d in os.listdir(self.versions_dir)
+            if not d.startswith(STAGING_PREFIX) and os.path.isdir(os.path.join(self.versions_dir, d))
+        )
+        for generation in generations[:-self.keep] if self.keep > 0 else []:
+            if generation != live:
+                shutil.rmtree(os.path.join(self.versions_dir, generation), ignore_errors=True)
+        # Staging dirs left by crashed runs (recent ones may be another live run)
+        for d in os.listdir(self.versions_dir):
+            path = os.path.join(self.versions_dir, d)
+            if d.startswith(STAGING_PREFIX) and time.time() - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,286 @@
+import os
+import json
+import glob
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.gamelog_store import GameLogStore, MANIFEST_FILE
+from utils.fetch_manifest import FetchManifest
+from utils.season_averages import settled_through, settled_marks, rebuild_reason, store_coverage
+from utils.hit_rates import COMBO_STATS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+ROLLING_STATS = ['MIN', 'PTS', 'REB', 'AST', 'FG3M', 'FGA', 'STL', 'BLK', 'TOV',
+                 'POTENTIAL_AST', 'REB_CHANCES', 'DRIVES'] + list(COMBO_STATS)
+ROLLING_WINDOWS = [5, 10, 20]   # Served from the ring buffer; its size is the largest window
+EWMA_SPANS = [5, 20]            # alpha = 2 / (span + 1)
+TREND_GAMES = 10                # Least-squares slope (per game) over the last N games
+# Order of the numbers per stat in player['rolling'] (see frontend/types.ts)
+ROLLING_FIELDS = ['L5', 'L10', 'L20', 'mean', 'std', 'ewma5', 'ewma20', 'trend', 'games']
+STATE_FILE = "state.json"
+
+# ==========================================
+# 1. PER-PLAYER STATE
+# ==========================================
+class RollingState:
+    """
+    Running per-player state over the games ingested so far, one row per player
+    and one column per ROLLING_STATS entry:
+
+      count / total / total_sq  games with the stat, sum, sum of squares (mean + variance)
+      ewma[span]                exponentially weighted mean (missing games leave it unchanged)
+      ring[player, stat, slot]  the last max(ROLLING_WINDOWS) values, written at games % size
+      games                     games ingested per player (the ring's write position)
+      first_date / last_date    the date range ingested
+      fetched_at                latest manifest fetch up to last_date when saved (see rebuild_reason)
+
+    mean, std and games cover first_date onwards only, which is the season so
+    far only once the game-log store has been backfilled (see store_coverage).
+
+    Games must be ingested in date order; each game costs O(stats), so a new
+    date costs O(games that date) and old logs are never read or sorted again.
+    """
+    def __init__(self, stats=ROLLING_STATS):
+        self.stats = list(stats)
+        self.ring_size = max(ROLLING_WINDOWS)
+        self.first_date = None
+        self.last_date = None
+        self.fetched_at = 0
+        self.player_ids = np.empty(0, dtype=np.int64)
+        self.row_of = {}
+        self.games = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros((0, len(self.stats)))
+        self.total = np.zeros((0, len(self.stats)))
+        self.total_sq = np.zeros((0, len(self.stats)))
+        self.ewma = {span: np.full((0, len(self.stats)), np.nan) for span in EWMA_SPANS}
+        self.ring = np.full((0, len(self.stats), self.ring_size), np.nan)
+
+    # ---- growth ----
+    def _rows(self, player_ids):
+        """Row numbers for player_ids, appending rows for players seen for the first time."""
+        new = [pid for pid in dict.fromkeys(player_ids.tolist()) if pid not in self.row_of]
+        if new:
+            n, s = len(new), len(self.stats)
+            for pid in new:
+                self.row_of[pid] = len(self.row_of)
+            self.player_ids = np.append(self.player_ids, np.array(new, dtype=np.int64))
+            self.games = np.append(self.games, np.zeros(n, dtype=np.int64))
+            self.count = np.vstack([self.count, np.zeros((n, s))])
+            self.total = np.vstack([self.total, np.zeros((n, s))])
+            self.total_sq = np.vstack([self.total_sq, np.zeros((n, s))])
+            for span in EWMA_SPANS:
+                self.ewma[span] = np.vstack([self.ewma[span], np.full((n, s), np.nan)])
+            self.ring = np.concatenate([self.ring, np.full((n, s, self.ring_size), np.nan)])
+        return np.array([self.row_of[pid] for pid in player_ids.tolist()], dtype=np.int64)
+
+    def _values(self, df):
+        values = np.full((len(df), len(self.stats)), np.nan)
+        for j, stat in enumerate(self.stats):
+            if stat in df.columns:
+                values[:, j] = pd.to_numeric(df[stat], errors='coerce').to_numpy(dtype=np.float64)
+            elif stat in COMBO_STATS and all(c in df.columns for c in COMBO_STATS[stat]):
+                values[:, j] = df[COMBO_STATS[stat]].apply(pd.to_numeric, errors='coerce').sum(
+                    axis=1, min_count=len(COMBO_STATS[stat])).to_numpy(dtype=np.float64)
+        return values
+
+    # ---- ingest ----
+    def ingest(self, df_games):
+        """
+        Folds new game rows (PLAYER_ID, GAME_DATE, stats) into the state.
+        Rows are applied in date order, a player's k-th new game in the k-th
+        vectorized round, so a batch of one date is a single round.
+        """
+        if df_games is None or df_games.empty:
+            return 0
+        df = df_games.sort_values('GAME_DATE', kind='stable')
+        rows = self._rows(df['PLAYER_ID'].to_numpy(dtype=np.int64))
+        values = self._values(df)
+        rounds = df.groupby('PLAYER_ID', sort=False).cumcount().to_numpy()
+
+        for r in range(int(rounds.max()) + 1):
+            pick = rounds == r
+            self._apply(rows[pick], values[pick])
+        self.first_date = min(self.first_date or '9999', str(df['GAME_DATE'].iloc[0])[:10])
+        self.last_date = max(self.last_date or '', str(df['GAME_DATE'].iloc[-1])[:10])
+        return len(df)
+
+    def _apply(self, rows, values):
+        """One game for each of `rows` (unique players)."""
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        self.count[rows] += present
+        self.total[rows] += filled
+        self.total_sq[rows] += filled * filled
+        for span in EWMA_SPANS:
+            alpha = 2.0 / (span + 1)
+            prev = self.ewma[span][rows]
+            updated = np.where(np.isnan(prev), values, alpha * values + (1 - alpha) * prev)
+            self.ewma[span][rows] = np.where(present, updated, prev)
+        self.ring[rows, :, self.games[rows] % self.ring_size] = values
+        self.games[rows] += 1
+
+    def copy(self):
+        other = RollingState(self.stats)
+        other.first_date, other.last_date, other.fetched_at = self.first_date, self.last_date, self.fetched_at
+        other.player_ids = self.player_ids.copy()
+        other.row_of = dict(self.row_of)
+        other.games = self.games.copy()
+        other.count, other.total, other.total_sq = self.count.copy(), self.total.copy(), self.total_sq.copy()
+        other.ewma = {span: v.copy() for span, v in self.ewma.items()}
+        other.ring = self.ring.copy()
+        return other
+
+    # ---- features ----
+    def recent(self, n):
+        """[players, stats, n] of the last n games, newest first (NaN where a player has fewer)."""
+        n = min(n, self.ring_size)
+        offsets = np.arange(1, n + 1)
+        slots = (self.games[:, None] - offsets[None, :]) % self.ring_size
+        out = np.take_along_axis(self.ring, slots[:, None, :].repeat(len(self.stats), axis=1), axis=2)
+        return np.where((offsets[None, :] > self.games[:, None])[:, None, :], np.nan, out)
+
+    def features(self):
+        """{field: [players, stats]} for every ROLLING_FIELDS entry."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # Players without a stat stay NaN
+            out = {f"L{n}": np.nanmean(self.recent(n), axis=2) for n in ROLLING_WINDOWS}
+            count = np.where(self.count > 0, self.count, np.nan)
+            mean = self.total / count
+            variance = np.maximum(self.total_sq / count - mean * mean, 0)
+            out['mean'] = mean
+            out['std'] = np.sqrt(variance * count / np.where(count > 1, count - 1, np.nan))  # Sample std
+            for span in EWMA_SPANS:
+                out[f'ewma{span}'] = self.ewma[span]
+            out['trend'] = _slope(self.recent(TREND_GAMES))
+            out['games'] = self.count
+        return out
+
+    # ---- persistence ----
+    def save(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        name = f"rolling-{self.last_date}.npz"
+        arrays = {'player_ids': self.player_ids, 'games': self.games, 'count': self.count,
+                  'total': self.total, 'total_sq': self.total_sq, 'ring': self.ring}
+        arrays.update({f'ewma_{span}': v for span, v in self.ewma.items()})
+        with open(os.path.join(state_dir, name + ".tmp"), "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(os.path.join(state_dir, name + ".tmp"), os.path.join(state_dir, name))
+        with open(os.path.join(state_dir, STATE_FILE + ".tmp"), "w") as f:
+            json.dump({"settled_through": self.last_date, "first_date": self.first_date,
+                       "fetched_at": self.fetched_at, "file": name, "stats": self.stats,
+                       "ring_size": self.ring_size, "ewma_spans": EWMA_SPANS}, f)
+        os.replace(os.path.join(state_dir, STATE_FILE + ".tmp"), os.path.join(state_dir, STATE_FILE))
+        for old in glob.glob(os.path.join(state_dir, "rolling-*.npz")):
+            if os.path.basename(old) != name:
+                os.remove(old)
+
+    @classmethod
+    def load(cls, state_dir):
+        """The saved state, or None if there is none or it was built with another configuration."""
+        try:
+            with open(os.path.join(state_dir, STATE_FILE)) as f:
+                meta = json.load(f)
+            if (meta['stats'], meta['ring_size'], meta['ewma_spans']) != (ROLLING_STATS, max(ROLLING_WINDOWS), EWMA_SPANS):
+                return None
+            with np.load(os.path.join(state_dir, meta['file'])) as data:
+                state = cls(meta['stats'])
+                state.first_date, state.last_date = meta['first_date'], meta['settled_through']
+                state.fetched_at = meta.get('fetched_at')  # None: saved before it was tracked
+                state.player_ids = data['player_ids']
+                state.row_of = {int(pid): i for i, pid in enumerate(state.player_ids)}
+                state.games, state.count = data['games'], data['count']
+                state.total, state.total_sq, state.ring = data['total'], data['total_sq'], data['ring']
+                state.ewma = {span: data[f'ewma_{span}'] for span in EWMA_SPANS}
+            return state
+        except (OSError, ValueError, KeyError):
+            return None
+
+def _slope(recent):
+    """Least-squares slope per game of [players, stats, n] (newest first), skipping NaN games."""
+    x = -np.arange(recent.shape[2], dtype=np.float64)  # Newest game at x = 0
+    valid = ~np.isnan(recent)
+    n = valid.sum(axis=2)
+    y = np.where(valid, recent, 0.0)
+    xs = np.where(valid, x, 0.0)
+    sx, sy = xs.sum(axis=2), y.sum(axis=2)
+    sxx, sxy = (xs * xs).sum(axis=2), (xs * y).sum(axis=2)
+    denom = n * sxx - sx * sx
+    return np.where((n >= 3) & (denom > 0), (n * sxy - sx * sy) / np.where(denom > 0, denom, 1), np.nan)
+
+# ==========================================
+# 2. STORE-BACKED BUILD
+# ==========================================
+def build_rolling_state(logs_path, state_dir=None):
+    """
+    RollingState over every stored game. With a game-log store and state_dir,
+    settled dates are ingested into the persisted state once (same settling
+    rule as the season totals) and the unsettled tail is applied to a copy.
+    The persisted state is rebuilt by the same rule as the season totals
+    (season_averages.rebuild_reason: reopened, backfilled or refetched dates).
+    Returns (state, game-log rows read).
+    """
+    columns = ['PLAYER_ID', 'GAME_DATE'] + ROLLING_STATS
+    if not os.path.isdir(logs_path):
+        df_logs = pd.read_csv(logs_path)
+        state = RollingState()
+        return state, state.ingest(df_logs[[c for c in columns if c in df_logs.columns]])
+
+    store = GameLogStore(logs_path)
+    dates = store.dates()
+    state = (RollingState.load(state_dir) if state_dir else None) or RollingState()
+    manifest = FetchManifest(os.path.join(logs_path, MANIFEST_FILE))
+    settled = settled_through(manifest, dates) if state_dir else None
+
+    marks = {"settled_through": state.last_date, "first_date": state.first_date, "fetched_at": state.fetched_at}
+    reason = rebuild_reason(manifest, dates, marks, settled) if state_dir else None
+    if reason:
+        print(f"   🔄 Rebuilding rolling state: {reason}")
+        state = RollingState()
+
+    n_read = 0
+    if settled and settled != state.last_date:
+        date_from = _after(state.last_date, dates)
+        if date_from and date_from <= settled:
+            n_read += state.ingest(store.read(columns=columns, date_from=date_from, date_to=settled))
+        state.last_date = settled
+        state.fetched_at = settled_marks(manifest, dates, settled)["fetched_at"]
+        state.save(state_dir)
+
+    tail_from = _after(state.last_date, dates) if state.last_date else None
+    if tail_from or not state.last_date:
+        state = state.copy()
+        n_read += state.ingest(store.read(columns=columns, date_from=tail_from))
+    return state, n_read
+
+def rolling_coverage(logs_path, state):
+    """
+    {"from": first game date the features cover, "complete": True once that is the
+    whole season}: the feed header tells the frontend how far back mean/std/games reach.
+    """
+    complete = os.path.isdir(logs_path) and store_coverage(logs_path)[1]
+    return {"from": state.first_date, "complete": bool(complete)}
+
+def _after(date, dates):
+    """First stored date after `date` (None = nothing after it)."""
+    later = [d for d in dates if date is None or d > date]
+    return later[0] if later else None
+
+def compact_rolling(state, player_ids):
+    """{pid: {stat: [value per ROLLING_FIELDS]}} for the given players (one decimal, None for NaN)."""
+    features = state.features()
+    rows = [(pid, state.row_of[pid]) for pid in player_ids if pid in state.row_of]
+    if not rows:
+        return {}
+    index = np.array([r for _, r in rows])
+    stacked = np.stack([features[f][index] for f in ROLLING_FIELDS], axis=2)  # [players, stats, fields]
+    values = np.round(stacked, 2).astype(object)
+    values[np.isnan(stacked)] = None
+    values = values.tolist()
+    return {
+        pid: {stat: values[i][j] for j, stat in enumerate(state.stats) if values[i][j][-1]}
+        for i, (pid, _) in enumerate(rows)
+    }
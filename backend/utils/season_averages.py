@@ -0,0 +1,314 @@
+import os
+import json
+import glob
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.gamelog_store import GameLogStore, MANIFEST_FILE
+from utils.fetch_manifest import FetchManifest
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# season_stats.csv column order (matches NBAStatsEngine.get_player_data)
+STATS_COLUMNS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'AGE', 'GP', 'MIN', 'TEAM_ID',
+    'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG3M',
+    'OREB', 'DREB', 'DD2', 'TD3',
+    'FGM', 'FGA', 'FG3A', 'FTM', 'FTA',
+    'PF', 'PFD', 'PLUS_MINUS',
+    'FG_PCT', 'FG3_PCT', 'FT_PCT',
+    'POTENTIAL_AST', 'PASSES_MADE', 'DRIVES', 'DRIVE_PTS', 'REB_CHANCES', 'REB_CONTEST_PCT',
+    'AST_CONVERSION_PCT', 'REB_HUSTLE_PCT', 'AGGRESSION_SCORE'
+]
+
+# Box-score columns summed over every game (per-game average = sum / GP)
+SUM_COLUMNS = ['MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG3M', 'OREB', 'DREB',
+               'FGM', 'FGA', 'FG3A', 'FTM', 'FTA', 'PF', 'PLUS_MINUS']
+# Tracking columns can be missing (NaN) for a game; averaged over the games that have them
+TRACKING_COLUMNS = ['POTENTIAL_AST', 'PASSES_MADE', 'DRIVES', 'DRIVE_PTS', 'REB_CHANCES']
+# Not derivable from game logs; taken from the last remote reconciliation when available
+REFERENCE_COLUMNS = ['AGE', 'PFD']
+DOUBLE_STATS = ['PTS', 'REB', 'AST', 'STL', 'BLK']
+
+IDENTITY_COLUMNS = ['PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION', 'LAST_GAME_DATE']
+STATE_FILE = "state.json"
+SETTLE_AFTER_DAYS = 7  # Dates with no manifest entry (migrated history) are settled after this
+SEASON_START = '2025-10-21'  # Opening night of the season gamelogs.py fetches (Season='2025-26')
+VERDICT_FILE = "reconcile.json"  # Outcome of the last reconciliation against stats.nba.com
+
+# ==========================================
+# 1. RUNNING TOTALS
+# ==========================================
+def game_totals(df_games):
+    """Per-player partial totals (indexed by PLAYER_ID) for a set of game rows."""
+    if df_games.empty:
+        return pd.DataFrame()
+    df = df_games.copy()
+    for col in SUM_COLUMNS + TRACKING_COLUMNS + ['REB_CONTEST_PCT']:
+        if col not in df.columns:
+            df[col] = np.nan
+
+    tens = (df[DOUBLE_STATS] >= 10).sum(axis=1)
+    df['GP'] = 1
+    df['DD2'] = (tens >= 2).astype(int)
+    df['TD3'] = (tens >= 3).astype(int)
+    # Contested-rebound share is weighted by rebounds
+    df['REB_CONTEST_W'] = df['REB_CONTEST_PCT'] * df['REB']
+    df['REB_CONTEST_N'] = df['REB'].where(df['REB_CONTEST_PCT'].notna(), 0)
+    for col in TRACKING_COLUMNS:
+        df[f'N_{col}'] = df[col].notna().astype(int)
+    df['LAST_GAME_DATE'] = pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d')
+
+    sums = SUM_COLUMNS + TRACKING_COLUMNS + ['GP', 'DD2', 'TD3', 'REB_CONTEST_W', 'REB_CONTEST_N'] + \
+        [f'N_{col}' for col in TRACKING_COLUMNS]
+    grouped = df.sort_values('LAST_GAME_DATE').groupby('PLAYER_ID')
+    totals = grouped[sums].sum(min_count=0)
+    return totals.join(grouped[IDENTITY_COLUMNS].last())  # Latest team wins after a trade
+
+def combine_totals(a, b):
+    """a + b, keeping each player's identity from their most recent game."""
+    if a.empty:
+        return b
+    if b.empty:
+        return a
+    both = pd.concat([a, b])
+    numeric = both.drop(columns=IDENTITY_COLUMNS).groupby(level=0).sum(min_count=0)
+    identity = both[IDENTITY_COLUMNS].sort_values('LAST_GAME_DATE').groupby(level=0).last()
+    return numeric.join(identity)
+
+def averages(totals, reference=None):
+    """Running totals -> season_stats.csv rows (per-game averages and derived metrics)."""
+    if totals.empty:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    gp = totals['GP']
+    out = pd.DataFrame(index=totals.index)
+    out['PLAYER_NAME'] = totals['PLAYER_NAME']
+    out['TEAM_ABBREVIATION'] = totals['TEAM_ABBREVIATION']
+    out['TEAM_ID'] = totals['TEAM_ID']
+    out['GP'] = gp
+
+    for col in SUM_COLUMNS:
+        out[col] = (totals[col] / gp).round(1)
+    out['DD2'] = totals['DD2']
+    out['TD3'] = totals['TD3']
+    for pct, num, den in (('FG_PCT', 'FGM', 'FGA'), ('FG3_PCT', 'FG3M', 'FG3A'), ('FT_PCT', 'FTM', 'FTA')):
+        out[pct] = (totals[num] / totals[den].where(totals[den] > 0)).round(3).fillna(0)
+    for col in TRACKING_COLUMNS:
+        out[col] = (totals[col] / totals[f'N_{col}'].where(totals[f'N_{col}'] > 0)).round(1)
+    out['REB_CONTEST_PCT'] = (totals['REB_CONTEST_W'] / totals['REB_CONTEST_N'].where(totals['REB_CONTEST_N'] > 0)).round(3)
+
+    if reference is not None and not reference.empty:
+        ref = reference.drop_duplicates('PLAYER_ID').set_index('PLAYER_ID')
+        for col in REFERENCE_COLUMNS:
+            out[col] = ref[col].reindex(out.index) if col in ref.columns else np.nan
+    else:
+        for col in REFERENCE_COLUMNS:
+            out[col] = np.nan
+
+    # Edge metrics (same definitions as NBAStatsEngine)
+    out = out.fillna(0)
+    out['AST_CONVERSION_PCT'] = (out['AST'] / out['POTENTIAL_AST'].where(out['POTENTIAL_AST'] > 0)).round(3).fillna(0)
+    out['REB_HUSTLE_PCT'] = (out['REB'] / out['REB_CHANCES'].where(out['REB_CHANCES'] > 0)).round(3).fillna(0)
+    out['AGGRESSION_SCORE'] = out['FGA'] + out['FTA'] + out['DRIVES']
+
+    out = out.reset_index().rename(columns={'index': 'PLAYER_ID'})
+    return out[STATS_COLUMNS].sort_values('PLAYER_ID').reset_index(drop=True)
+
+# ==========================================
+# 2. INCREMENTAL STATE
+# ==========================================
+def settled_through(manifest, dates):
+    """Last date D such that every stored date (ascending) up to D is settled."""
+    cutoff = (datetime.now() - timedelta(days=SETTLE_AFTER_DAYS)).strftime('%Y-%m-%d')
+    settled = None
+    for date in dates:
+        if manifest.is_final(date) or (date not in manifest.entries and date <= cutoff):
+            settled = date
+        else:
+            break
+    return settled
+
+def settled_marks(manifest, dates, through):
+    """
+    What a state folded through `through` was built from (saved with it):
+    the store's first date and the latest fetch of any date up to `through`.
+    """
+    fetched = [cell.get("fetched_at") or 0 for key, entry in manifest.entries.items() if key <= through
+               for cell in entry.get("cells", {}).values()]
+    return {"settled_through": through, "first_date": dates[0] if dates else None,
+            "fetched_at": max(fetched, default=0)}
+
+def rebuild_reason(manifest, dates, marks, new_settled):
+    """
+    Why a persisted state saved with `marks` (see settled_marks) no longer matches
+    the store, or None. Settled dates are folded in once, so any of these means
+    the state must be rebuilt from the first stored date:
+
+      reopened    a date it folded in is no longer settled
+      backfilled  the backfill (gamelogs.py) stored dates before its first date
+      refetched   a date up to its settled_through was fetched after it was saved
+                  (a migrated date refetched with full box scores, a later backfill date)
+    """
+    through = marks.get("settled_through")
+    if not through:
+        return None
+    if new_settled is None or through > new_settled:
+        return "a settled date was reopened"
+    if marks.get("first_date") is None or marks.get("fetched_at") is None:
+        return "saved without coverage marks"
+    if dates and dates[0] < marks["first_date"]:
+        return f"dates before {marks['first_date']} were backfilled"
+    if settled_marks(manifest, dates, through)["fetched_at"] > marks["fetched_at"]:
+        return f"dates through {through} were refetched"
+    return None
+
+class SeasonTotals:
+    """
+    Season totals kept next to the game-log store.
+
+    Dates that can no longer change (final in the fetch manifest) are folded
+    into a persisted running total exactly once; the few unsettled recent
+    dates are re-read on every build. Each run therefore reads only newly
+    settled dates plus the unsettled tail, never the whole season.
+    """
+    def __init__(self, logs_store_dir, state_dir):
+        self.store = GameLogStore(logs_store_dir)
+        self.manifest = FetchManifest(os.path.join(logs_store_dir, MANIFEST_FILE))
+        self.state_dir = state_dir
+
+    def _settled_through(self, dates):
+        return settled_through(self.manifest, dates)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.state_dir, STATE_FILE)) as f:
+                state = json.load(f)
+            totals = pd.read_parquet(os.path.join(self.state_dir, state['file']))
+            return state, totals
+        except (OSError, ValueError, KeyError):
+            return {}, pd.DataFrame()
+
+    def _save(self, marks, totals):
+        os.makedirs(self.state_dir, exist_ok=True)
+        name = f"settled-{marks['settled_through']}.parquet"
+        totals.to_parquet(os.path.join(self.state_dir, name + ".tmp"))
+        os.replace(os.path.join(self.state_dir, name + ".tmp"), os.path.join(self.state_dir, name))
+        with open(os.path.join(self.state_dir, STATE_FILE + ".tmp"), "w") as f:
+            json.dump(dict(marks, file=name), f)
+        os.replace(os.path.join(self.state_dir, STATE_FILE + ".tmp"), os.path.join(self.state_dir, STATE_FILE))
+        for old in glob.glob(os.path.join(self.state_dir, "settled-*.parquet")):
+            if os.path.basename(old) != name:
+                os.remove(old)
+
+    def _read(self, date_from=None, date_to=None):
+        # Only the columns the totals need
+        columns = ['PLAYER_ID', 'GAME_DATE'] + IDENTITY_COLUMNS[:-1] + SUM_COLUMNS + TRACKING_COLUMNS + ['REB_CONTEST_PCT']
+        return self.store.read(columns=columns, date_from=date_from, date_to=date_to)
+
+    def build(self):
+        """Current season totals; persists any newly settled dates first."""
+        dates = self.store.dates()
+        if not dates:
+            return pd.DataFrame(), 0
+        marks, settled = self._load()
+        settled_through = marks.get('settled_through')
+        new_settled = self._settled_through(dates)
+
+        reason = rebuild_reason(self.manifest, dates, marks, new_settled)
+        if reason:
+            print(f"   🔄 Rebuilding season totals: {reason}")
+            settled_through, settled = None, pd.DataFrame()
+
+        n_read = 0
+        if new_settled and new_settled != settled_through:
+            date_from = (datetime.strptime(settled_through, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') \
+                if settled_through else None
+            df_new = self._read(date_from, new_settled)
+            n_read += len(df_new)
+            settled = combine_totals(settled, game_totals(df_new))
+            settled_through = new_settled
+            self._save(settled_marks(self.manifest, dates, settled_through), settled)
+
+        tail_from = (datetime.strptime(settled_through, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') \
+            if settled_through else None
+        df_tail = self._read(tail_from)
+        n_read += len(df_tail)
+        return combine_totals(settled, game_totals(df_tail)), n_read
+
+def build_season_stats(logs_store_dir, state_dir, reference=None):
+    """season_stats.csv rows derived from the local game-log store."""
+    totals, n_read = SeasonTotals(logs_store_dir, state_dir).build()
+    print(f"   🧮 Season averages from game logs: {len(totals)} players ({n_read} game rows read)")
+    return averages(totals, reference)
+
+# ==========================================
+# 3. RECONCILIATION
+# ==========================================
+def reconcile(local, remote, columns=('GP', 'PTS', 'REB', 'AST'), tolerance=0.15):
+    """
+    Compares locally derived averages with the remote endpoint.
+    Returns the rows (PLAYER_ID, PLAYER_NAME, column, local, remote) that differ
+    by more than `tolerance`, plus players only one side has.
+    """
+    merged = local.merge(remote, on='PLAYER_ID', how='outer', suffixes=('_local', '_remote'), indicator=True)
+    issues = []
+    for _, row in merged.iterrows():
+        name = row.get('PLAYER_NAME_local') if pd.notna(row.get('PLAYER_NAME_local')) else row.get('PLAYER_NAME_remote')
+        if row['_merge'] != 'both':
+            issues.append((row['PLAYER_ID'], name, 'missing', row['_merge'] == 'left_only', row['_merge'] == 'right_only'))
+            continue
+        for col in columns:
+            a, b = row.get(f'{col}_local'), row.get(f'{col}_remote')
+            if pd.notna(a) and pd.notna(b) and abs(float(a) - float(b)) > tolerance:
+                issues.append((row['PLAYER_ID'], name, col, a, b))
+    return pd.DataFrame(issues, columns=['PLAYER_ID', 'PLAYER_NAME', 'column', 'local', 'remote'])
+
+def save_verdict(state_dir, issues):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, VERDICT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"issues": len(issues), "at": datetime.now().isoformat(timespec='seconds')}, f)
+    os.replace(path + ".tmp", path)
+
+def load_verdict(state_dir):
+    try:
+        with open(os.path.join(state_dir, VERDICT_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# ==========================================
+# 4. COVERAGE
+# ==========================================
+def store_coverage(logs_store_dir):
+    """
+    (first stored date, complete). The store is complete once it reaches back to
+    SEASON_START and every stored date was fetched by gamelogs.py: dates only
+    migrated from the old gamelogs.csv (capped at 35 games per player) have no
+    manifest entry until the backfill refetches them.
+    """
+    dates = GameLogStore(logs_store_dir).dates()
+    if not dates:
+        return None, False
+    manifest = FetchManifest(os.path.join(logs_store_dir, MANIFEST_FILE))
+    return dates[0], dates[0] <= SEASON_START and all(d in manifest.entries for d in dates)
+
+def local_stats_trusted(logs_store_dir, state_dir):
+    """
+    (ok, reason): local season stats may replace stats.nba.com only while the
+    store covers the whole season and the last reconciliation found no differences.
+    """
+    first_date, complete = store_coverage(logs_store_dir)
+    if first_date is None:
+        return False, "no game logs stored"
+    if not complete:
+        return False, f"game logs cover {first_date} onwards, backfill to {SEASON_START} incomplete"
+    verdict = load_verdict(state_dir)
+    if verdict is None:
+        return False, "not reconciled yet"
+    if verdict["issues"]:
+        return False, f"{verdict['issues']} differences at the last reconciliation ({verdict['at']})"
+    return True, None
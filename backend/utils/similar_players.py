@@ -0,0 +1,265 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.hit_rates import COMBO_STATS
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+# The DISPLAY_STATS that describe a player's role (identity, games played,
+# percentages and combos are left out: they are noise or linear repeats)
+FEATURE_STATS = [
+    'MIN', 'PTS', 'FGA', 'FG3A', 'FTA', 'REB', 'OREB', 'DREB', 'AST', 'TOV',
+    'STL', 'BLK', 'PF', 'POTENTIAL_AST', 'DRIVES', 'REB_CHANCES'
+]
+SHOOTING_ZONES = ['restricted_area', 'paint', 'mid_range', 'left_corner', 'right_corner', 'top_key']
+ASSIST_ZONES = ['restricted_area', 'mid_range', 'left_corner', 'right_corner', 'top_key']
+
+K_NEIGHBORS = 8
+MAX_SIMILAR_GAMES = 20   # Newest neighbour games vs tonight's opponent kept per player
+BLOCK_ROWS = 1024        # Distance rows computed at once (bounds memory at BLOCK_ROWS x N floats)
+
+# Stats shipped per similar game (every prop the dashboard can show)
+GAME_STATS = ['PTS', 'REB', 'AST', 'FG3M', 'STL', 'BLK', 'TOV'] + list(COMBO_STATS)
+# Column order of player['similar']['games'] (see SimilarPlayers.tsx)
+SIMILAR_GAME_COLUMNS = ['GAME_DATE', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM'] + GAME_STATS
+# Game-log columns the join reads
+LOG_COLUMNS = ['PLAYER_ID', 'GAME_DATE', 'MATCHUP'] + GAME_STATS
+
+# ==========================================
+# 1. FEATURES
+# ==========================================
+def _zone_shares(zones, keys):
+    """{"zone": {"percentage": "20%"}} -> [0.2, ...]; NaN when the player has no zones."""
+    if not zones:
+        return [np.nan] * len(keys)
+    shares = []
+    for key in keys:
+        try:
+            shares.append(float(str(zones[key]["percentage"]).rstrip('%')) / 100)
+        except (KeyError, TypeError, ValueError):
+            shares.append(np.nan)
+    return shares
+
+def feature_matrix(players):
+    """
+    players: master_data entries. Returns [N, F] standardized features
+    (z-scores per column; missing values sit at the column mean, constant
+    columns are zeroed so they do not count towards any distance).
+    """
+    rows = []
+    for p in players:
+        stats = p.get('stats') or {}
+        rows.append(
+            [stats.get(k, np.nan) for k in FEATURE_STATS]
+            + _zone_shares(p.get('shooting_zones'), SHOOTING_ZONES)
+            + _zone_shares(p.get('assist_zones'), ASSIST_ZONES)
+        )
+    return standardize(np.array(rows, dtype=np.float64).reshape(len(rows), -1))
+
+def standardize(X):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN columns
+        mean = np.nanmean(X, axis=0)
+        std = np.nanstd(X, axis=0)
+    std[~(std > 0)] = np.inf  # Constant / empty columns -> 0
+    Z = (X - np.nan_to_num(mean)) / std
+    Z[np.isnan(Z)] = 0.0
+    return Z
+
+# ==========================================
+# 2. NEAREST NEIGHBOURS
+# ==========================================
+def nearest_neighbors(X, k, block_rows=BLOCK_ROWS):
+    """
+    Exact k nearest rows of X for every row (itself excluded), Euclidean.
+    Squared distances come from |a|^2 + |b|^2 - 2ab, one matrix product per
+    block of rows. Returns (indices [N, k], distances [N, k]), nearest first.
+    """
+    n = len(X)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0))
+    norms = np.einsum('ij,ij->i', X, X)
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k))
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        d2 = norms[start:stop, None] + norms[None, :] - 2 * (X[start:stop] @ X.T)
+        d2[np.arange(stop - start), np.arange(start, stop)] = np.inf  # Not your own neighbour
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        part_d2 = np.take_along_axis(d2, part, axis=1)
+        order = np.argsort(part_d2, axis=1, kind='stable')
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        distances[start:stop] = np.sqrt(np.maximum(np.take_along_axis(part_d2, order, axis=1), 0))
+    return indices, distances
+
+class SimilarityIndex:
+    """
+    Built once per run: every player's K_NEIGHBORS nearest players by
+    standardized season stats + shooting/assist zone shares, kept in a dict so
+    a lookup is a single hash hit.
+    """
+    def __init__(self, players, k=K_NEIGHBORS):
+        players = list(players)
+        self.player_ids = [int(p['id']) for p in players]
+        indices, distances = nearest_neighbors(feature_matrix(players), k)
+        self._neighbors = {
+            pid: [(self.player_ids[j], float(d)) for j, d in zip(idx, dist)]
+            for pid, idx, dist in zip(self.player_ids, indices, distances)
+        }
+
+    def neighbors(self, pid):
+        """[(neighbour_id, distance), ...] nearest first; [] for unknown players."""
+        return self._neighbors.get(pid, [])
+
+# ==========================================
+# 3. GAMES VS TONIGHT'S OPPONENT
+# ==========================================
+def opponent_map(games):
+    """Today's schedule (nba_dashboard_games.json) -> {team tricode: opponent tricode}."""
+    opponents = {}
+    for g in games or []:
+        home, away = g.get('home_team_tricode'), g.get('away_team_tricode')
+        if home and away:
+            opponents[home] = away
+            opponents[away] = home
+    return opponents
+
+def _prepare_logs(df_logs):
+    """Newest first, with TEAM / OPP split out of MATCHUP ("LAL vs. DEN", "LAL @ DEN") and combos filled in."""
+    df = df_logs.dropna(subset=['MATCHUP']).sort_values('GAME_DATE', ascending=False, kind='stable').reset_index(drop=True)
+    matchup = df['MATCHUP'].astype(str).str.strip()
+    df['TEAM'] = matchup.str[:3]
+    df['OPP'] = matchup.str[-3:]
+    for stat, cols in COMBO_STATS.items():
+        if stat not in df.columns and all(c in df.columns for c in cols):
+            df[stat] = df[cols].apply(pd.to_numeric, errors='coerce').sum(axis=1, min_count=len(cols))
+    return df
+
+def _rows_by_player_opponent(df):
+    """{(player_id, opponent): row numbers in frame order}, grouped on integer keys (no per-group pandas objects)."""
+    pids = df['PLAYER_ID'].to_numpy(dtype=np.int64)
+    opp_codes, opp_names = pd.factorize(df['OPP'])
+    opp_names = list(opp_names)
+    keys = pids * len(opp_names) + opp_codes
+    order = np.argsort(keys, kind='stable')
+    _, starts = np.unique(keys[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    first = order[starts]
+    return {
+        (pid, opp_names[code]): order[start:end]
+        for pid, code, start, end in zip(pids[first].tolist(), opp_codes[first].tolist(), starts.tolist(), ends.tolist())
+    }
+
+def attach_similar(master_data, df_logs, opponents, k=K_NEIGHBORS):
+    """
+    For every player with props whose team plays tonight, adds
+      "similar": {"opponent": "PHI", "players": [[id, name, team, distance], ...],
+                  "games": [[...] per SIMILAR_GAME_COLUMNS]}
+    with the games (newest first) the nearest neighbours played against that
+    opponent, then scores them against each quote's line (score_similar_lines).
+    Returns the number of players annotated.
+    """
+    if df_logs is None or df_logs.empty or not opponents or 'MATCHUP' not in df_logs.columns:
+        return 0
+    pool = [p for p in master_data.values() if p.get('stats')]
+    index = SimilarityIndex(pool, k)
+
+    df = _prepare_logs(df_logs)
+    stats = [s for s in GAME_STATS if s in df.columns]
+    columns = {
+        'GAME_DATE': df['GAME_DATE'].astype(str).str[:10].tolist(),
+        'TEAM': df['TEAM'].tolist(),
+    }
+    for stat in stats:
+        columns[stat] = pd.to_numeric(df[stat], errors='coerce').round(1).astype(object).where(df[stat].notna(), None).tolist()
+    games_by = _rows_by_player_opponent(df)
+    log_pids = df['PLAYER_ID'].to_numpy(dtype=np.int64)
+
+    no_games = np.array([], dtype=np.int64)
+    n_players = 0
+    for pid, player in master_data.items():
+        opponent = opponents.get(player.get('team'))
+        if not player['props'] or not opponent:
+            continue
+        neighbors = [(nid, d) for nid, d in index.neighbors(pid) if nid in master_data]
+        rows = [games_by.get((nid, opponent), no_games) for nid, _ in neighbors]
+        rows = np.sort(np.concatenate(rows))[:MAX_SIMILAR_GAMES] if rows else no_games  # Frame is newest first
+        names = {nid: master_data[nid]['name'] for nid, _ in neighbors}
+        row_pids = log_pids[rows].tolist()
+        games = []
+        for col in SIMILAR_GAME_COLUMNS:
+            if col == 'PLAYER_ID':
+                games.append(row_pids)
+            elif col == 'PLAYER_NAME':
+                games.append([names[i] for i in row_pids])
+            elif col in columns:
+                games.append([columns[col][r] for r in rows])
+            else:
+                games.append([None] * len(rows))
+        player['similar'] = {
+            "opponent": opponent,
+            "players": [[nid, names[nid], master_data[nid]['team'], round(d, 3)] for nid, d in neighbors],
+            "games": games,
+        }
+        n_players += 1
+    score_similar_lines(master_data)
+    return n_players
+
+# ==========================================
+# 4. JOIN AGAINST THE CURRENT LINES
+# ==========================================
+def score_similar_lines(master_data):
+    """
+    Adds to every quote of a player with "similar" games a compact
+    "similar": [hits, games, avg_diff, avg_diff_pct] of those games against the
+    quote's line (hit = value >= line, as in hit_rates.py). Cheap enough to rerun
+    on every odds tick. Returns the number of quotes scored.
+    """
+    position = {col: i for i, col in enumerate(SIMILAR_GAME_COLUMNS)}
+    batches = {}
+    for player in master_data.values():
+        games = (player.get('similar') or {}).get('games')
+        if not games:
+            continue
+        for prop, books in player['props'].items():
+            if prop not in position or prop not in GAME_STATS:
+                continue
+            values = np.array(games[position[prop]][:MAX_SIMILAR_GAMES], dtype=np.float64)  # None -> NaN
+            if not len(values):
+                continue
+            for quote in books.values():
+                try:
+                    line = float(quote.get('line'))
+                except (TypeError, ValueError):
+                    continue
+                if np.isnan(line):
+                    continue
+                batches.setdefault(prop, []).append((values, line, quote))
+
+    n_quotes = 0
+    for prop, batch in batches.items():
+        values = np.full((len(batch), MAX_SIMILAR_GAMES), np.nan)
+        for i, (v, _, _) in enumerate(batch):
+            values[i, :len(v)] = v
+        lines = np.array([b[1] for b in batch])[:, None]
+        played = ~np.isnan(values)
+        games = played.sum(axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # No games -> NaN
+            diff = np.nanmean(values - lines, axis=1)
+            diff_pct = np.nanmean((values - lines) / np.where(lines > 0, lines, np.nan), axis=1) * 100
+        hits = ((values >= lines) & played).sum(axis=1)
+        for i, (_, _, quote) in enumerate(batch):
+            if not games[i]:
+                quote.pop('similar', None)
+                continue
+            quote['similar'] = [
+                int(hits[i]), int(games[i]), round(float(diff[i]), 2),
+                None if np.isnan(diff_pct[i]) else round(float(diff_pct[i]))
+            ]
+            n_quotes += 1
+    return n_quotes
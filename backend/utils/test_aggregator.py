@@ -0,0 +1,33 @@
+import unittest
+import pandas as pd
+from aggregator import build_logs_map, GAME_LOG_COLUMNS
+
+class TestBuildLogsMap(unittest.TestCase):
+    def setUp(self):
+        # Two games for one player, newest first (as gamelogs.py saves them)
+        self.df_logs = pd.DataFrame([
+            {'PLAYER_ID': 1, 'GAME_DATE': '2025-11-08', 'MATCHUP': 'LAL vs. DEN', 'PTS': 30, 'REB': 8, 'AST': None, 'VIDEO_AVAILABLE': 1},
+            {'PLAYER_ID': 1, 'GAME_DATE': '2025-11-06', 'MATCHUP': 'LAL @ BOS', 'PTS': 22, 'REB': 5, 'AST': 9, 'VIDEO_AVAILABLE': 1},
+        ])
+
+    def test_row_layout(self):
+        logs_map = build_logs_map(self.df_logs)
+        self.assertEqual(len(logs_map[1]), 2)
+        self.assertEqual(logs_map[1][0]['PTS'], 30)
+        self.assertEqual(logs_map[1][0]['AST'], 0) # NaN filled
+        self.assertIn('VIDEO_AVAILABLE', logs_map[1][0])
+
+    def test_columnar_layout(self):
+        logs_map = build_logs_map(self.df_logs, columnar=True)
+        cols = logs_map[1]
+        self.assertEqual(len(cols), len(GAME_LOG_COLUMNS))
+        self.assertEqual(cols[GAME_LOG_COLUMNS.index('PTS')], [30, 22])
+        self.assertEqual(cols[GAME_LOG_COLUMNS.index('MATCHUP')], ['LAL vs. DEN', 'LAL @ BOS'])
+        # Columns absent from the CSV are sent as zeros
+        self.assertEqual(cols[GAME_LOG_COLUMNS.index('DRIVES')], [0, 0])
+
+    def test_empty_logs(self):
+        self.assertEqual(build_logs_map(pd.DataFrame(), columnar=True), {})
+
+if __name__ == '__main__':
+    unittest.main()
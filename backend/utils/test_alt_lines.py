@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import pandas as pd
+from alt_lines import Ladder, prob_to_american
+from aggregator import merge_odds
+
+class OnePlayer:
+    """Matches every row to player 1."""
+    def match_player(self, name, team, team_options):
+        return 1
+
+class TestAltLines(unittest.TestCase):
+    def setUp(self):
+        # Posted out of order, 20.5 twice (the later quote wins)
+        self.ladder = Ladder([22.5, 20.5, 18.5, 20.5], [120, -150, -160, -110], [-150, 110, 130, -110])
+
+    def test_sorted_and_main(self):
+        self.assertEqual(self.ladder.lines.tolist(), [18.5, 20.5, 22.5])
+        self.assertEqual(self.ladder.quote(20.5), (-110, -110))
+        self.assertIsNone(self.ladder.quote(21.5))
+        self.assertEqual(self.ladder.main, 1)
+
+    def test_interpolation(self):
+        p = self.ladder.over_probability([18.5, 21.5, 30.5])
+        self.assertAlmostEqual(p[0], 160 / 260)
+        self.assertAlmostEqual(p[1], (110 / 210 + 100 / 220) / 2)
+        self.assertAlmostEqual(p[2], 100 / 220)  # Beyond the ladder: nearest rung
+        self.assertEqual(prob_to_american([0.6, 0.4]).tolist(), [-150, 150])
+
+    def test_merge_odds_keeps_every_line(self):
+        df = pd.DataFrame({
+            'player': ['A'] * 3, 'prop_type': ['points'] * 3,
+            'line': [22.5, 20.5, 18.5], 'over_odds': [120, -110, -160], 'under_odds': [-150, -110, np.nan],
+        })
+        master = {1: {'props': {}}}
+        merge_odds(master, OnePlayer(), df, 'dk')
+        quote = master[1]['props']['PTS']['dk']
+        self.assertEqual((quote['line'], quote['over'], quote['under']), (20.5, -110, -110))
+        self.assertEqual(quote['ladder'], {'lines': [18.5, 20.5, 22.5], 'over': [-160, -110, 120],
+                                           'under': [None, -110, -150], 'main': 1})
+
+        merge_odds(master, OnePlayer(), df.iloc[:1], 'fd')
+        self.assertNotIn('ladder', master[1]['props']['PTS']['fd'])  # Single line: no ladder
+
+if __name__ == '__main__':
+    unittest.main()
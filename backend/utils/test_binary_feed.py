@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from binary_feed import BinaryFeed, write_binary_feed
+
+class TestBinaryFeed(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "master_feed.bin")
+        self.players = [
+            {'id': 2544, 'name': 'LeBron James', 'props': {'PTS': {'dk': {'line': 24.5, 'over': -115, 'under': -105}}}},
+            {'id': 203999, 'name': 'Nikola Jokić', 'props': {}},
+        ] + [{'id': 1000 + i, 'name': f'Player {i}', 'props': {}} for i in range(100)]
+        write_binary_feed(self.path, iter(self.players), meta={'format': 'columnar', 'game_log_columns': ['PTS']})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookup(self):
+        with BinaryFeed(self.path) as feed:
+            self.assertEqual(len(feed), len(self.players))
+            self.assertEqual(feed.get(2544), self.players[0])
+            self.assertEqual(feed.get(203999)['name'], 'Nikola Jokić') # Unicode round trip
+            for p in self.players[2:]:
+                self.assertEqual(feed.get(p['id']), p)
+
+    def test_missing_player(self):
+        with BinaryFeed(self.path) as feed:
+            self.assertIsNone(feed.get(42))
+            self.assertNotIn(42, feed)
+            self.assertIn(2544, feed)
+
+    def test_meta_and_ids(self):
+        with BinaryFeed(self.path) as feed:
+            self.assertEqual(feed.meta['game_log_columns'], ['PTS'])
+            self.assertEqual(sorted(feed.player_ids()), sorted(p['id'] for p in self.players))
+
+    def test_rejects_other_files(self):
+        for content in (b"[]" + b"\0" * 64, b"[]", b""):
+            with open(self.path, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                BinaryFeed(self.path)
+
+    def test_close_with_views_held(self):
+        feed = BinaryFeed(self.path)
+        view = feed.raw(2544)
+        feed.close()  # Must not raise; the file is released at once
+        self.assertTrue(feed._file.closed)
+        self.assertEqual(bytes(view)[:1], b"{")
+        view.release()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from defense_cube import allowed_per_game, combine_games, DefenseCube, DefenseGames
+from gamelog_store import GameLogStore, MANIFEST_FILE
+from fetch_manifest import FetchManifest, STATUS_OK
+
+def game(date, matchup, pts, reb=5, ast=2):
+    return {'GAME_DATE': date, 'MATCHUP': matchup, 'PTS': pts, 'REB': reb, 'AST': ast,
+            'FG3M': 1, 'STL': 1, 'BLK': 0, 'TOV': 1}
+
+class TestDefenseCube(unittest.TestCase):
+    def setUp(self):
+        self.logs = pd.DataFrame([
+            # BOS allowed 30 + 20 on Jan 1, 10 on Jan 3; DEN allowed 25 on Jan 1
+            game('2026-01-01', 'LAL @ BOS', 30),
+            game('2026-01-01', 'LAL @ BOS', 20),
+            game('2026-01-01', 'BOS vs. LAL', 25),
+            game('2026-01-03', 'NYK vs. BOS', 10),
+            game('2026-01-03', 'BOS @ NYK', 40),
+        ])
+
+    def test_allowed_per_game(self):
+        games = allowed_per_game(self.logs).set_index(['GAME_DATE', 'DEF_TEAM'])
+        self.assertEqual(games.loc[('2026-01-01', 'BOS'), 'PTS'], 50)
+        self.assertEqual(games.loc[('2026-01-01', 'LAL'), 'PTS'], 25)
+        self.assertEqual(len(games), 4)
+
+    def test_incremental_matches_full(self):
+        full = allowed_per_game(self.logs)
+        split = combine_games(allowed_per_game(self.logs.iloc[:3]), allowed_per_game(self.logs.iloc[3:]))
+        pd.testing.assert_frame_equal(full.sort_values(['GAME_DATE', 'DEF_TEAM']).reset_index(drop=True),
+                                      split.sort_values(['GAME_DATE', 'DEF_TEAM']).reset_index(drop=True))
+
+    def test_slice_and_ranks(self):
+        cube = DefenseCube(allowed_per_game(self.logs))
+        bos = cube.slice('BOS')
+        self.assertEqual(bos['teams'], 3)
+        self.assertEqual(bos['games']['SEASON'], 2)
+        self.assertEqual(bos['stats']['PTS']['SEASON'], [30.0, 2])   # (50 + 10) / 2, between LAL 25 and NYK 40
+        self.assertEqual(bos['stats']['PTS']['L5'], [30.0, 2])
+        self.assertEqual(bos['stats']['PTS+REB']['SEASON'][0], 37.5)  # Combos from the summed base stats
+        self.assertEqual(cube.slice('NYK')['stats']['PTS']['SEASON'], [40.0, 3])
+        self.assertEqual(cube.slice('LAL')['stats']['REB']['SEASON'], [5.0, 1])  # Tied with NYK, both rank 1
+        self.assertIsNone(cube.slice('PHI'))
+
+class TestDefenseGames(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = os.path.join(self.tmp_dir.name, "gamelogs")
+        self.state_dir = os.path.join(self.tmp_dir.name, "defense")
+        self.now = 1_770_000_000
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fetch(self, date, pts=10):
+        """Stores one BOS defense game and marks its date final, as gamelogs.py does."""
+        self.now += 3600
+        GameLogStore(self.logs_dir).write_partitions(pd.DataFrame([dict(game(date, 'LAL @ BOS', pts), PLAYER_ID=1)]))
+        manifest = FetchManifest(os.path.join(self.logs_dir, MANIFEST_FILE))
+        manifest.record(date, 'LeagueGameLog', STATUS_OK, str(pts), 1, now=self.now)
+        manifest.finalize(date, ['LeagueGameLog'], settled_at=0)
+        manifest.save()
+
+    def bos(self):
+        games, _ = DefenseGames(self.logs_dir, self.state_dir).build()
+        return DefenseCube(games).slice('BOS')
+
+    def test_backfill_and_refetch_after_build(self):
+        self.fetch('2026-01-10')
+        self.fetch('2026-01-11')
+        self.assertEqual(self.bos()['games']['SEASON'], 2)
+        self.fetch('2026-01-05')          # Older date stored by the backfill
+        self.assertEqual(self.bos()['games']['SEASON'], 3)
+        self.fetch('2026-01-10', pts=40)  # Settled date refetched with the full box score
+        self.assertEqual(self.bos()['stats']['PTS']['SEASON'][0], 20.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from feed_snapshot import FeedSnapshot, Resource, FEED_FILE
+
+class TestFeedSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.feed_path = os.path.join(self.tmp_dir.name, FEED_FILE)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_select(self):
+        resource = Resource(b'{"a":1}', br=b'br-body')
+        self.assertEqual(resource.select("gzip, br")[0], "br")
+        self.assertEqual(resource.select("GZIP;q=0.5")[0], "gzip")
+        coding, body, etag = resource.select(None)
+        self.assertEqual((coding, body), ("identity", b'{"a":1}'))
+        self.assertEqual(len(set(resource.etags.values())), 3)
+
+    def test_stale_companion_is_ignored(self):
+        with open(self.feed_path, "w") as f:
+            json.dump([{'id': 1, 'props': {}}], f)
+        with open(self.feed_path + ".gz", "wb") as f:
+            f.write(gzip.compress(b'[]'))
+        old = os.path.getmtime(self.feed_path) - 60
+        os.utime(self.feed_path + ".gz", (old, old))  # Left over from an older feed
+
+        snapshot = FeedSnapshot(self.tmp_dir.name)
+        self.assertIsNone(snapshot.meta)  # Bare list feed
+        self.assertEqual(list(snapshot.players), [1])
+        self.assertEqual(gzip.decompress(snapshot.file(FEED_FILE).gzip), b'[{"id": 1, "props": {}}]')
+        self.assertEqual(snapshot.games, {})
+        self.assertEqual(json.loads(snapshot.player(1).body), {'id': 1, 'props': {}})
+
+    def test_empty(self):
+        snapshot = FeedSnapshot.empty(self.tmp_dir.name)
+        self.assertIsNone(snapshot.file(FEED_FILE))
+        self.assertIsNone(snapshot.player(1))
+        self.assertEqual(json.loads(snapshot.game_list().body), [])
+        with self.assertRaises(FileNotFoundError):
+            FeedSnapshot(self.tmp_dir.name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import feed_writer
+from feed_writer import get_encoder, write_feed
+
+class TestFeedWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.players = [
+            {'id': 2544, 'name': 'LeBron James', 'stats': {'PTS': 24.5, 'FG3_PCT': float('nan')},
+             'game_log': {'PTS': np.array([30.0, np.nan]), 'MIN': [np.float32(35.5), np.int64(36)]}},
+            {'id': 203999, 'name': 'Nikola Jokić', 'stats': {'PTS': np.float64('nan'), 'REB': float('inf')}},
+        ]
+        self.expected = [
+            {'id': 2544, 'name': 'LeBron James', 'stats': {'PTS': 24.5, 'FG3_PCT': None},
+             'game_log': {'PTS': [30.0, None], 'MIN': [35.5, 36]}},
+            {'id': 203999, 'name': 'Nikola Jokić', 'stats': {'PTS': None, 'REB': None}},
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def encoders(self):
+        return ['json'] + (['orjson'] if feed_writer.orjson is not None else [])
+
+    def test_encoders_agree_on_nan(self):
+        outputs = {name: get_encoder(name)(self.players[1]) for name in self.encoders()}
+        for name, raw in outputs.items():
+            self.assertNotIn(b'NaN', raw, name)
+            self.assertEqual(json.loads(raw), self.expected[1], name)
+        self.assertEqual(len(set(outputs.values())), 1)
+
+    def test_round_trip_with_companions(self):
+        for name in self.encoders():
+            path = os.path.join(self.tmp_dir.name, name, "master_feed.json")
+            report = write_feed(path, iter(self.players), header={'version': 3}, encoder=name,
+                                gzip_companion=True, brotli_companion=True)
+            with open(path, "rb") as f:
+                raw = f.read()
+            self.assertEqual(report['players'], 2)
+            self.assertEqual(report['bytes'], len(raw))
+            self.assertEqual(json.loads(raw), {'version': 3, 'players': self.expected}, name)
+            with gzip.open(path + ".gz", "rb") as f:
+                self.assertEqual(f.read(), raw)
+            if feed_writer.brotli is not None:
+                with open(path + ".br", "rb") as f:
+                    self.assertEqual(feed_writer.brotli.decompress(f.read()), raw)
+            self.assertFalse([n for n in os.listdir(os.path.dirname(path)) if n.endswith('.tmp')])
+
+    def test_bare_list_and_failed_write(self):
+        path = os.path.join(self.tmp_dir.name, "feed.json")
+        write_feed(path, iter(self.players), encoder='json')
+        with open(path, "rb") as f:
+            self.assertEqual(json.loads(f.read()), self.expected)
+
+        def broken():
+            yield self.players[0]
+            raise RuntimeError("scrape failed")
+        with self.assertRaises(RuntimeError):
+            write_feed(path, broken(), encoder='json', gzip_companion=True)
+        with open(path, "rb") as f:
+            self.assertEqual(json.loads(f.read()), self.expected)  # Previous feed untouched
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["feed.json"])
+
+if __name__ == '__main__':
+    unittest.main()
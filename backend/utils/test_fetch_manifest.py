@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+from fetch_manifest import FetchManifest, STATUS_OK, STATUS_EMPTY, STATUS_FAILED
+
+PARTS = ["Passing", "Rebounding", "Drives"]
+
+class TestFetchManifest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "manifest.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_only_missing_failed_or_stale_cells_are_due(self):
+        m = FetchManifest(self.path)
+        self.assertEqual(m.due("2026-01-10", PARTS), PARTS)
+
+        m.record("2026-01-10", "Passing", STATUS_OK, "a", 10, now=1000)
+        m.record("2026-01-10", "Rebounding", STATUS_EMPTY, now=1000)
+        m.record("2026-01-10", "Drives", STATUS_FAILED, now=1000)
+        self.assertEqual(m.due("2026-01-10", PARTS, revalidate_after=600, now=1500), ["Drives"])
+        self.assertEqual(m.due("2026-01-10", PARTS, revalidate_after=600, now=1700), PARTS)
+
+    def test_change_detection_and_persistence(self):
+        m = FetchManifest(self.path)
+        self.assertTrue(m.record("2026-01-10", "Passing", STATUS_OK, "a", 10))
+        self.assertFalse(m.record("2026-01-10", "Passing", STATUS_OK, "a", 10))
+        self.assertFalse(m.record("2026-01-10", "Passing", STATUS_FAILED))   # Keeps the last good hash
+        m.save()
+
+        reloaded = FetchManifest(self.path)
+        self.assertEqual(reloaded.cell("2026-01-10", "Passing")["hash"], "a")
+        self.assertEqual(reloaded.cell("2026-01-10", "Passing")["attempts"], 3)
+
+    def test_finalize(self):
+        m = FetchManifest(self.path)
+        for part in PARTS:
+            m.record("2026-01-10", part, STATUS_OK, part, 1, now=1000)
+        self.assertFalse(m.finalize("2026-01-10", PARTS, settled_at=2000))  # Fetched too early
+        for part in PARTS:
+            m.record("2026-01-10", part, STATUS_OK, part, 1, now=3000)
+        self.assertTrue(m.finalize("2026-01-10", PARTS, settled_at=2000))
+        self.assertEqual(m.due("2026-01-10", PARTS, revalidate_after=0), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from gamelog_store import GameLogStore, PARTITION_FILE
+
+def rows(date, players, pts=10.0):
+    return pd.DataFrame({'PLAYER_ID': players, 'GAME_DATE': [date] * len(players),
+                         'PTS': [pts + p for p in players], 'REB': [5.0] * len(players)})
+
+class TestGameLogStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = GameLogStore(os.path.join(self.tmp_dir.name, "gamelogs"))
+        self.store.write_partitions(pd.concat([
+            rows('2025-11-01', [3, 1, 2]), rows('2025-11-03', [1, 2]), rows('2025-11-05', [1]),
+        ]))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_empty_store(self):
+        empty = GameLogStore(os.path.join(self.tmp_dir.name, "none"))
+        self.assertTrue(empty.is_empty())
+        self.assertTrue(empty.read().empty)
+        self.assertEqual(empty.write_partitions(pd.DataFrame()), [])
+
+    def test_overwrite_only_touches_its_date(self):
+        other = os.path.join(self.store._partition_dir('2025-11-01'), PARTITION_FILE)
+        mtime = os.stat(other).st_mtime_ns
+        written = self.store.write_partitions(rows('2025-11-03T00:00:00', [2], pts=40.0))
+        self.assertEqual(written, ['2025-11-03'])
+        self.assertEqual(self.store.dates(), ['2025-11-01', '2025-11-03', '2025-11-05'])
+
+        day = self.store.read(date_from='2025-11-03', date_to='2025-11-03')
+        self.assertEqual(day['PLAYER_ID'].tolist(), [2])  # Replaced, not appended
+        self.assertEqual(day['PTS'].tolist(), [42.0])
+        self.assertEqual(os.stat(other).st_mtime_ns, mtime)
+        self.assertFalse([f for f in os.listdir(self.store._partition_dir('2025-11-03')) if f.endswith('.tmp')])
+
+    def test_read_pushdown(self):
+        df = self.store.read(columns=['PLAYER_ID', 'PTS', 'NOT_A_COLUMN'], player_ids=[1, 3],
+                             date_from='2025-11-01', date_to='2025-11-03')
+        self.assertEqual(list(df.columns), ['PLAYER_ID', 'PTS'])
+        self.assertEqual(sorted(df['PLAYER_ID'].tolist()), [1, 1, 3])
+        self.assertEqual(len(self.store.read(date_from='2025-11-04')), 1)
+        self.assertNotIn('date', self.store.read().columns)
+
+    def test_recent_games_order(self):
+        df = self.store.recent_games(2, columns=['PTS'])
+        self.assertEqual(list(df.columns), ['PLAYER_ID', 'GAME_DATE', 'PTS'])
+        self.assertEqual(list(zip(df['PLAYER_ID'], df['GAME_DATE'])), [
+            (1, '2025-11-05'), (1, '2025-11-03'),
+            (2, '2025-11-03'), (2, '2025-11-01'),
+            (3, '2025-11-01'),
+        ])
+
+    def test_legacy_csv_migration(self):
+        csv_path = os.path.join(self.tmp_dir.name, "gamelogs.csv")
+        pd.DataFrame({
+            'PLAYER_ID': [1, 1, 2], 'GAME_DATE': ['2025-10-22', '2025-10-24', '2025-10-24'],
+            'MATCHUP': ['LAL vs. GSW', 'LAL @ PHX', 'BOS vs. NYK'], 'PTS': [21, 18, 30],
+        }).to_csv(csv_path, index=False)
+        store = GameLogStore(os.path.join(self.tmp_dir.name, "migrated"))
+        self.assertEqual(store.import_csv(csv_path), ['2025-10-22', '2025-10-24'])
+        df = store.recent_games(5)
+        self.assertEqual(df['PTS'].tolist(), [18, 21, 30])
+        self.assertEqual(df['MATCHUP'].tolist(), ['LAL @ PHX', 'LAL vs. GSW', 'BOS vs. NYK'])
+
+        pd.DataFrame({'PLAYER_ID': []}).to_csv(csv_path, index=False)  # No GAME_DATE: nothing to migrate
+        self.assertEqual(GameLogStore(os.path.join(self.tmp_dir.name, "none")).import_csv(csv_path), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+import pandas as pd
+from hit_rates import attach_splits, window_splits
+
+def logs(pid, pts, reb):
+    dates = pd.date_range('2026-01-01', periods=len(pts)).strftime('%Y-%m-%d')[::-1]  # Newest first
+    return pd.DataFrame({'PLAYER_ID': pid, 'GAME_DATE': dates, 'PTS': pts, 'REB': reb})
+
+class TestHitRates(unittest.TestCase):
+    def test_windows_match_a_per_player_loop(self):
+        rng = np.random.default_rng(3)
+        values = rng.integers(0, 40, (50, 30)).astype(float)
+        values[::7, 12:] = np.nan  # Shorter seasons are NaN padded
+        lines = rng.uniform(5, 35, 50)
+        out = window_splits(values, lines)
+        for i in range(50):
+            games = values[i][~np.isnan(values[i])]
+            for w, n in enumerate([5, 10, 20, None]):
+                g = games[:n]
+                self.assertEqual(out[i, w, 0], (g >= lines[i]).sum())
+                self.assertEqual(out[i, w, 1], len(g))
+                self.assertAlmostEqual(out[i, w, 2], g.mean())
+                self.assertAlmostEqual(out[i, w, 3], np.median(g))
+
+    def test_attach_splits(self):
+        df = pd.concat([logs(1, [30, 10, 20, 25, 5, 40], [5, 5, 5, 5, 5, 5]), logs(2, [8], [12])])
+        master = {
+            1: {'props': {'PTS': {'dk': {'line': 19.5}}, 'PTS+REB': {'fd': {'line': 30.5}}}},
+            2: {'props': {'PTS': {'dk': {'line': 10.5}}, 'TURNOVERS': {'dk': {'line': 1.5}}}},
+            3: {'props': {'PTS': {'dk': {'line': 10.5}}}},  # No games
+        }
+        self.assertEqual(attach_splits(master, df), 3)
+        # Newest game first: 30, 10, 20, 25, 5 in the last five
+        self.assertEqual(master[1]['props']['PTS']['dk']['splits']['L5'], [3, 5, 18.0, 20.0, -1.5])
+        self.assertEqual(master[1]['props']['PTS']['dk']['splits']['SEASON'][:2], [4, 6])
+        self.assertEqual(master[1]['props']['PTS+REB']['fd']['splits']['L5'][:2], [1, 5])
+        self.assertEqual(master[2]['props']['PTS']['dk']['splits']['L20'], [0, 1, 8.0, 8.0, -2.5])
+        self.assertNotIn('splits', master[2]['props']['TURNOVERS']['dk'])
+        self.assertNotIn('splits', master[3]['props']['PTS']['dk'])
+        self.assertEqual(master[1]['recent']['PTS'], 18.0)
+
+if __name__ == '__main__':
+    unittest.main()
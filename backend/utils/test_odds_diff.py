@@ -0,0 +1,53 @@
+import unittest
+from odds_diff import DeltaLog, quote_index, diff_quotes
+
+def player(pid, props):
+    return {'id': pid, 'name': f'Player {pid}', 'props': props}
+
+class TestOddsDiff(unittest.TestCase):
+    def setUp(self):
+        self.old = quote_index([
+            player(1, {'PTS': {'dk': {'line': 24.5, 'over': -115, 'under': -105, 'implied': 0},
+                               'fd': {'line': 24.5, 'over': -110, 'under': -110}}}),
+            player(2, {'REB': {'dk': {'line': 8.5, 'over': 100, 'under': -120}}}),
+        ])
+
+    def test_no_change(self):
+        self.assertEqual(diff_quotes(self.old, dict(self.old)), {'changed': [], 'removed': []})
+
+    def test_changed_new_and_removed(self):
+        new = quote_index([
+            player(1, {'PTS': {'dk': {'line': 25.5, 'over': -115, 'under': -105},   # line moved
+                               'fd': {'line': 24.5, 'over': -110, 'under': -110}}}), # unchanged
+            player(3, {'AST': {'fd': {'line': 4.5, 'over': 120, 'under': -150}}}),  # new prop
+        ])
+        diff = diff_quotes(self.old, new)
+        self.assertEqual(diff['changed'], [[1, 'PTS', 'dk', 25.5, -115, -105], [3, 'AST', 'fd', 4.5, 120, -150]])
+        self.assertEqual(diff['removed'], [[2, 'REB', 'dk']])
+
+    def test_ladder_moves(self):
+        ladder = {'lines': [22.5, 24.5, 26.5], 'over': [-160, -115, 130], 'under': [120, -105, -170], 'main': 1}
+        quote = {'line': 24.5, 'over': -115, 'under': -105, 'ladder': ladder}
+        old = quote_index([player(1, {'PTS': {'dk': quote}})], ladders=True)
+        moved = dict(ladder, over=[-165, -115, 130])  # Alt rung only, main line unchanged
+        new = quote_index([player(1, {'PTS': {'dk': dict(quote, ladder=moved)}})], ladders=True)
+
+        self.assertEqual(diff_quotes(old, new)['changed'], [[1, 'PTS', 'dk', 24.5, -115, -105, moved]])
+        self.assertEqual(quote_index([player(1, {'PTS': {'dk': quote}})])[(1, 'PTS', 'dk')], (24.5, -115, -105))
+        single = quote_index([player(1, {'PTS': {'dk': {'line': 24.5, 'over': -115, 'under': -105}}})], ladders=True)
+        self.assertEqual(diff_quotes(old, single)['changed'], [[1, 'PTS', 'dk', 24.5, -115, -105, None]])
+
+class TestDeltaLog(unittest.TestCase):
+    def test_resume(self):
+        log = DeltaLog(maxlen=3)
+        for i in range(5):
+            log.append(f'v{i}', f'v{i + 1}', {'changed': [], 'removed': []})
+
+        self.assertEqual(log.seq, 5)
+        self.assertEqual([e['seq'] for e in log.since(3)], [4, 5])
+        self.assertEqual(log.since(2)[0]['seq'], 3) # Oldest retained entry
+        self.assertEqual(log.since(5), [])
+        self.assertIsNone(log.since(1))             # Aged out -> full refetch
+
+if __name__ == '__main__':
+    unittest.main()
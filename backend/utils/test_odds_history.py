@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import odds_history
+from odds_history import OddsHistoryStore, HistoryIndexCache
+
+MINUTE = 60_000
+T0 = 1_767_000_000_000
+
+class TestOddsHistory(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = OddsHistoryStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_records_only_changes(self):
+        quotes = {(1, 'PTS', 'dk'): (24.5, -110, -110), (1, 'PTS', 'fd'): (24.5, -115, -105)}
+        self.assertEqual(self.store.append(quotes, T0), 2)
+        self.assertEqual(self.store.append(dict(quotes), T0 + MINUTE), 0)
+
+        quotes[(1, 'PTS', 'dk')] = (25.5, -110, -110)
+        self.assertEqual(self.store.append(quotes, T0 + 2 * MINUTE), 1)
+        self.assertEqual(len(self.store.read()), 3)
+
+    def test_failed_book_is_not_a_close(self):
+        self.store.append({(1, 'PTS', 'dk'): (24.5, -110, -110), (2, 'REB', 'fd'): (8.5, 100, -120)}, T0)
+        # FanDuel returned nothing this run: keep its markets open
+        self.assertEqual(self.store.append({(1, 'PTS', 'dk'): (24.5, -110, -110)}, T0 + MINUTE), 0)
+        self.assertIn((2, 'REB', 'fd'), self.store.latest())
+
+    def test_movement_since_open(self):
+        key = (1, 'PTS', 'dk')
+        other = {(2, 'REB', 'dk'): (8.5, 100, -120)}
+        self.store.append({key: (22.5, -110, -110), **other}, T0)
+        self.store.append(other, T0 + MINUTE)                               # Taken down
+        self.store.append({key: (24.5, -110, -110), **other}, T0 + 2 * MINUTE)  # Re-opened
+        self.store.append({key: (25.5, -120, 100), **other}, T0 + 3 * MINUTE)
+
+        moves = self.store.index().movement(1, 'PTS')
+        self.assertEqual(moves['line'].tolist(), [24.5, 25.5])
+        self.assertEqual(moves['line_move'].tolist(), [0.0, 1.0])
+        self.assertEqual(moves['over'].tolist(), [-110, -120])
+
+    def test_cache_reads_only_new_files(self):
+        key = (1, 'PTS', 'dk')
+        cache = HistoryIndexCache(self.store)
+        self.store.append({key: (22.5, -110, -110)}, T0)
+        first = cache.refresh()
+        self.assertIs(cache.refresh(), first)  # Unchanged store: nothing rebuilt
+
+        self.store.append({key: (23.5, -110, -110)}, T0 + MINUTE)
+        with mock.patch.object(odds_history.pq, 'read_table', wraps=odds_history.pq.read_table) as read:
+            index = cache.refresh()
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(len(index), len(self.store.read()))
+        self.assertEqual(index.movement(1, 'PTS')['line'].tolist(), [22.5, 23.5])
+
+    def test_largest_moves(self):
+        self.store.append({(1, 'PTS', 'dk'): (24.5, -110, -110), (2, 'REB', 'dk'): (8.5, -110, -110)}, T0)
+        self.store.append({(1, 'PTS', 'dk'): (25.5, -110, -110), (2, 'REB', 'dk'): (10.5, -110, -110)}, T0 + 30 * MINUTE)
+
+        idx = self.store.index()
+        top = idx.largest_moves(minutes=15, now=T0 + 31 * MINUTE)
+        self.assertEqual(top['player_id'].tolist(), [2, 1])
+        self.assertEqual(top['line_move'].tolist(), [2.0, 1.0])
+        self.assertEqual(top['open_line'].tolist(), [8.5, 24.5])
+        self.assertTrue(idx.largest_moves(minutes=15, now=T0 + 60 * MINUTE).empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import unittest
+from poll_status import PollStatus, read_status
+
+class TestPollStatus(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "status.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_failed_book_keeps_last_success(self):
+        status = PollStatus(self.path)
+        status.record_book("dk", 100, 1.0, now=1000)
+        status.record_book("dk", 0, 0.5, error="timeout", now=1060)
+        status.record_book("fd", 0, 0.5, error="no rows", now=1060)
+        status.record_tick("odds", 2.0, now=1060)
+        status.save()
+
+        saved = read_status(self.path, now=1090)
+        self.assertEqual(saved["books"]["dk"]["staleness_seconds"], 90)
+        self.assertEqual(saved["books"]["dk"]["rows"], 100)
+        self.assertEqual(saved["books"]["dk"]["error"], "timeout")
+        self.assertIsNone(saved["books"]["fd"]["staleness_seconds"])
+        self.assertEqual(saved["ticks"]["count"], 1)
+
+    def test_failed_full_run_is_not_a_refresh(self):
+        status = PollStatus(self.path)
+        status.record_tick("full", 30.0, generation=None, now=1000)
+        self.assertIsNone(status.snapshot(now=1000)["last_full_at"])
+        status.record_tick("full", 30.0, generation="20260110-120000-000000", now=2000)
+        self.assertEqual(status.snapshot(now=2000)["last_full_at"], 2000)
+
+    def test_missing_file(self):
+        self.assertIsNone(read_status(os.path.join(self.dir, "nope.json")))
+
+if __name__ == "__main__":
+    unittest.main()
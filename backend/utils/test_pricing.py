@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from pricing import american_to_decimal, no_vig, price_slate, attach_pricing
+
+class TestPricing(unittest.TestCase):
+    def test_conversions(self):
+        np.testing.assert_allclose(american_to_decimal([150, -200, 100]), [2.5, 1.5, 2.0])
+        self.assertTrue(np.isnan(american_to_decimal([np.nan])[0]))
+        fair_over, fair_under, hold = no_vig(np.array([0.5238]), np.array([0.5238]))
+        self.assertAlmostEqual(fair_over[0], 0.5)
+        self.assertAlmostEqual(hold[0], 0.0476)
+
+    def test_markets_align_across_books(self):
+        priced = price_slate(
+            pids=[1, 1, 1, 1], props=['PTS', 'PTS', 'PTS', 'REB'], lines=[20.5, 20.5, 20.5, 20.5],
+            over=[-110, 100, 120, -110], under=[-110, -120, '-140', None], books=['dk', 'fd', 'mgm', 'dk'],
+        )
+        # dk 50/50, fd and mgm shaded to the under: consensus is their mean
+        fair_fd = (100 / 200) / (100 / 200 + 120 / 220)
+        fair_mgm = (100 / 220) / (100 / 220 + 140 / 240)
+        fair = (0.5 + fair_fd + fair_mgm) / 3
+        np.testing.assert_allclose(priced['fair_over'][:3], fair)
+        self.assertEqual(priced['best_over'][0], 120)
+        self.assertEqual(priced['best_over_book'][1], 'mgm')
+        self.assertEqual(priced['best_under'][2], -110)
+        self.assertEqual(priced['best_under_book'][2], 'dk')
+        self.assertAlmostEqual(priced['ev_over'][2], fair * 2.2 - 1)
+        self.assertAlmostEqual(priced['ev_under'][0], (1 - fair) * (1 + 100 / 110) - 1)
+        # One-sided quote: no fair price of its own market, but a best over price
+        self.assertTrue(np.isnan(priced['fair_over'][3]))
+        self.assertEqual(priced['best_over_book'][3], 'dk')
+        self.assertIsNone(priced['best_under_book'][3])
+
+    def test_attach_pricing(self):
+        master = {7: {'props': {'PTS': {'dk': {'line': 10.5, 'over': -150, 'under': 120, 'implied': 0}}}}}
+        self.assertEqual(attach_pricing(master), 1)
+        quote = master[7]['props']['PTS']['dk']
+        self.assertEqual(quote['implied'], 0.6)
+        self.assertEqual(quote['best'], [-150, 'dk', 120, 'dk'])
+        self.assertLess(quote['ev'][0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
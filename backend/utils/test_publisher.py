@@ -0,0 +1,124 @@
+import os
+import tempfile
+import time
+import unittest
+import publisher as publisher_module
+from publisher import ArtifactPublisher, VERSIONS_DIR, STAGING_PREFIX
+
+FEED_GROUP = ("master_feed.json", "master_feed.bin")
+
+def write(path, text):
+    with open(path + ".tmp", "w") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)  # As every stage does: never in place
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+class TestArtifactPublisher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.current = os.path.join(self.root, "current")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def publish(self, files, keep=5, groups=()):
+        publisher = ArtifactPublisher(self.root, keep=keep)
+        publisher.begin()
+        for name, text in files.items():
+            write(publisher.path(name), text)
+        publisher.carry_over(groups=groups)
+        return publisher, publisher.commit()
+
+    def test_begin_and_commit(self):
+        publisher = ArtifactPublisher(self.root)
+        self.assertIsNone(publisher.current_dir)
+        stage = publisher.begin()
+        self.assertTrue(os.path.basename(stage).startswith(STAGING_PREFIX))
+        write(publisher.path("a.json"), "1")
+        self.assertFalse(os.path.exists(self.current))  # Nothing visible before commit
+
+        final = publisher.commit()
+        self.assertFalse(os.path.exists(stage))
+        self.assertEqual(publisher.current_dir, os.path.realpath(final))
+        self.assertTrue(os.path.islink(self.current))
+        self.assertEqual(os.readlink(self.current), os.path.join(VERSIONS_DIR, os.path.basename(final)))
+        self.assertEqual(read(os.path.join(self.current, "a.json")), "1")
+
+    def test_carry_over_links_what_was_not_produced(self):
+        _, first = self.publish({"a.json": "1", "b.json": "1"})
+        publisher = ArtifactPublisher(self.root)
+        publisher.begin()
+        write(publisher.path("a.json"), "2")
+        self.assertEqual(publisher.carry_over(), ["b.json"])
+        self.assertTrue(os.path.samefile(publisher.path("b.json"), os.path.join(first, "b.json")))
+        second = publisher.commit()
+
+        self.assertEqual(read(os.path.join(self.current, "a.json")), "2")
+        self.assertEqual(read(os.path.join(first, "a.json")), "1")  # Old generation untouched
+        self.assertEqual(read(os.path.join(second, "b.json")), "1")
+
+    def test_abort_keeps_current(self):
+        _, first = self.publish({"a.json": "1"})
+        publisher = ArtifactPublisher(self.root)
+        stage = publisher.begin()
+        write(publisher.path("a.json"), "2")
+        publisher.abort()
+        self.assertFalse(os.path.exists(stage))
+        self.assertEqual(publisher.current_dir, os.path.realpath(first))
+        self.assertEqual(read(os.path.join(self.current, "a.json")), "1")
+
+    def test_prune(self):
+        generations = [os.path.basename(self.publish({"a.json": str(i)}, keep=2)[1]) for i in range(4)]
+        versions = os.path.join(self.root, VERSIONS_DIR)
+        self.assertEqual(sorted(os.listdir(versions)), generations[-2:])
+
+        crashed = os.path.join(versions, STAGING_PREFIX + "crashed")
+        running = os.path.join(versions, STAGING_PREFIX + "running")
+        os.makedirs(crashed)
+        os.makedirs(running)
+        old = time.time() - publisher_module.STALE_STAGING_SECONDS - 60
+        os.utime(crashed, (old, old))
+        self.publish({"a.json": "5"}, keep=2)
+        self.assertFalse(os.path.exists(crashed))
+        self.assertTrue(os.path.exists(running))  # Possibly another live run
+
+    def test_legacy_current_directory_is_migrated(self):
+        os.makedirs(self.current)
+        write(os.path.join(self.current, "a.json"), "legacy")
+        publisher = ArtifactPublisher(self.root)
+        self.assertTrue(os.path.islink(self.current))
+        self.assertEqual(read(os.path.join(publisher.current_dir, "a.json")), "legacy")
+
+    def test_failed_binary_write_keeps_the_feed_pair(self):
+        _, first = self.publish({"master_feed.json": "v1", "master_feed.json.gz": "v1", "master_feed.bin": "v1"})
+
+        # Full run: the JSON feed (and its companion) was regenerated, the binary write failed
+        _, second = self.publish({"master_feed.json": "v2", "master_feed.json.gz": "v2"}, groups=[FEED_GROUP])
+        for name in ("master_feed.json", "master_feed.json.gz", "master_feed.bin"):
+            self.assertEqual(read(os.path.join(second, name)), "v1", name)
+
+        # Odds tick: everything is carried over first, then only the JSON is replaced
+        publisher = ArtifactPublisher(self.root)
+        publisher.begin()
+        publisher.carry_over()
+        write(publisher.path("master_feed.json"), "v3")
+        publisher.carry_over(groups=[FEED_GROUP])
+        self.assertEqual(read(publisher.path("master_feed.json")), "v1")
+        self.assertTrue(os.path.samefile(publisher.path("master_feed.bin"), os.path.join(first, "master_feed.bin")))
+        publisher.abort()
+
+        # Both written: the new pair is published
+        _, third = self.publish({"master_feed.json": "v4", "master_feed.bin": "v4"}, groups=[FEED_GROUP])
+        self.assertEqual(read(os.path.join(third, "master_feed.bin")), "v4")
+        self.assertEqual(read(os.path.join(third, "master_feed.json.gz")), "v1")  # Stale companion, ignored by mtime
+
+    def test_first_run_keeps_a_partial_group(self):
+        _, first = self.publish({"master_feed.json": "v1"}, groups=[FEED_GROUP])
+        self.assertEqual(read(os.path.join(first, "master_feed.json")), "v1")
+
+if __name__ == '__main__':
+    unittest.main()
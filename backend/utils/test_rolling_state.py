@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from rolling_state import RollingState, ROLLING_STATS, build_rolling_state, rolling_coverage
+from gamelog_store import GameLogStore, MANIFEST_FILE
+from fetch_manifest import FetchManifest, STATUS_OK
+
+def logs(n_players=6, n_games=30, seed=4):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2025-10-22', periods=n_games).strftime('%Y-%m-%d')
+    rows = [{'PLAYER_ID': pid, 'GAME_DATE': d, 'PTS': float(rng.integers(0, 40)), 'REB': float(rng.integers(0, 15)),
+             'AST': float(rng.integers(0, 12)), 'DRIVES': np.nan if rng.random() < 0.2 else float(rng.integers(0, 20))}
+            for pid in range(n_players) for d in dates[pid:]]  # Later players join later
+    return pd.DataFrame(rows)
+
+class TestRollingState(unittest.TestCase):
+    def setUp(self):
+        self.df = logs()
+
+    def test_features_match_the_full_log(self):
+        features = RollingState()
+        features.ingest(self.df)
+        out = features.features()
+        pts, drives = ROLLING_STATS.index('PTS'), ROLLING_STATS.index('DRIVES')
+        for pid, games in self.df.sort_values('GAME_DATE', ascending=False).groupby('PLAYER_ID'):
+            row = features.row_of[pid]
+            values = games['PTS'].to_numpy()
+            self.assertAlmostEqual(out['L5'][row, pts], values[:5].mean())
+            self.assertAlmostEqual(out['L20'][row, pts], values[:20].mean())
+            self.assertAlmostEqual(out['mean'][row, pts], values.mean())
+            self.assertAlmostEqual(out['std'][row, pts], values.std(ddof=1))
+            self.assertAlmostEqual(out['ewma5'][row, pts], pd.Series(values[::-1]).ewm(span=5, adjust=False).mean().iloc[-1])
+            self.assertAlmostEqual(out['trend'][row, pts], np.polyfit(np.arange(10), values[:10][::-1], 1)[0])
+            self.assertAlmostEqual(out['mean'][row, drives], games['DRIVES'].mean())  # Missing games skipped
+            self.assertEqual(out['games'][row, drives], games['DRIVES'].notna().sum())
+
+    def test_date_by_date_equals_one_batch(self):
+        batch = RollingState()
+        batch.ingest(self.df)
+        daily = RollingState()
+        for _, day in self.df.groupby('GAME_DATE'):
+            daily.ingest(day)
+        for field, values in batch.features().items():
+            order = [daily.row_of[pid] for pid in batch.player_ids.tolist()]
+            np.testing.assert_allclose(daily.features()[field][order], values, err_msg=field)
+
+    def test_save_and_load(self):
+        state_dir = tempfile.mkdtemp()
+        try:
+            state = RollingState()
+            state.ingest(self.df)
+            state.save(state_dir)
+            loaded = RollingState.load(state_dir)
+            self.assertEqual(loaded.last_date, state.last_date)
+            np.testing.assert_allclose(loaded.features()['L10'], state.features()['L10'])
+        finally:
+            shutil.rmtree(state_dir)
+
+    def test_backfilled_dates_rebuild_the_saved_state(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            logs_dir, state_dir = f"{tmp}/gamelogs", f"{tmp}/rolling"
+            GameLogStore(logs_dir).write_partitions(self.df)
+            state, _ = build_rolling_state(logs_dir, state_dir)
+            self.assertEqual(rolling_coverage(logs_dir, state), {'from': '2025-10-22', 'complete': False})
+
+            # The backfill stores opening night after the state was saved
+            opener = self.df[self.df['GAME_DATE'] == '2025-10-22'].assign(GAME_DATE='2025-10-21', PTS=50.0)
+            GameLogStore(logs_dir).write_partitions(opener)
+            state, _ = build_rolling_state(logs_dir, state_dir)
+            full = RollingState()
+            full.ingest(pd.concat([opener, self.df]))
+            order = [state.row_of[pid] for pid in full.player_ids.tolist()]
+            np.testing.assert_allclose(state.features()['mean'][order], full.features()['mean'])
+            self.assertEqual(RollingState.load(state_dir).first_date, '2025-10-21')
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_refetched_settled_date_rebuilds_the_saved_state(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            logs_dir, state_dir = f"{tmp}/gamelogs", f"{tmp}/rolling"
+            def fetch(date, pts, now):
+                GameLogStore(logs_dir).write_partitions(pd.DataFrame({'PLAYER_ID': [1], 'GAME_DATE': [date], 'PTS': [pts]}))
+                manifest = FetchManifest(f"{logs_dir}/{MANIFEST_FILE}")
+                manifest.record(date, 'LeagueGameLog', STATUS_OK, str(pts), 1, now=now)
+                manifest.finalize(date, ['LeagueGameLog'], settled_at=0)
+                manifest.save()
+            def pts_total():
+                state, _ = build_rolling_state(logs_dir, state_dir)
+                return state.total[state.row_of[1], ROLLING_STATS.index('PTS')]
+
+            fetch('2026-01-10', 10, now=1000)
+            fetch('2026-01-11', 10, now=2000)
+            self.assertEqual(pts_total(), 20)
+            fetch('2026-01-10', 40, now=3000)  # Migrated capped rows replaced by the full box score
+            self.assertEqual(pts_total(), 50)
+            self.assertEqual(RollingState.load(state_dir).fetched_at, 3000)
+        finally:
+            shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from season_averages import (game_totals, combine_totals, averages, reconcile, save_verdict,
+                             local_stats_trusted, SeasonTotals, SEASON_START)
+from gamelog_store import GameLogStore, MANIFEST_FILE
+from fetch_manifest import FetchManifest, STATUS_OK
+
+def game(pid, date, team='BOS', **stats):
+    row = {'PLAYER_ID': pid, 'PLAYER_NAME': f'Player {pid}', 'TEAM_ID': 1, 'TEAM_ABBREVIATION': team,
+           'GAME_DATE': date, 'MIN': 30, 'PTS': 10, 'REB': 5, 'AST': 2, 'STL': 1, 'BLK': 0, 'TOV': 1,
+           'FG3M': 1, 'OREB': 1, 'DREB': 4, 'FGM': 4, 'FGA': 10, 'FG3A': 3, 'FTM': 1, 'FTA': 2, 'PF': 2,
+           'PLUS_MINUS': 0, 'POTENTIAL_AST': 4, 'PASSES_MADE': 40, 'DRIVES': 6, 'DRIVE_PTS': 4,
+           'REB_CHANCES': 8, 'REB_CONTEST_PCT': 0.5}
+    row.update(stats)
+    return row
+
+class TestSeasonAverages(unittest.TestCase):
+    def setUp(self):
+        self.games = pd.DataFrame([
+            game(1, '2026-01-01', PTS=20, REB=10),                       # Double-double
+            game(1, '2026-01-03', PTS=12, DRIVES=np.nan),                # Drives cell failed
+            game(1, '2026-01-05', team='NYK', PTS=14, FGM=6, FGA=10),    # Traded
+            game(2, '2026-01-03'),
+        ])
+
+    def test_incremental_matches_full(self):
+        full = game_totals(self.games)
+        split = combine_totals(game_totals(self.games.iloc[:2]), game_totals(self.games.iloc[2:]))
+        pd.testing.assert_frame_equal(full.sort_index(axis=1), split.loc[full.index].sort_index(axis=1))
+
+    def test_averages(self):
+        row = averages(game_totals(self.games)).set_index('PLAYER_ID').loc[1]
+        self.assertEqual(row['GP'], 3)
+        self.assertEqual(row['PTS'], 15.3)
+        self.assertEqual(row['DD2'], 1)
+        self.assertEqual(row['FG_PCT'], 0.467)                 # 14 / 30, not the mean of per-game pcts
+        self.assertEqual(row['DRIVES'], 6.0)                   # Averaged over the 2 games that have it
+        self.assertEqual(row['TEAM_ABBREVIATION'], 'NYK')
+        self.assertEqual(row['AST_CONVERSION_PCT'], 0.5)
+        self.assertEqual(row['AGGRESSION_SCORE'], row['FGA'] + row['FTA'] + row['DRIVES'])
+
+    def test_reconcile(self):
+        local = averages(game_totals(self.games))
+        remote = local.copy()
+        remote.loc[remote['PLAYER_ID'] == 2, 'PTS'] += 1
+        issues = reconcile(local, remote)
+        self.assertEqual(issues[['PLAYER_ID', 'column']].values.tolist(), [[2, 'PTS']])
+
+class TestCoverage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = os.path.join(self.tmp_dir.name, "gamelogs")
+        self.state_dir = os.path.join(self.tmp_dir.name, "season_totals")
+        self.manifest = FetchManifest(os.path.join(self.logs_dir, MANIFEST_FILE))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def store(self, dates, fetched):
+        GameLogStore(self.logs_dir).write_partitions(pd.DataFrame([game(1, d) for d in dates]))
+        for d in fetched:
+            self.manifest.record(d, 'LeagueGameLog', STATUS_OK, 'h', 1)
+        self.manifest.save()
+
+    def trusted(self):
+        return local_stats_trusted(self.logs_dir, self.state_dir)[0]
+
+    def test_needs_backfill_then_agreement(self):
+        self.assertFalse(self.trusted())
+        self.store(['2026-01-03', '2026-01-05'], ['2026-01-03', '2026-01-05'])
+        self.assertIn('backfill', local_stats_trusted(self.logs_dir, self.state_dir)[1])  # Starts after the opener
+
+        self.store([SEASON_START], [])  # Migrated from gamelogs.csv: not fetched by the scraper
+        self.assertFalse(self.trusted())
+        self.store([], [SEASON_START])  # Backfilled
+        self.assertFalse(self.trusted())  # Not reconciled yet
+
+        save_verdict(self.state_dir, pd.DataFrame({'PLAYER_ID': [1]}))
+        self.assertFalse(self.trusted())
+        save_verdict(self.state_dir, pd.DataFrame())
+        self.assertTrue(self.trusted())
+
+class TestSeasonTotals(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = os.path.join(self.tmp_dir.name, "gamelogs")
+        self.state_dir = os.path.join(self.tmp_dir.name, "season_totals")
+        self.now = 1_770_000_000
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fetch(self, date, pts=10):
+        """Stores one game of player 1 and marks its date final, as gamelogs.py does."""
+        self.now += 3600
+        GameLogStore(self.logs_dir).write_partitions(pd.DataFrame([game(1, date, PTS=pts)]))
+        manifest = FetchManifest(os.path.join(self.logs_dir, MANIFEST_FILE))
+        manifest.record(date, 'LeagueGameLog', STATUS_OK, str(pts), 1, now=self.now)
+        manifest.finalize(date, ['LeagueGameLog'], settled_at=0)
+        manifest.save()
+
+    def totals(self):
+        return SeasonTotals(self.logs_dir, self.state_dir).build()[0].loc[1]
+
+    def test_backfill_after_build(self):
+        self.fetch('2026-01-10')
+        self.fetch('2026-01-11')
+        self.assertEqual(self.totals()['GP'], 2)
+        self.fetch('2026-01-05')          # Older date stored by the backfill
+        self.assertEqual(self.totals()['GP'], 3)
+        self.fetch('2026-01-08')          # Inside the saved range
+        self.assertEqual(self.totals()['GP'], 4)
+
+    def test_refetched_settled_date(self):
+        self.fetch('2026-01-10')
+        self.fetch('2026-01-11')
+        self.assertEqual(self.totals()['PTS'], 20)
+        self.fetch('2026-01-10', pts=40)  # Migrated capped rows replaced by the full box score
+        self.assertEqual(self.totals()['PTS'], 50)
+        self.assertEqual(self.totals()['PTS'], 50)  # Saved after the rebuild
+
+if __name__ == '__main__':
+    unittest.main()
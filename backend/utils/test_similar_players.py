@@ -0,0 +1,54 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from similar_players import attach_similar, nearest_neighbors, opponent_map, score_similar_lines, SIMILAR_GAME_COLUMNS
+
+def player(pid, team, pts, reb, props=None):
+    return {'id': pid, 'name': f'P{pid}', 'team': team, 'stats': {'PTS': pts, 'REB': reb, 'MIN': 30},
+            'shooting_zones': None, 'assist_zones': None, 'props': props or {}}
+
+class TestSimilarPlayers(unittest.TestCase):
+    def test_neighbors_match_brute_force(self):
+        X = np.random.default_rng(5).normal(size=(300, 12))
+        indices, distances = nearest_neighbors(X, 6, block_rows=64)
+        for i in range(300):
+            d = np.sqrt(((X - X[i]) ** 2).sum(axis=1))
+            d[i] = np.inf
+            self.assertEqual(indices[i].tolist(), np.argsort(d)[:6].tolist())
+            np.testing.assert_allclose(distances[i], np.sort(d)[:6])
+
+    def test_games_vs_tonights_opponent(self):
+        master = {
+            1: player(1, 'LAL', 25, 5, {'PTS': {'dk': {'line': 24.5}}, 'REB': {'fd': {'line': 4.5}}}),
+            2: player(2, 'ATL', 24, 6),   # Nearest to 1
+            3: player(3, 'NYK', 26, 5),
+            4: player(4, 'MIA', 5, 12),   # Far from everyone
+        }
+        df_logs = pd.DataFrame([
+            {'PLAYER_ID': 2, 'GAME_DATE': '2026-01-02', 'MATCHUP': 'ATL @ DEN', 'PTS': 30, 'REB': 4},
+            {'PLAYER_ID': 2, 'GAME_DATE': '2026-01-05', 'MATCHUP': 'ATL vs. BOS', 'PTS': 10, 'REB': 9},
+            {'PLAYER_ID': 3, 'GAME_DATE': '2026-01-04', 'MATCHUP': 'NYK vs. DEN', 'PTS': 20, 'REB': None},
+            {'PLAYER_ID': 4, 'GAME_DATE': '2026-01-06', 'MATCHUP': 'MIA @ DEN', 'PTS': 2, 'REB': 15},
+        ])
+        opponents = opponent_map([{'home_team_tricode': 'DEN', 'away_team_tricode': 'LAL'}])
+        self.assertEqual(attach_similar(master, df_logs, opponents, k=2), 1)
+
+        similar = master[1]['similar']
+        self.assertEqual(similar['opponent'], 'DEN')
+        self.assertEqual([p[0] for p in similar['players']], [3, 2])
+        games = dict(zip(SIMILAR_GAME_COLUMNS, similar['games']))
+        self.assertEqual(games['GAME_DATE'], ['2026-01-04', '2026-01-02'])  # Newest first, only vs DEN
+        self.assertEqual(games['PLAYER_NAME'], ['P3', 'P2'])
+        self.assertEqual(games['PTS+REB'], [None, 34])
+        self.assertEqual(master[1]['props']['PTS']['dk']['similar'], [1, 2, 0.5, 2])
+        self.assertEqual(master[1]['props']['REB']['fd']['similar'], [0, 1, -0.5, -11])
+        json.dumps(master)  # Plain Python values only
+
+        # Odds tick: a new line is rescored from the games already in the feed
+        master[1]['props']['PTS']['dk']['line'] = 19.5
+        score_similar_lines(master)
+        self.assertEqual(master[1]['props']['PTS']['dk']['similar'][:3], [2, 2, 5.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,75 @@ import { ShotTypeAnalysis } from './components/ShotTypeAnalysis';
 import { PlayTypeAnalysis } from './components/PlayTypeAnalysis';
 import { SimilarPlayers } from './components/SimilarPlayers';
 import { AssistZones } from './components/AssistZones';
-import { Player } from './types';
+import { Player, GameLog } from './types';
+
+// master_feed.json is either a list of players (row game logs) or
+// { game_log_columns, rolling_coverage, players } where each game_log is one array per column.
+const expandFeed = (data: any): Player[] => {
+  if (Array.isArray(data)) return data;
+  if (!data || !Array.isArray(data.players)) return [];
+  const columns: string[] = data.game_log_columns || [];
+  const coverage = data.rolling_coverage;
+  return data.players.map((p: any) => {
+    const cols: any[][] = p.game_log || [];
+    const nGames = cols.length ? cols[0].length : 0;
+    const rows: GameLog[] = [];
+    for (let i = 0; i < nGames; i++) {
+      const row: any = {};
+      columns.forEach((c, j) => { row[c] = cols[j][i]; });
+      rows.push(row);
+    }
+    return { ...p, game_log: rows, ...(coverage && { rolling_coverage: coverage }) };
+  });
+};
+
+// Over probability with the vig, as the aggregator's pricing.py sets `implied` (0 when unpriced)
+const impliedProb = (odds: number | null) =>
+  odds == null ? 0 : Math.round((odds < 0 ? -odds / (100 - odds) : 100 / (odds + 100)) * 1e4) / 1e4;
+
+// Applies one `odds` event from /api/odds/stream to the loaded feed
+const applyOddsDelta = (players: Player[], delta: any): Player[] => {
+  const touched = new Map<number, Player>();
+  const edit = (id: number) => {
+    if (!touched.has(id)) {
+      const p = players.find(pl => pl.id === id);
+      if (!p) return undefined;
+      touched.set(id, { ...p, props: { ...p.props } });
+    }
+    return touched.get(id);
+  };
+  (delta.changed || []).forEach(([id, prop, book, line, over, under, ladder]: any[]) => {
+    const p = edit(id);
+    if (!p) return;
+    const { splits, splits_line, similar, ladder: _, implied, ...previous } = p.props[prop]?.[book] || ({} as any);
+    // Similar-player scores belong to the old main line; keep them only if it did not move
+    const quote = previous.line === line ? { ...previous, ...(similar && { similar }) } : previous;
+    // Splits stay until the next full feed, tagged with the line they were scored at once it moves
+    const splitsLine = splits_line ?? previous.line;
+    if (splits) {
+      quote.splits = splits;
+      if (splitsLine !== line) quote.splits_line = splitsLine;
+    }
+    // The delta carries the book's whole alt-line ladder (null when it posts a single line)
+    if (ladder) quote.ladder = ladder;
+    // Fair price, EV and best price are shared by every book of the prop; they wait for the next full feed
+    const books: any = {};
+    Object.entries(p.props[prop] || {}).forEach(([b, q]: [string, any]) => {
+      const { fair, ev, best, ...rest } = q;
+      books[b] = rest;
+    });
+    const { fair, ev, best, ...current } = quote;
+    p.props[prop] = { ...books, [book]: { ...current, line, over, under, implied: impliedProb(over) } };
+  });
+  (delta.removed || []).forEach(([id, prop, book]: any[]) => {
+    const p = edit(id);
+    if (!p || !p.props[prop]) return;
+    const { [book]: _, ...rest } = p.props[prop];
+    if (Object.keys(rest).length) p.props[prop] = rest;
+    else delete p.props[prop];
+  });
+  return touched.size ? players.map(p => touched.get(p.id) || p) : players;
+};
 
 function App() {
   const [rawData, setRawData] = useState<Player[]>([]);
@@ -20,16 +88,40 @@ function App() {
   // 1. Fetch data from backend
   useEffect(() => {
     const apiUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000';
-    fetch(`${apiUrl}/data/current/master_feed.json`)
-      .then(res => res.json())
-      .then(data => {
-        setRawData(data);
+    let feedVersion: string | null = null; // X-Feed-Version of the feed on screen (api_server.py only)
+    let reloading: Promise<void> | null = null;
+    let stream: EventSource | null = null;
+    let closed = false;
+
+    const loadFeed = () => fetch(`${apiUrl}/data/current/master_feed.json`)
+      .then(res => res.json().then(data => {
+        feedVersion = res.headers.get('X-Feed-Version');
+        setRawData(expandFeed(data));
         setLoading(false);
-      })
+      }))
       .catch(err => {
         console.error("Failed to load data:", err);
         setLoading(false);
       });
+    const reload = () => {
+      if (!reloading) reloading = loadFeed().finally(() => { reloading = null; });
+    };
+
+    // Live line movement, opened once the feed is loaded so the server can tell
+    // whether a delta was published in between (it then sends `reset`)
+    loadFeed().then(() => {
+      if (closed || typeof EventSource === 'undefined') return;
+      stream = new EventSource(`${apiUrl}/api/odds/stream?version=${encodeURIComponent(feedVersion || '')}`);
+      stream.addEventListener('odds', (e) => {
+        const delta = JSON.parse((e as MessageEvent).data);
+        // Only a delta on top of the feed on screen applies; otherwise one was missed
+        if (delta.base !== feedVersion) { reload(); return; }
+        feedVersion = delta.version;
+        setRawData(prev => applyOddsDelta(prev, delta));
+      });
+      stream.addEventListener('reset', reload);
+    });
+    return () => { closed = true; stream?.close(); };
   }, []);
 
   // 2. Filter data
@@ -112,7 +204,12 @@ function App() {
           <div className="xl:col-span-6 flex flex-col gap-6 h-full">
             <ShotTypeAnalysis />
             <div className="flex-1 min-h-0">
-              <SimilarPlayers similarGames={undefined} />
+              <SimilarPlayers
+                key={currentPlayer?.id}
+                player={currentPlayer}
+                activeTab={activeTab}
+                activeSportsbook={activeSportsbook}
+              />
             </div>
           </div>
 
@@ -67,10 +67,17 @@ export const Header: React.FC<HeaderProps> = ({ player, activeTab, onTabChange,
     const oddsVal = { over: prop?.over || 0, under: prop?.under || 0 };
 
     const logs = player.game_log || [];
-    const gamesPlayed = logs.length;
-    let hits = 0;
+    const seasonStats = player.stats || {};
+    const last5 = logs.slice(0, 5);
 
-    if (hasLine) {
+    // Server-side splits (aggregator hit_rates.py), kept over the same window when a pushed
+    // line move makes them stale; the loop below only runs for a quote the feed never scored
+    let hits = 0;
+    let gamesPlayed = logs.length;
+    const split = prop?.splits?.SEASON;
+    if (hasLine && split) {
+      [hits, gamesPlayed] = split;
+    } else if (hasLine) {
       logs.forEach(game => {
         let val = game[statKey];
         if (val === undefined) {
@@ -85,15 +92,13 @@ export const Header: React.FC<HeaderProps> = ({ player, activeTab, onTabChange,
 
     const rate = (hasLine && gamesPlayed > 0) ? ((hits / gamesPlayed) * 100).toFixed(1) : '0.0';
 
-    const seasonStats = player.stats || {};
-    const last5 = logs.slice(0, 5);
-
     const calculateDiff = (key: string) => {
+      const season = seasonStats[key] || 0;
+      const recent = player.recent?.[key];
+      if (recent !== undefined) return recent - season;
       if (!last5.length) return 0;
       const sum = last5.reduce((acc, g) => acc + (g[key] || 0), 0);
-      const avg = sum / last5.length;
-      const season = seasonStats[key] || 0;
-      return avg - season;
+      return sum / last5.length - season;
     };
 
     const tickerItems = [
@@ -113,7 +118,7 @@ export const Header: React.FC<HeaderProps> = ({ player, activeTab, onTabChange,
     return {
       line: lineVal,
       odds: oddsVal,
-      hitRateInfo: { rate, hits, total: gamesPlayed },
+      hitRateInfo: { rate, hits, total: gamesPlayed, staleLine: split ? prop?.splits_line : undefined },
       statsData: tickerItems,
       hasLine
     };
@@ -295,6 +300,7 @@ export const Header: React.FC<HeaderProps> = ({ player, activeTab, onTabChange,
           )}
           <span className="text-[10px] text-[#52525b] font-medium whitespace-nowrap">
             {hitRateInfo?.total || 0} of {hitRateInfo?.total || 0} games
+            {hitRateInfo?.staleLine !== undefined && ` · at ${hitRateInfo.staleLine}`}
           </span>
         </div>
 
@@ -1,21 +1,86 @@
-import React from 'react';
+import React, { useMemo, useState } from 'react';
 import { Info, ChevronLeft, ChevronRight } from 'lucide-react';
-import { SIMILAR_GAMES } from '../constants';
-import { SimilarPlayerGame } from '../types';
+import { SIMILAR_GAME_COLUMNS } from '../constants';
+import { Player, SimilarPlayerGame } from '../types';
 
 interface SimilarPlayersProps {
-   similarGames?: SimilarPlayerGame[];
+   player?: Player;
+   activeTab: string;
+   activeSportsbook: 'dk' | 'fd' | 'mgm' | 'cz';
 }
 
-export const SimilarPlayers: React.FC<SimilarPlayersProps> = ({ similarGames }) => {
-   const data = similarGames || SIMILAR_GAMES;
+const STAT_LABELS: Record<string, string> = {
+   'Points': 'PTS',
+   'Assists': 'AST',
+   'Rebounds': 'REB',
+   'Threes': 'FG3M',
+   'Pts+Ast': 'PTS+AST',
+   'Pts+Reb': 'PTS+REB',
+   'Reb+Ast': 'REB+AST',
+   'Pts+Reb+Ast': 'PTS+REB+AST',
+   'Blocks': 'BLK',
+   'Steals': 'STL',
+   'Turnovers': 'TOV'
+};
+
+const PAGE_SIZE = 8;
+
+const formatDate = (date: string) =>
+   new Date(`${date}T00:00:00`).toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+
+export const SimilarPlayers: React.FC<SimilarPlayersProps> = ({ player, activeTab, activeSportsbook }) => {
+   const statKey = STAT_LABELS[activeTab] || 'PTS';
+   const [page, setPage] = useState(0);
+
+   // Neighbour games vs tonight's opponent (aggregator similar_players.py), joined against the current line
+   const { data, summary, opponent } = useMemo(() => {
+      const similar = player?.similar;
+      const prop = player?.props?.[statKey]?.[activeSportsbook];
+      if (!similar || !prop) return { data: [] as SimilarPlayerGame[], summary: null, opponent: similar?.opponent };
+
+      const column = (name: string) => similar.games[SIMILAR_GAME_COLUMNS.indexOf(name)] || [];
+      const dates = column('GAME_DATE');
+      const teams = column('TEAM');
+      const names = column('PLAYER_NAME');
+      const results = column(statKey);
+      const line = prop.line;
+
+      const rows: SimilarPlayerGame[] = [];
+      results.forEach((result, i) => {
+         if (result === null || result === undefined) return;
+         rows.push({
+            date: formatDate(String(dates[i])),
+            team: String(teams[i]),
+            player: String(names[i]),
+            line,
+            result: Number(result),
+            diffPercent: line > 0 ? Math.round(((Number(result) - line) / line) * 100) : 0
+         });
+      });
+
+      // Server-side summary unless a pushed line move has invalidated it
+      let summary = prop.similar;
+      if (!summary && rows.length) {
+         const diff = rows.reduce((acc, r) => acc + (r.result - line), 0) / rows.length;
+         const diffPct = rows.reduce((acc, r) => acc + r.diffPercent, 0) / rows.length;
+         summary = [rows.filter(r => r.result >= line).length, rows.length, diff, Math.round(diffPct)];
+      }
+      return { data: rows, summary, opponent: similar.opponent };
+   }, [player, statKey, activeSportsbook]);
+
+   const pages = Math.max(1, Math.ceil(data.length / PAGE_SIZE));
+   const current = Math.min(page, pages - 1);
+   const visible = data.slice(current * PAGE_SIZE, (current + 1) * PAGE_SIZE);
+
+   const [hits, games, avgDiff, avgDiffPct] = summary || [0, 0, 0, 0];
+   const hitRate = games ? Math.round((hits / games) * 100) : 0;
 
    return (
       <div className="bg-card rounded-lg p-5 w-full flex flex-col h-full">
          <div className="flex justify-between items-start mb-4">
             <div>
                <div className="flex items-center gap-2 mb-1">
-                  <h3 className="text-sm font-bold text-white">Similar Players Pts vs 76ers</h3>
+                  <h3 className="text-sm font-bold text-white">Similar Players {activeTab} vs {opponent || '—'}</h3>
                   <Info className="w-3.5 h-3.5 text-gray-400" />
                </div>
                <p className="text-xs text-gray-500">25/26 Season</p>
@@ -31,15 +96,15 @@ export const SimilarPlayers: React.FC<SimilarPlayersProps> = ({ similarGames })
          <div className="grid grid-cols-3 mb-6 gap-2">
             <div className="text-center">
                <div className="text-[10px] text-[#71717a] font-bold uppercase mb-1 whitespace-nowrap">Avg Diff</div>
-               <div className="text-[#22c55e] font-bold text-lg">0.19</div>
+               <div className={`${avgDiff >= 0 ? 'text-[#22c55e]' : 'text-[#ef4444]'} font-bold text-lg`}>{avgDiff.toFixed(2)}</div>
             </div>
             <div className="text-center">
                <div className="text-[10px] text-[#71717a] font-bold uppercase mb-1 whitespace-nowrap">Avg Diff %</div>
-               <div className="text-[#22c55e] font-bold text-lg">1%</div>
+               <div className={`${(avgDiffPct ?? 0) >= 0 ? 'text-[#22c55e]' : 'text-[#ef4444]'} font-bold text-lg`}>{avgDiffPct ?? 0}%</div>
             </div>
             <div className="text-center">
                <div className="text-[10px] text-[#71717a] font-bold uppercase mb-1 whitespace-nowrap">Hit Rate</div>
-               <div className="text-[#ef4444] font-bold text-lg whitespace-nowrap">38% (5/13)</div>
+               <div className={`${hitRate >= 50 ? 'text-[#22c55e]' : 'text-[#ef4444]'} font-bold text-lg whitespace-nowrap`}>{hitRate}% ({hits}/{games})</div>
             </div>
          </div>
 
@@ -56,18 +121,21 @@ export const SimilarPlayers: React.FC<SimilarPlayersProps> = ({ similarGames })
                </div>
 
                <div className="space-y-1">
-                  {data.map((game, idx) => (
+                  {visible.length === 0 && (
+                     <div className="text-xs text-gray-500 text-center py-6">No similar player games vs {opponent || 'tonight\'s opponent'} yet.</div>
+                  )}
+                  {visible.map((game, idx) => (
                      <div key={idx} className="grid grid-cols-[1fr_1.5fr_2fr_1fr_1fr_1fr] text-xs items-center py-2.5 px-2 hover:bg-[#121214] rounded transition-colors border-b border-[#27272a]/40 last:border-0">
                         <div className="text-gray-300 font-medium">{game.date}</div>
                         <div className="text-gray-300">{game.team}</div>
                         <div className="text-white font-medium truncate pr-2">{game.player}</div>
                         <div className="text-center">
-                           <span className={`px-1.5 py-0.5 rounded text-white font-bold bg-[#27272a] border border-[#3f3f46] text-[11px] ${game.line > 24 ? 'text-red-400' : 'text-green-400'}`}>
+                           <span className="px-1.5 py-0.5 rounded text-white font-bold bg-[#27272a] border border-[#3f3f46] text-[11px]">
                               {game.line}
                            </span>
                         </div>
                         <div className="text-center">
-                           <span className={`px-1.5 py-0.5 rounded-[4px] text-white font-bold text-[11px] min-w-[30px] inline-block ${game.result > game.line ? 'bg-[#16a34a]' : 'bg-[#dc2626]'}`}>
+                           <span className={`px-1.5 py-0.5 rounded-[4px] text-white font-bold text-[11px] min-w-[30px] inline-block ${game.result >= game.line ? 'bg-[#16a34a]' : 'bg-[#dc2626]'}`}>
                               {game.result}
                            </span>
                         </div>
@@ -84,11 +152,21 @@ export const SimilarPlayers: React.FC<SimilarPlayersProps> = ({ similarGames })
 
          {/* Pagination */}
          <div className="flex items-center justify-center gap-2 mt-auto pt-4 text-xs font-bold text-gray-400">
-            <div className="w-6 h-6 bg-[#27272a] rounded flex items-center justify-center text-blue-500 cursor-pointer hover:bg-gray-700">
+            <button
+               onClick={() => setPage(Math.max(0, current - 1))}
+               disabled={current === 0}
+               className="w-6 h-6 bg-[#27272a] rounded flex items-center justify-center text-blue-500 hover:bg-gray-700 disabled:opacity-40"
+            >
                <ChevronLeft className="w-3 h-3" />
-            </div>
-            <span>1 / 2</span>
-            <ChevronRight className="w-3 h-3 cursor-pointer hover:text-white" />
+            </button>
+            <span>{current + 1} / {pages}</span>
+            <button
+               onClick={() => setPage(Math.min(pages - 1, current + 1))}
+               disabled={current >= pages - 1}
+               className="hover:text-white disabled:opacity-40"
+            >
+               <ChevronRight className="w-3 h-3" />
+            </button>
          </div>
 
       </div>
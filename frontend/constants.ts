@@ -53,6 +53,13 @@ export const PLAY_TYPES: PlayTypeData[] = [
   { type: 'Post Up', points: '2.3 (9%)', percent: '9%', rank: 2 },
 ];
 
+// Column order of Player.similar.games (backend utils/similar_players.py SIMILAR_GAME_COLUMNS)
+export const SIMILAR_GAME_COLUMNS = [
+  'GAME_DATE', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM',
+  'PTS', 'REB', 'AST', 'FG3M', 'STL', 'BLK', 'TOV',
+  'PTS+REB+AST', 'PTS+REB', 'PTS+AST', 'REB+AST', 'STL+BLK'
+];
+
 export const SIMILAR_GAMES: SimilarPlayerGame[] = [
   { date: 'Jan 19', team: 'Pacers', player: 'P. Siakam', line: 23.5, result: 24, diffPercent: 2 },
   { date: 'Jan 12', team: 'Raptors', player: 'S. Barnes', line: 18.5, result: 15, diffPercent: -19 },
@@ -86,10 +86,37 @@ export interface PlayerStats {
   [key: string]: any;
 }
 
+// [hits, games, avg, median, margin vs line]; avg/median/margin are null when games is 0
+export type SplitValues = [number, number, number | null, number | null, number | null];
+export type SplitWindow = 'L5' | 'L10' | 'L20' | 'SEASON';
+
+// Every line one book posts for a player and prop (aggregator alt_lines.py), sorted by line;
+// `main` indexes the main line, which is also PropLine.line / over / under
+export interface AltLineLadder {
+  lines: number[];
+  over: (number | null)[];
+  under: (number | null)[];
+  main: number;
+}
+
 export interface PropLine {
   line: number;
   over: number;
   under: number;
+  ladder?: AltLineLadder; // Only when the book posts alternates
+  // Precomputed by the aggregator against `line`
+  splits?: Record<SplitWindow, SplitValues>;
+  // Set client-side when a pushed delta moves the line: the line `splits` were scored at
+  splits_line?: number;
+  // Player.similar games scored against `line`: [hits, games, avg diff, avg diff %]
+  similar?: [number, number, number, number | null];
+  // Aggregator pricing.py. implied: over probability with the vig; fair: consensus no-vig
+  // over probability at this line; ev: [over, under] profit per unit at this book's prices;
+  // best: [over odds, book, under odds, book] across books at this line
+  implied?: number;
+  fair?: number | null;
+  ev?: [number | null, number | null];
+  best?: [number | null, string | null, number | null, string | null];
 }
 
 export interface PlayerProps {
@@ -106,6 +133,25 @@ export interface Player {
   stats: PlayerStats;
   game_log: GameLog[];
   props: PlayerProps;
+  recent?: { [stat: string]: number }; // Last-5-game averages for the header ticker
+  similar?: SimilarPlayersData;
+  defense?: OpponentDefense;
+  // Aggregator rolling_state.py, per stat:
+  // [L5, L10, L20, mean, std, ewma5, ewma20, trend per game over L10, games]
+  // mean / std / games cover the stored game logs only, see rolling_coverage
+  rolling?: { [stat: string]: (number | null)[] };
+  // Feed header, copied onto every player: first game date behind `rolling`,
+  // complete once that is the whole season (the log backfill has finished)
+  rolling_coverage?: { from: string | null; complete: boolean };
+}
+
+// Aggregator defense_cube.py: what tonight's opponent allows per game, by window.
+// Each entry is [allowed per game, rank]; rank 1 allows the least, `teams` the most.
+export interface OpponentDefense {
+  team: string;
+  teams: number;
+  games: Record<string, number>;
+  stats: { [stat: string]: Record<'L5' | 'L10' | 'SEASON', [number | null, number]> };
 }
 
 export interface Game {
@@ -169,6 +215,15 @@ export interface ShotTypeData {
   width?: number; // Optional for manual width control, else calculated
 }
 
+// Aggregator similar_players.py: nearest players by season profile and the games they
+// played against tonight's opponent. `games` is one array per SIMILAR_GAME_COLUMNS entry
+// (constants.ts, same order as the backend), newest game first.
+export interface SimilarPlayersData {
+  opponent: string;
+  players: [number, string, string, number][]; // [id, name, team, distance], nearest first
+  games: (string | number | null)[][];
+}
+
 export interface SimilarPlayerGame {
   date: string;
   team: string;